@@ -1,19 +1,50 @@
-from langsmith import Client
+import argparse
 
-client = Client()
+from langsmith_annotator import runtime
+from langsmith_annotator.instrumentation import METRICS
+from langsmith_annotator.merged_runs import merge_by_time
+from langsmith_annotator.sessions import find_project, list_projects
 
-PROJECT_ID = "7850c373-f1e7-4138-94b9-05253ecee199"
-PROJECT_NAME = "langsmtih_stefan"
+parser = argparse.ArgumentParser(description="Print the most recent runs of one or more LangSmith projects.")
+parser.add_argument("--project", action="append", metavar="NAME_OR_ID",
+                    help="Project to list (repeat for several; default: your first project).")
+parser.add_argument("--limit", type=int, default=50, help="Runs to fetch per project.")
+parser.add_argument("--profile", action="store_true", help="Print per-call timing statistics.")
+args = parser.parse_args()
 
-# Fetch recent runs
-runs = list(client.list_runs(project_id=PROJECT_ID, limit=50))
+client = runtime.get_client()
+loader = runtime.get_loader()
+
+projects = list_projects(client, loader=loader)
+if args.project:
+    selected = [find_project(projects, name_or_id) for name_or_id in args.project]
+    for name_or_id, project in zip(args.project, selected):
+        if project is None:
+            print(f"⚠️ Project '{name_or_id}' not found, skipping it.")
+    selected = [project for project in selected if project is not None]
+else:
+    selected = projects[:1]
+
+# Fetch recent runs of every project concurrently, then merge them newest first
+run_lists = loader.map(lambda project: client.list_runs(project_id=project.id, limit=args.limit), selected)
+runs = list(merge_by_time(
+    (project, sorted(project_runs, key=lambda run: run.start_time, reverse=True))
+    for project, project_runs in zip(selected, run_lists)
+))
 
 # Print run details
-print(f"\n🔎 Found {len(runs)} runs in project '{PROJECT_NAME}':\n")
-for run in runs:
+names = ", ".join(f"'{project.name}'" for project in selected)
+print(f"\n🔎 Found {len(runs)} runs in project(s) {names}:\n")
+for project, run in runs:
     print(f"- Run ID: {run.id}")
+    if len(selected) > 1:
+        print(f"  Project: {project.name}")
     print(f"  Session ID: {run.session_id}")
     print(f"  Run Type: {run.run_type}")
     print(f"  Name: {run.name}")
     print(f"  Start: {run.start_time} | End: {run.end_time}")
     print("-" * 60)
+
+if args.profile:
+    print("\n⏱️ LangSmith call profile:")
+    print(METRICS.summary())
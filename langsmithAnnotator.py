@@ -1,96 +1,103 @@
-import os
-import uuid
-from langsmith.client import Client
-from datetime import datetime, timezone
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from langsmith_annotator import data_access, runtime
+from langsmith_annotator.annotation_queue import AnnotationQueue, build_work_list, prefetch_upcoming, work_list_query
+from langsmith_annotator.client_factory import default_client_spec, is_offline_spec
+from langsmith_annotator.dataset_promotion import PROMOTION_WINDOW_DAYS, promote_runs
+from langsmith_annotator.extraction import extract
+from langsmith_annotator.feedback_analytics import ANALYTICS_WINDOW_DAYS, FeedbackAnalytics
+from langsmith_annotator.feedback_queue import FeedbackQueue, FeedbackSubmission
+from langsmith_annotator.instrumentation import METRICS
+from langsmith_annotator.live_tail import LiveTail
+from langsmith_annotator.merged_runs import RunSource, iter_merged_runs, project_source, session_source, sync_sources
+from langsmith_annotator.models import PartialIndex, Session
+from langsmith_annotator.offline_store import FORMATS, export_project
+from langsmith_annotator.prefetcher import Prefetcher
+from langsmith_annotator.run_payload import PREVIEW_MAX_ITEMS, truncate_payload, truncate_text
+from langsmith_annotator.run_stream import paginate
+from langsmith_annotator.session_discovery import SessionQuery
+from langsmith_annotator.sessions import find_project, get_default_project, list_projects, load_sessions
 
 # --- Configuration ---
-client = Client()
+# The client, cache and feedback queue are set up by use_client() on startup.
+client = None
+cache = None
+feedback_queue = None
+loader = runtime.get_loader()
 SESSION_DISPLAY_LIMIT = 10
+# Sessions are traces: every root run, whatever its name. A run's
+# session_id is its project, so it cannot tell sessions apart.
+CLI_SESSION_QUERY = SessionQuery()
+# Live tail mode follows the same traces as the session list.
+CLI_TAIL_QUERY = CLI_SESSION_QUERY
+RUN_PAGE_SIZE = 10
+# Results listed per search.
+SEARCH_RESULT_LIMIT = 10
+# Single-key values in annotation queue mode.
+QUEUE_SHORTCUTS = {'+': 'good', '-': 'bad'}
+prefetcher = Prefetcher()
+# Feedback aggregates per (project, days); refreshing one only processes new feedback.
+analytics = {}
 
 # Store the global project_id once it's fetched
 current_project_id = None
+# Project picked with --project or 'Switch Project'; None means the first project.
+selected_project = None
+# Runs on the last page shown; live tail mode reports new feedback on them.
+watched_run_ids = []
 
-def get_timestamp_from_run(run):
-    """Safely gets a timestamp from a run object, trying multiple attributes."""
-    if hasattr(run, 'start_time') and run.start_time is not None:
-        return run.start_time
-    if hasattr(run, 'created_at') and run.created_at is not None:
-        return run.created_at
-    if hasattr(run, 'extra') and isinstance(run.extra, dict):
-        if 'start_time' in run.extra and run.extra['start_time'] is not None:
-            return run.extra['start_time']
-        if 'created_at' in run.extra and run.extra['created_at'] is not None:
-            return run.extra['created_at']
-    return datetime.now(timezone.utc)
+def use_client(spec: str = None):
+    """
+    Points the CLI at the client described by `spec` ('langsmith', 'fake[:N]'
+    or 'offline:<dir>', see client_factory). Offline and fake data is kept
+    out of the on-disk cache of live data. Every API call is timed in
+    instrumentation.METRICS.
+    """
+    global client, cache, feedback_queue
+    spec = spec or default_client_spec()
+    client = runtime.get_client(spec)
+    cache = runtime.get_run_cache(spec)
+    feedback_queue = FeedbackQueue(client, cache=cache, loader=loader)
+    return spec
+
+def get_current_project():
+    """Returns the selected project, or the first project of the account if none was selected."""
+    return selected_project or get_default_project(client, loader=loader)
+
+def select_project(name_or_id: str):
+    """Makes the project with this name or ID the current one. Returns it, or None if there is none."""
+    global selected_project, current_project_id
+    project = find_project(list_projects(client, loader=loader), name_or_id)
+    if project is not None:
+        selected_project = project
+        current_project_id = str(project.id)
+    return project
 
 def get_last_n_sessions(limit: int = SESSION_DISPLAY_LIMIT):
     """
-    Fetches the latest N sessions by listing runs from the default project
-    and grouping them by their session_id.
+    Fetches the latest N sessions of the current project. Each root run
+    is a session, so listing stops after N root runs.
     """
     global current_project_id # Declare intent to modify global variable
     print(f"Fetching last {limit} sessions...")
     try:
-        projects = list(client.list_projects(limit=1))
-        if not projects:
+        project = get_current_project()
+        if project is None:
             print("❌ No projects found in your LangSmith account.")
             print("   Please ensure you have created at least one project.")
             return []
         
-        current_project_id = str(projects[0].id) # Store the project ID
-        print(f"Using Project ID: {current_project_id} (Name: {projects[0].name})")
-
-        all_runs = list(client.list_runs(
-            project_id=current_project_id, # Filter by project_id here
-            limit=limit * 10,
-        ))
-        
-        sessions_map = {}
-        for run in all_runs:
-            # The 'session_id' for runs in LangSmith typically refers to the
-            # ID of the "session" run or the implicit session created by LangChain.
-            # It should be different from the project_id.
-            if run.session_id and str(run.session_id) != current_project_id:
-                session_uuid = str(run.session_id)
-                
-                if session_uuid not in sessions_map:
-                    session_timestamp = get_timestamp_from_run(run)
-                    sessions_map[session_uuid] = {
-                        "id": uuid.UUID(session_uuid),
-                        "name": f"Session {session_uuid[:8]}...",
-                        "created_at": session_timestamp,
-                        "start_time": getattr(run, 'start_time', None),
-                        "end_time": getattr(run, 'end_time', None)
-                    }
-                
-                if getattr(run, 'run_type', None) == 'session' and getattr(run, 'name', None):
-                    sessions_map[session_uuid]["name"] = run.name
-        
-        # If no distinct sessions are found, we might be looking at a project where
-        # runs don't explicitly declare sessions, or their session_id is the project_id.
-        # In such a case, we can create a "mock session" representing the whole project.
-        if not sessions_map and all_runs:
-            # Create a "Project Session" if no explicit sessions are found
+        current_project_id = str(project.id) # Store the project ID
+        print(f"Using Project ID: {current_project_id} (Name: {project.name})")
+
+        # If the project has no root runs, the whole project is shown as a
+        # single session.
+        sessions = load_sessions(client, current_project_id, limit, CLI_SESSION_QUERY, loader=loader,
+                                 project_name=project.name, project_fallback=True)
+        if len(sessions) == 1 and str(sessions[0].id) == current_project_id:
             print("⚠️ No distinct sessions found, displaying runs directly from the project as a single session.")
-            project_start_time = min(get_timestamp_from_run(r) for r in all_runs) if all_runs else datetime.now(timezone.utc)
-            sessions_map[current_project_id] = {
-                "id": uuid.UUID(current_project_id),
-                "name": projects[0].name or "Default Project Session",
-                "created_at": project_start_time,
-                "start_time": project_start_time,
-                "end_time": max(get_timestamp_from_run(r) for r in all_runs) if all_runs else None
-            }
-
-
-        class MockSession:
-            """A simple class to mimic LangSmith Session objects for display."""
-            def __init__(self, data):
-                for k, v in data.items():
-                    setattr(self, k, v)
-        
-        sessions = sorted(list(sessions_map.values()), key=lambda x: x["created_at"], reverse=True)[:limit]
-        
-        return [MockSession(s) for s in sessions]
+        return sessions
 
     except Exception as e:
         print(f"❌ Error fetching sessions: {e}")
@@ -98,49 +105,91 @@ def get_last_n_sessions(limit: int = SESSION_DISPLAY_LIMIT):
         print("   Also confirm that your LangSmith account has active projects and runs.")
         return []
 
-# --- get_runs_for_session ---
+# --- get_run_pages_for_session ---
 # This function's call to list_runs needs to differentiate:
-# Is the provided ID a true session_id or the project_id?
-def get_runs_for_session(target_id: str):
+# Is the provided ID a trace ID or the project_id?
+def get_run_pages_for_session(target_id: str):
     """
-    Fetches all runs based on a provided ID.
-    If the ID matches the current project ID, it fetches runs for the project.
-    Otherwise, it fetches runs for the specific session ID.
+    Returns a generator over pages of runs for a provided ID, newest first.
+    If the ID matches the current project ID, it pages through the runs of the project.
+    Otherwise, it pages through the runs of the trace with that ID.
+    Runs are only fetched as pages are consumed.
     """
     print(f"Fetching runs for ID: {target_id}...")
+    if current_project_id and target_id == current_project_id:
+        print(f"   (Detected as Project ID, fetching all runs for project {target_id})")
+        scope = "project"
+    else:
+        print(f"   (Detected as Trace ID, fetching runs for trace {target_id})")
+        scope = "trace"
+    return data_access.iter_run_pages(client, cache, scope, target_id, RUN_PAGE_SIZE,
+                                      project_id=current_project_id, loader=loader)
+
+def load_next_page(pages, loaded_pages):
+    """Pulls the next page of runs from `pages` into `loaded_pages`. Returns False when there is none."""
     try:
-        if current_project_id and target_id == current_project_id:
-            print(f"   (Detected as Project ID, fetching all runs for project {target_id})")
-            runs = list(client.list_runs(project_id=target_id))
-        else:
-            print(f"   (Detected as Session ID, fetching runs for session {target_id})")
-            runs = list(client.list_runs(session_id=target_id))
-        return runs
+        page = next(pages, None)
     except Exception as e:
-        print(f"❌ Error fetching runs for ID {target_id}: {e}")
+        print(f"❌ Error fetching runs: {e}")
         print("   This might happen if the ID is invalid or no runs are associated.")
-        return []
+        return False
+    if not page:
+        return False
+    loaded_pages.append(page)
+    return True
+
+def get_merged_run_pages(sources, run_sources):
+    """
+    Loads the runs of several projects or sessions concurrently and returns
+    pages of them merged into one stream, newest first. `run_sources` is
+    filled with the source of every run as the pages are read.
+    """
+    print(f"Loading {len(sources)} sources concurrently...")
+    failures = sync_sources(client, cache, loader, sources)
+    for source, error in failures.items():
+        print(f"❌ Error loading runs of {source.label}: {error}")
+
+    def runs():
+        for source, run in iter_merged_runs(cache, [s for s in sources if s not in failures]):
+            run_sources[str(run.id)] = source.label
+            yield run
+    return paginate(runs(), RUN_PAGE_SIZE)
+
+def display_merged_runs(sources):
+    """Shows the runs of several projects or sessions as one time-ordered session."""
+    run_sources = {}
+    merged = Session(
+        id=", ".join(source.scope_id for source in sources),
+        name="Merged: " + " + ".join(source.label for source in sources),
+    )
+    display_session_details(merged, get_merged_run_pages(sources, run_sources), run_sources)
 
 # --- get_feedback_for_run, create_new_annotation (unchanged) ---
 
 def get_feedback_for_run(run_id: str):
     """Fetches all feedback (annotations) for a given run ID."""
+    return get_feedback_for_runs([run_id]).get(run_id, [])
+
+def get_feedback_for_runs(run_ids):
+    """
+    Fetches feedback for many runs in batched requests, grouped by run ID.
+    Runs whose feedback could not be loaded are listed in the result's
+    `missing` set rather than shown as having no annotations.
+    """
     try:
-        feedback_list = list(client.list_feedback(run_ids=[run_id]))
-        return feedback_list
+        feedback_index = data_access.get_feedback_index(client, cache, run_ids, loader=loader, partial=True)
     except Exception as e:
-        print(f"❌ Error fetching feedback for run {run_id}: {e}")
-        return []
+        feedback_index = PartialIndex(missing=run_ids, errors=[e])
+    if not feedback_index.complete:
+        print(f"⚠️ Feedback for {len(feedback_index.missing)} of {len(run_ids)} runs could not be loaded "
+              f"({feedback_index.errors[-1]}); their annotations may be missing or outdated.")
+    return feedback_index
 
 def create_new_annotation(run_id: str, key: str, value: str):
     """Creates a new annotation (feedback) for a specific run."""
     print(f"Adding annotation to run {run_id} (Key: '{key}', Value: '{value}')...")
     try:
-        feedback = client.create_feedback(
-            run_id=run_id,
-            key=key,
-            value=value
-        )
+        feedback = data_access.create_annotation(client, cache, run_id, key, value)
         print("✅ Annotation added successfully!")
         print(f"  Feedback ID: {feedback.id}")
         return feedback
@@ -149,12 +198,61 @@ def create_new_annotation(run_id: str, key: str, value: str):
         print(f"   Details: {e}")
         return None
 
+def queue_bulk_annotation(runs, key: str, value: str, score=None):
+    """Queues the same annotation for many runs; they are submitted in the background."""
+    submissions = feedback_queue.submit_many(
+        FeedbackSubmission(run_id=str(run.id), key=key, value=value, score=score)
+        for run in runs
+    )
+    print(f"⏳ Queued {len(submissions)} annotations (Key: '{key}', Value: '{value}'). "
+          f"{feedback_queue.pending} pending submission(s).")
+    return submissions
+
+def report_feedback_queue():
+    """Waits for queued annotations and reports the ones that failed."""
+    if feedback_queue.pending:
+        print(f"Waiting for {feedback_queue.pending} queued annotation(s)...")
+    feedback_queue.flush()
+    for submission, error in feedback_queue.failures:
+        print(f"❌ Failed to add annotation to run {submission.run_id}. Error: {error}")
+    feedback_queue.failures.clear()
+
+def select_runs(selection: str, run_map):
+    """
+    Resolves a bulk selection against numbered runs: '1,3,5-8', 'all',
+    'type=<run type>' or 'name=<text>' (name contains text).
+    """
+    selection = selection.strip()
+    if selection == 'all':
+        return list(run_map.values())
+    if selection.startswith('type='):
+        run_type = selection[len('type='):].strip()
+        return [r for r in run_map.values() if getattr(r, 'run_type', None) == run_type]
+    if selection.startswith('name='):
+        text = selection[len('name='):].strip().lower()
+        return [r for r in run_map.values() if text in (getattr(r, 'name', None) or '').lower()]
+
+    numbers = []
+    for part in selection.split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = (int(n) for n in part.split('-', 1))
+            numbers.extend(range(first, last + 1))
+        elif part:
+            numbers.append(int(part))
+    missing = [n for n in numbers if n not in run_map]
+    if missing:
+        raise ValueError(f"Unknown run number(s): {', '.join(map(str, missing))}")
+    return [run_map[n] for n in dict.fromkeys(numbers)]
+
 # --- Display and User Interface Functions (mostly unchanged, ensuring getattr) ---
 
-def display_session_details(session):
+def display_session_details(session, pages=None, run_sources=None):
     """
     Displays details of a selected session, its runs, and any existing annotations.
-    Allows the user to select a run to annotate.
+    Allows the user to select a run to annotate. `pages` replaces the
+    session's own run listing, e.g. with merged runs; `run_sources` then
+    names where each run comes from.
     """
     print("\n" + "="*50)
     print(f"Session Name: {getattr(session, 'name', 'Unnamed Session')}")
@@ -170,81 +268,481 @@ def display_session_details(session):
     print("="*50)
 
     # Pass the session's ID (which might be a project ID if no sessions are distinct)
-    runs = get_runs_for_session(str(session.id)) 
+    if pages is None:
+        pages = get_run_pages_for_session(str(session.id))
+    loaded_pages = []
 
-    if not runs:
+    if not load_next_page(pages, loaded_pages):
         print("No runs found for this session.")
         return
 
-    print("\n--- Runs in this Session ---")
+    page_index = 0
     run_map = {}
+    while True:
+        page = loaded_pages[page_index]
+        first_number = page_index * RUN_PAGE_SIZE + 1
+        print(f"\n--- Runs in this Session (page {page_index + 1}) ---")
+        watched_run_ids[:] = [str(run.id) for run in page]
+        feedback_index = get_feedback_for_runs(watched_run_ids)
+
+        for i, run in enumerate(page, start=first_number):
+            run_map[i] = run
+            print_run(i, run, feedback_index.get(str(run.id), []),
+                      source=run_sources.get(str(run.id)) if run_sources else None,
+                      feedback_missing=str(run.id) in feedback_index.missing)
+
+        has_more = page_index + 1 < len(loaded_pages) or len(page) == RUN_PAGE_SIZE
+        navigation = []
+        if has_more:
+            navigation.append("'n' for next page")
+        if page_index > 0:
+            navigation.append("'p' for previous page")
+        navigation.append("'t<number>' for a run's trace tree")
+        navigation.append("'a' for bulk annotation")
+        navigation.append("'b' to go back to sessions")
+
+        next_page_index = page_index
+        while next_page_index == page_index:
+            try:
+                choice = input(f"\nEnter the number of a Run to annotate, {', '.join(navigation)}: ").strip().lower()
+                if choice == 'b':
+                    return
+                if choice == 'n' and has_more:
+                    if page_index + 1 < len(loaded_pages) or load_next_page(pages, loaded_pages):
+                        next_page_index = page_index + 1
+                    else:
+                        print("No more runs in this session.")
+                        has_more = False
+                    continue
+                if choice == 'p' and page_index > 0:
+                    next_page_index = page_index - 1
+                    continue
+                if choice.startswith('t') and choice[1:].strip().isdigit():
+                    run_index = int(choice[1:])
+                    if run_index in run_map:
+                        display_trace_tree(run_map[run_index])
+                        break
+                    print("⚠️ Invalid run number. Please try again.")
+                    continue
+                if choice == 'a':
+                    selection = input("Runs to annotate ('1,3,5-8', 'all', 'type=llm', 'name=<text>'): ").strip().lower()
+                    if selection == 'all' or selection.startswith(('type=', 'name=')):
+                        # Selections by filter apply to the whole session, not just the loaded pages.
+                        while load_next_page(pages, loaded_pages):
+                            pass
+                        run_map = {
+                            i: run for i, run in enumerate(
+                                (run for loaded in loaded_pages for run in loaded), start=1
+                            )
+                        }
+                    try:
+                        selected_runs = select_runs(selection, run_map)
+                    except ValueError as e:
+                        print(f"⚠️ {e}")
+                        continue
+                    if not selected_runs:
+                        print("⚠️ No runs match this selection.")
+                        continue
+                    print(f"\n--- Bulk annotating {len(selected_runs)} runs ---")
+                    annotation_key = input("Enter annotation key (e.g., 'quality', 'feedback'): ").strip()
+                    annotation_value = input("Enter annotation value: ").strip()
+                    score_text = input("Enter score (optional, press Enter to skip): ").strip()
+                    if not (annotation_key and annotation_value):
+                        print("🚫 Annotation key and value cannot be empty. Please try again.")
+                        continue
+                    try:
+                        score = float(score_text) if score_text else None
+                    except ValueError:
+                        print("🚫 Score must be a number. Please try again.")
+                        continue
+                    queue_bulk_annotation(selected_runs, annotation_key, annotation_value, score)
+                    break
 
-    for i, run in enumerate(runs):
-        run_map[i+1] = run
-        print(f"\n[{i+1}] Run ID: {run.id}")
-        print(f"    Type: {getattr(run, 'run_type', 'N/A')}")
-        print(f"    Name: {getattr(run, 'name', 'Unnamed Run')}")
-        
-        run_start_time = getattr(run, 'start_time', None)
-        run_end_time = getattr(run, 'end_time', None)
-        print(f"    Start Time: {run_start_time.strftime('%H:%M:%S UTC') if run_start_time else 'N/A'}")
-        print(f"    End Time: {run_end_time.strftime('%H:%M:%S UTC') if run_end_time else 'N/A'}")
-
-        if getattr(run, 'inputs', None):
-            print("    Inputs:")
-            if isinstance(run.inputs, dict) and 'messages' in run.inputs:
-                for msg in run.inputs['messages']:
-                    if isinstance(msg, dict) and 'content' in msg:
-                        print(f"      - {msg.get('role', 'System')}: {msg['content']}")
+                run_index = int(choice)
+                if run_index in run_map:
+                    selected_run = run_map[run_index]
+                    print(f"\n--- Annotating Run {run_index} (ID: {selected_run.id}) ---")
+                    payload_run = get_run_payload(selected_run)
+                    if payload_run is not None:
+                        print_run_payload(payload_run)
+                    annotation_key = input("Enter annotation key (e.g., 'quality', 'feedback'): ").strip()
+                    annotation_value = input("Enter annotation value: ").strip()
+
+                    if annotation_key and annotation_value:
+                        create_new_annotation(str(selected_run.id), annotation_key, annotation_value)
+                        input("\nAnnotation submitted. Press Enter to refresh session details...")
+                        break
                     else:
-                        print(f"      - {msg}")
-            else:
-                print(f"      {run.inputs}")
-        if getattr(run, 'outputs', None):
-            print("    Outputs:")
-            if isinstance(run.outputs, dict) and 'content' in run.outputs:
-                 print(f"      - {run.outputs['content']}")
-            else:
-                print(f"      {run.outputs}")
-
-        feedback_list = get_feedback_for_run(str(run.id))
-        if feedback_list:
-            print("    Existing Annotations:")
-            for fb in feedback_list:
-                print(f"      - Key: '{fb.key}', Value: '{fb.value}' (ID: {fb.id})")
-                if fb.score is not None:
-                    print(f"        Score: {fb.score}")
-                if fb.comment:
-                    print(f"        Comment: {fb.comment}")
+                        print("🚫 Annotation key and value cannot be empty. Please try again.")
+                else:
+                    print("⚠️ Invalid run number. Please try again.")
+            except ValueError:
+                print("⚠️ Invalid input. Please enter a number, 't<number>', 'n', 'p', 'a' or 'b'.")
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
+        page_index = next_page_index
+
+
+def display_trace_tree(run):
+    """
+    Prints every run of the trace `run` belongs to as an indented tree, so
+    nested tool and LLM calls can be annotated too. The whole trace is
+    loaded with one query.
+    """
+    trace_id = str(getattr(run, 'trace_id', None) or run.id)
+    try:
+        tree = data_access.get_trace_tree(client, cache, trace_id, project_id=current_project_id, loader=loader)
+    except Exception as e:
+        print(f"❌ Error fetching trace {trace_id}: {e}")
+        return
+    if not len(tree):
+        print("No runs found for this trace.")
+        return
+    feedback_index = get_feedback_for_runs(list(tree.nodes))
+
+    while True:
+        print(f"\n--- Trace {trace_id} ({len(tree)} runs) ---")
+        node_map = {}
+        for i, node in enumerate(tree.walk(), start=1):
+            node_map[i] = node.run
+            feedback_count = len(feedback_index.get(node.id, []))
+            annotations = f"  📝 {feedback_count}" if feedback_count else ""
+            marker = "👉 " if node.id == str(run.id) else ""
+            print(f"{'    ' * node.depth}[{i}] {marker}{getattr(node.run, 'name', 'Unnamed Run')} "
+                  f"({getattr(node.run, 'run_type', 'N/A')}) - {node.id[:8]}...{annotations}")
+
+        choice = input("\nEnter the number of a run to view and annotate, or 'b' to go back: ").strip().lower()
+        if choice == 'b' or not choice:
+            return
+        if not choice.isdigit() or int(choice) not in node_map:
+            print("⚠️ Invalid run number. Please try again.")
+            continue
+        number = int(choice)
+        selected_run = node_map[number]
+        print_run(number, selected_run, feedback_index.get(str(selected_run.id), []),
+                  feedback_missing=str(selected_run.id) in feedback_index.missing)
+        payload_run = get_run_payload(selected_run)
+        if payload_run is not None:
+            print_run_payload(payload_run)
+        annotation_key = input("Enter annotation key (or press Enter to skip): ").strip()
+        if not annotation_key:
+            continue
+        annotation_value = input("Enter annotation value: ").strip()
+        if not annotation_value:
+            print("🚫 Annotation key and value cannot be empty. Please try again.")
+            continue
+        if create_new_annotation(str(selected_run.id), annotation_key, annotation_value):
+            feedback_index.merge(get_feedback_for_runs([str(selected_run.id)]))
+
+
+def print_run(number: int, run, feedback_list, source: str = None, feedback_missing: bool = False):
+    """
+    Prints the summary of one run and its existing annotations.
+    `feedback_missing` marks runs whose feedback could not be loaded.
+    """
+    print(f"\n[{number}] Run ID: {run.id}")
+    if source:
+        print(f"    From: {source}")
+    print(f"    Type: {getattr(run, 'run_type', 'N/A')}")
+    print(f"    Name: {getattr(run, 'name', 'Unnamed Run')}")
+    
+    run_start_time = getattr(run, 'start_time', None)
+    run_end_time = getattr(run, 'end_time', None)
+    print(f"    Start Time: {run_start_time.strftime('%H:%M:%S UTC') if run_start_time else 'N/A'}")
+    print(f"    End Time: {run_end_time.strftime('%H:%M:%S UTC') if run_end_time else 'N/A'}")
+    if getattr(run, 'total_tokens', None):
+        print(f"    Tokens: {run.total_tokens} ({getattr(run, 'prompt_tokens', None) or 0} prompt, "
+              f"{getattr(run, 'completion_tokens', None) or 0} completion)")
+
+    if feedback_missing:
+        print("    ⚠️ Annotations could not be loaded" + (", showing cached ones:" if feedback_list else "."))
+    if feedback_list:
+        print("    Existing Annotations:")
+        for fb in feedback_list:
+            print(f"      - Key: '{fb.key}', Value: '{fb.value}' (ID: {fb.id})")
+            if fb.score is not None:
+                print(f"        Score: {fb.score}")
+            if fb.comment:
+                print(f"        Comment: {fb.comment}")
+    elif not feedback_missing:
+        print("    No existing annotations.")
+
+
+def get_run_payload(run):
+    """Reads the full run (inputs and outputs) of a listed run summary."""
+    try:
+        return data_access.get_run_payload(client, cache, str(run.id), loader=loader)
+    except Exception as e:
+        print(f"❌ Error fetching inputs and outputs of run {run.id}: {e}")
+        return None
+
+
+def print_run_payload(run):
+    """
+    Prints the user input, messages and final answer of a full run, cutting
+    very long messages. Runs the extraction finds nothing in get their raw
+    inputs/outputs, truncated, instead.
+    """
+    extraction = extract(run)
+    if extraction.user_input:
+        print(f"    User input: {truncate_text(str(extraction.user_input))}")
+    elif getattr(run, 'inputs', None):
+        print(f"    Inputs: {truncate_payload(run.inputs)}")
+    if len(extraction.messages) > 1:
+        print("    Messages:")
+        for role, content in extraction.messages[-PREVIEW_MAX_ITEMS:]:
+            print(f"      - {role}: {truncate_text(str(content))}")
+    if extraction.final_output:
+        print(f"    Final output: {truncate_text(str(extraction.final_output))}")
+    elif getattr(run, 'outputs', None):
+        print(f"    Outputs: {truncate_payload(run.outputs)}")
+
+def annotation_queue_mode():
+    """
+    Builds a work list of runs that have no annotation with a given key yet
+    and hands them out one at a time. Annotations are sent in the background
+    and the next runs are prefetched, so the next run shows up immediately.
+    """
+    global current_project_id
+    feedback_key = input("Feedback key to fill in (e.g., 'quality'): ").strip()
+    if not feedback_key:
+        print("🚫 The feedback key cannot be empty.")
+        return
+    run_type = input("Only runs of type (press Enter for any): ").strip()
+    name_contains = input("Only runs whose name contains (press Enter for any): ").strip()
+    days_text = input("Only runs from the last N days (press Enter for all): ").strip()
+    try:
+        days = int(days_text) if days_text else 0
+    except ValueError:
+        print("🚫 The number of days must be a whole number.")
+        return
+
+    try:
+        project = get_current_project()
+        if project is None:
+            print("❌ No projects found in your LangSmith account.")
+            return
+        current_project_id = str(project.id)
+        query = work_list_query(
+            feedback_key, run_type, name_contains,
+            start_after=datetime.now(timezone.utc) - timedelta(days=days) if days else None,
+        )
+        print(f"Building the work list for project {project.name}...")
+        work_list = build_work_list(client, cache, current_project_id, query, loader=loader)
+    except Exception as e:
+        print(f"❌ Error building the work list: {e}")
+        return
+    if not len(work_list):
+        print(f"🎉 Every matching run already has a '{feedback_key}' annotation.")
+        return
+
+    queue = AnnotationQueue(work_list, query)
+    shortcuts = ", ".join(f"'{key}' = {value}" for key, value in QUEUE_SHORTCUTS.items())
+    print(f"📋 {len(queue)} runs need a '{feedback_key}' annotation.")
+    while queue.current is not None:
+        run = queue.current
+        prefetch_upcoming(queue, prefetcher, client, cache, loader=loader)
+        print_run(queue.position + 1, run, get_feedback_for_run(str(run.id)))
+        payload_run = get_run_payload(run)
+        if payload_run is not None:
+            print_run_payload(payload_run)
+
+        choice = input(f"\n[{queue.remaining} left] Value for '{feedback_key}' ({shortcuts}, "
+                       "Enter or 'n' = next, 'p' = previous, 'q' = quit): ").strip()
+        if choice in ('', 'n'):
+            if not queue.next():
+                print("This is the last run in the queue.")
+        elif choice == 'p':
+            if not queue.previous():
+                print("This is the first run in the queue.")
+        elif choice == 'q':
+            break
         else:
-            print("    No existing annotations.")
+            value = QUEUE_SHORTCUTS.get(choice, choice)
+            feedback_queue.submit(FeedbackSubmission(run_id=str(run.id), key=feedback_key, value=value))
+            queue.mark_done()
+
+    print(f"✅ Queued {len(queue.done)} annotation(s); {queue.remaining} run(s) still need '{feedback_key}'.")
+
+
+def feedback_analytics_report(days: int = ANALYTICS_WINDOW_DAYS, project_id: str = None):
+    """Prints feedback distributions, score averages and annotator coverage for a project."""
+    try:
+        if not project_id:
+            project = get_current_project()
+            if project is None:
+                print("❌ No projects found in your LangSmith account.")
+                return
+            project_id = str(project.id)
+        report = analytics.get((project_id, days))
+        if report is None:
+            report = analytics[(project_id, days)] = FeedbackAnalytics(project_id, days=days)
+        print(f"Loading feedback of project {project_id}...")
+        processed = report.refresh(client, cache, loader=loader)
+        print(f"📊 {processed} new or changed annotation(s) processed.\n")
+        print(report.report())
+    except Exception as e:
+        print(f"❌ Error building the feedback report: {e}")
+
+
+def live_tail_mode():
+    """
+    Prints new traces (root runs) of the current project, and new feedback on
+    them and on the runs of the last page viewed, as they arrive, until
+    Ctrl+C. Only what started or was added since the previous poll is fetched.
+    """
+    global current_project_id
+    try:
+        project = get_current_project()
+        if project is None:
+            print("❌ No projects found in your LangSmith account.")
+            return
+        current_project_id = str(project.id)
+        traces = load_sessions(client, current_project_id, SESSION_DISPLAY_LIMIT, CLI_TAIL_QUERY, loader=loader)
+    except Exception as e:
+        print(f"❌ Error fetching the latest traces: {e}")
+        return
+    tail = LiveTail(current_project_id, CLI_TAIL_QUERY, traces)
+    print(f"📡 Tailing project {current_project_id}. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(tail.next_poll_in())
+            update = tail.poll(client, cache, watch=watched_run_ids, loader=loader)
+            if update.error is not None:
+                print(f"⚠️ Poll failed: {update.error} (next try in {tail.interval:.0f}s)")
+            for session in reversed(update.sessions):
+                started = session.start_time.strftime('%H:%M:%S UTC') if session.start_time else 'N/A'
+                print(f"🆕 {started}  {session.name} (Trace ID: {session.id})")
+            for fb in update.feedback:
+                print(f"📝 Run {fb.run_id}: '{fb.key}' = '{fb.value}'")
+    except KeyboardInterrupt:
+        print(f"\n⏹️ Stopped tailing after {tail.polls} poll(s).")
+
+
+def search_mode():
+    """
+    Full-text search over the user input and final answer of the current
+    project's runs, from a local index that is updated incrementally.
+    Opening a result shows its trace with the matching run marked, ready
+    to annotate.
+    """
+    global current_project_id
+    if not cache.search_available:
+        print("❌ Search needs an SQLite build with FTS5.")
+        return
+    try:
+        project = get_current_project()
+        if project is None:
+            print("❌ No projects found in your LangSmith account.")
+            return
+        current_project_id = str(project.id)
+        print(f"Indexing new runs of project {project.name} for search...")
+        indexed = data_access.sync_search_index(client, cache, current_project_id, loader=loader)
+        print(f"🔎 {indexed} runs indexed.")
+    except Exception as e:
+        print(f"⚠️ Could not index the newest runs, results may be incomplete: {e}")
 
     while True:
-        try:
-            choice = input("\nEnter the number of a Run to annotate, or 'b' to go back to sessions: ").strip().lower()
-            if choice == 'b':
-                break
-
-            run_index = int(choice)
-            if run_index in run_map:
-                selected_run = run_map[run_index]
-                print(f"\n--- Annotating Run {run_index} (ID: {selected_run.id}) ---")
-                annotation_key = input("Enter annotation key (e.g., 'quality', 'feedback'): ").strip()
-                annotation_value = input("Enter annotation value: ").strip()
-
-                if annotation_key and annotation_value:
-                    create_new_annotation(str(selected_run.id), annotation_key, annotation_value)
-                    input("\nAnnotation submitted. Press Enter to refresh session details...")
-                    display_session_details(session) 
-                    break
-                else:
-                    print("🚫 Annotation key and value cannot be empty. Please try again.")
-            else:
-                print("⚠️ Invalid run number. Please try again.")
-        except ValueError:
-            print("⚠️ Invalid input. Please enter a number or 'b'.")
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
+        text = input("\nSearch for (or press Enter to go back): ").strip()
+        if not text:
+            return
+        started = time.perf_counter()
+        hits = data_access.search_runs(cache, text, current_project_id, limit=SEARCH_RESULT_LIMIT)
+        print(f"\n--- {len(hits)} result(s) in {(time.perf_counter() - started) * 1000:.0f} ms ---")
+        for i, hit in enumerate(hits, start=1):
+            started_at = hit.start_time.strftime('%Y-%m-%d %H:%M UTC') if hit.start_time else 'N/A'
+            print(f"[{i}] {hit.name} - {hit.run_id[:8]}... ({started_at})")
+            print(f"    {hit.snippet}")
+        if not hits:
+            continue
+        choice = input("\nEnter a result number to open it, or press Enter to search again: ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(hits):
+            display_trace_tree(hits[int(choice) - 1])
+        elif choice:
+            print("⚠️ Invalid result number.")
+
+
+def promote_command(feedback_key: str, dataset_name: str, value: str = None, session_id: str = None,
+                    project_id: str = None, days: int = PROMOTION_WINDOW_DAYS):
+    """
+    Copies the runs of a project started in the last `days` days (0: all),
+    or of one session in it, given by the ID of its trace, annotated with
+    `feedback_key` (and `value`) into a dataset, skipping runs copied before.
+    """
+    try:
+        if project_id:
+            source = RunSource("project", project_id, project_id)
+        else:
+            project = get_current_project()
+            if project is None:
+                print("❌ No projects found in your LangSmith account.")
+                return
+            source = project_source(project)
+        start_after = None
+        if session_id:
+            source = RunSource("trace", session_id, source.project_id, label=f"session {session_id}")
+        elif days:
+            start_after = datetime.now(timezone.utc) - timedelta(days=days)
+        started = time.perf_counter()
+        result = promote_runs(client, source, feedback_key, dataset_name, value=value, start_after=start_after,
+                              loader=loader, progress=lambda message: print(f"   {message}"))
+    except Exception as e:
+        print(f"❌ Promotion failed: {e}")
+        return
+    if result.selected:
+        print(f"✅ {len(result.created)} example(s) added to dataset '{dataset_name}', "
+              f"{len(result.skipped)} already there ({time.perf_counter() - started:.1f}s).")
+    else:
+        print("No matching runs to promote.")
+    if result.failed:
+        print(f"⚠️ {len(result.failed)} run(s) could not be promoted ({result.errors[0]}). "
+              "Run the promotion again to retry them.")
+
+
+def promote_mode():
+    """Asks for the feedback key, value, dataset and scope, then promotes the matching runs."""
+    feedback_key = input("Feedback key of the runs to promote (e.g., 'quality'): ").strip()
+    if not feedback_key:
+        print("🚫 The feedback key cannot be empty.")
+        return
+    value = input("Only with value or score (press Enter for any): ").strip() or None
+    dataset_name = input("Dataset to add them to (created if it does not exist): ").strip()
+    if not dataset_name:
+        print("🚫 The dataset name cannot be empty.")
+        return
+    session_id = input("Only runs of session (trace) ID (press Enter for the whole project): ").strip() or None
+    days = PROMOTION_WINDOW_DAYS
+    if not session_id:
+        answer = input(f"Only runs of the last N days (Enter for {PROMOTION_WINDOW_DAYS}, 0 for all): ").strip()
+        days = int(answer) if answer.isdigit() else PROMOTION_WINDOW_DAYS
+    promote_command(feedback_key, dataset_name, value=value, session_id=session_id, project_id=current_project_id,
+                    days=days)
+
+
+def choose_projects(prompt: str):
+    """Lists the projects of the account and returns the ones picked by number."""
+    try:
+        projects = list_projects(client, loader=loader)
+    except Exception as e:
+        print(f"❌ Error fetching projects: {e}")
+        return []
+    if not projects:
+        print("❌ No projects found in your LangSmith account.")
+        return []
+    print("\n--- Projects ---")
+    for i, project in enumerate(projects, start=1):
+        marker = " (current)" if str(project.id) == current_project_id else ""
+        print(f"[{i}] {project.name} (ID: {project.id}){marker}")
+    selection = input(prompt).strip()
+    try:
+        numbers = [int(part) for part in selection.split(',') if part.strip()]
+    except ValueError:
+        print("⚠️ Invalid input. Please enter project numbers.")
+        return []
+    if not all(1 <= n <= len(projects) for n in numbers):
+        print("⚠️ Invalid project number.")
+        return []
+    return [projects[n - 1] for n in dict.fromkeys(numbers)]
 
 
 def main_menu():
@@ -254,10 +752,17 @@ def main_menu():
         print(" LangSmith Session Annotator CLI ")
         print("="*50)
         print("1. View Last 10 Sessions")
-        print("2. Exit")
+        print("2. Annotation Queue (runs missing a feedback key)")
+        print("3. Feedback Analytics")
+        print("4. Merged Runs Across Projects")
+        print("5. Switch Project")
+        print("6. Live Tail (new traces and feedback)")
+        print("7. Search Runs")
+        print("8. Promote Annotated Runs to a Dataset")
+        print("9. Exit")
         print("="*50)
 
-        choice = input("Enter your choice (1-2): ").strip()
+        choice = input("Enter your choice (1-9): ").strip()
 
         if choice == '1':
             sessions = get_last_n_sessions()
@@ -276,13 +781,21 @@ def main_menu():
                 print(f"[{i+1}] {session_name} (ID: {session.id}) - Created: {created_at_str}")
 
             while True:
-                session_choice = input("\nEnter the number of a session to view its details, or 'm' for main menu: ").strip().lower()
+                session_choice = input("\nEnter the number(s) of sessions to view (e.g. '2' or '1,3'), or 'm' for main menu: ").strip().lower()
                 if session_choice == 'm':
                     break
                 try:
-                    session_index = int(session_choice)
-                    if session_index in session_map:
-                        display_session_details(session_map[session_index])
+                    session_indexes = [int(part) for part in session_choice.split(',') if part.strip()]
+                    if session_indexes and all(i in session_map for i in session_indexes):
+                        selected_sessions = [session_map[i] for i in session_indexes]
+                        if len(selected_sessions) > 1:
+                            display_merged_runs([
+                                session_source(s, current_project_id,
+                                               scope="project" if str(s.id) == current_project_id else "trace")
+                                for s in selected_sessions
+                            ])
+                        else:
+                            display_session_details(selected_sessions[0])
                         continue
                     else:
                         print("⚠️ Invalid session number. Please try again.")
@@ -292,10 +805,119 @@ def main_menu():
                     print(f"An unexpected error occurred: {e}")
 
         elif choice == '2':
+            annotation_queue_mode()
+        elif choice == '3':
+            days = input(f"Only runs of the last N days (Enter for {ANALYTICS_WINDOW_DAYS}, 0 for all): ").strip()
+            feedback_analytics_report(int(days) if days.isdigit() else ANALYTICS_WINDOW_DAYS,
+                                      project_id=current_project_id)
+            input("\nPress Enter to return to main menu...")
+        elif choice == '4':
+            projects = choose_projects("Projects to merge (e.g. '1,2'): ")
+            if projects:
+                display_merged_runs([project_source(project) for project in projects])
+        elif choice == '5':
+            projects = choose_projects("Project to use: ")
+            if projects:
+                select_project(str(projects[0].id))
+                print(f"✅ Using project {projects[0].name}.")
+        elif choice == '6':
+            live_tail_mode()
+        elif choice == '7':
+            search_mode()
+        elif choice == '8':
+            promote_mode()
+        elif choice == '9':
+            report_feedback_queue()
             print("Exiting LangSmith Annotator. Goodbye!")
             break
         else:
-            print("⚠️ Invalid choice. Please enter 1 or 2.")
+            print("⚠️ Invalid choice. Please enter a number from 1 to 9.")
+
+def export_command(out_dir: str, project_id: str = None, fmt: str = "jsonl"):
+    """Exports all runs and feedback of a project to chunked files for offline use."""
+    try:
+        if project_id:
+            project_name = None
+        else:
+            project = get_current_project()
+            if project is None:
+                print("❌ No projects found in your LangSmith account.")
+                return
+            project_id, project_name = str(project.id), project.name
+        print(f"Exporting project {project_id} to {out_dir} ({fmt})...")
+        manifest = export_project(
+            client, project_id, out_dir, fmt=fmt, project_name=project_name, loader=loader,
+            progress=lambda counts: print(f"   {counts['runs']} runs, {counts['feedback']} annotations written..."),
+        )
+        print(f"✅ Exported {manifest['runs']} runs and {manifest['feedback']} annotations "
+              f"in {manifest['chunks']} chunk(s).")
+        print(f"   Run the annotator on it with: python langsmithAnnotator.py --offline {out_dir}")
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+
+
+def report_profile(metrics_file: str = None, show_summary: bool = True):
+    """Prints the per-call timing summary and/or writes it in Prometheus text format."""
+    if show_summary:
+        print("\n⏱️ LangSmith call profile:")
+        print(METRICS.summary())
+    if metrics_file:
+        with open(metrics_file, "w", encoding="utf-8") as f:
+            f.write(METRICS.render_prometheus())
+        print(f"📈 Metrics written to {metrics_file}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LangSmith Session Annotator CLI")
+    parser.add_argument("--offline", metavar="DIR",
+                        help="Serve sessions, runs and feedback from an export directory instead of LangSmith.")
+    parser.add_argument("--client", metavar="SPEC",
+                        help="Client to use: 'langsmith', 'fake[:N]' or 'offline:<dir>' "
+                             "(default: $LANGSMITH_ANNOTATOR_CLIENT or 'langsmith').")
+    parser.add_argument("--project", metavar="NAME_OR_ID",
+                        help="Project to work on (default: your first project).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print latency, page and payload statistics of every LangSmith call on exit.")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="Write the call statistics to PATH in Prometheus text format on exit.")
+    subcommands = parser.add_subparsers(dest="command")
+    export_parser = subcommands.add_parser("export", help="Export a project's runs and feedback to files.")
+    export_parser.add_argument("--out", required=True, help="Directory to write the export to.")
+    export_parser.add_argument("--project-id", help="Project to export (default: your first project).")
+    export_parser.add_argument("--format", choices=sorted(FORMATS), default="jsonl")
+    analytics_parser = subcommands.add_parser("analytics", help="Print aggregated feedback statistics.")
+    analytics_parser.add_argument("--project-id", help="Project to report on (default: your first project).")
+    analytics_parser.add_argument("--days", type=int, default=ANALYTICS_WINDOW_DAYS,
+                                  help="Only include runs started in the last N days (0: all).")
+    promote_parser = subcommands.add_parser("promote", help="Copy annotated runs into a dataset.")
+    promote_parser.add_argument("--key", required=True, help="Feedback key the runs are annotated with.")
+    promote_parser.add_argument("--value", help="Only runs whose feedback has this value or score.")
+    promote_parser.add_argument("--dataset", required=True, help="Dataset to add the runs to (created if needed).")
+    promote_parser.add_argument("--project-id", help="Project to promote from (default: your first project).")
+    promote_parser.add_argument("--session-id", help="Only promote runs of this session, given by its trace ID.")
+    promote_parser.add_argument("--days", type=int, default=PROMOTION_WINDOW_DAYS,
+                                help="Without --session-id, only runs started in the last N days (0: all). "
+                                     "Each 100 runs cost one feedback request.")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    args = parse_args()
+    spec = use_client(f"offline:{args.offline}" if args.offline else args.client)
+    if is_offline_spec(spec):
+        print(f"📦 Not connected to LangSmith: serving data from '{spec}'")
+    if args.project and select_project(args.project) is None:
+        print(f"❌ Project '{args.project}' not found.")
+        raise SystemExit(1)
+    try:
+        if args.command == "export":
+            export_command(args.out, args.project_id, args.format)
+        elif args.command == "analytics":
+            feedback_analytics_report(args.days, args.project_id)
+        elif args.command == "promote":
+            promote_command(args.key, args.dataset, args.value, args.session_id, args.project_id, args.days)
+        else:
+            main_menu()
+    finally:
+        if args.profile or args.metrics_file:
+            report_profile(args.metrics_file, show_summary=args.profile)
\ No newline at end of file
@@ -0,0 +1,6 @@
+"""
+Core library of the LangSmith annotator: data access, caching and
+instrumentation shared by the CLI (langsmithAnnotator.py), the Streamlit
+app (streamlit_app.py) and DebugSessions.py. Submodules are imported on
+demand so that importing the package stays cheap.
+"""
@@ -0,0 +1,142 @@
+"""
+Annotation queue mode: a precomputed work list of runs that do not have a
+given feedback key yet, handed out one run at a time.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .data_access import get_feedback_index, get_run_payload
+from .feedback_loader import load_key_feedback
+from .models import RunSummary
+from .run_index import RunIndex
+from .run_payload import RUN_SUMMARY_FIELDS
+from .session_discovery import SessionQuery, build_list_runs_kwargs, matches
+
+# Runs ahead of the current one whose payload and feedback are prefetched.
+QUEUE_LOOKAHEAD = 5
+# Safety net against building a work list from a whole large project.
+WORK_LIST_MAX_RUNS = 5000
+
+
+@dataclass(frozen=True)
+class WorkListQuery:
+    """
+    Runs that still need a `feedback_key` annotation. `runs` selects the
+    candidates (run type, name, time window, top-level only) the same way
+    session discovery does.
+    """
+    feedback_key: str
+    runs: SessionQuery = field(default_factory=lambda: SessionQuery(root_only=True))
+    max_runs: Optional[int] = WORK_LIST_MAX_RUNS
+
+
+def annotated_run_ids(client, feedback_key: str, run_ids, loader=None) -> set:
+    """IDs among `run_ids` that have feedback with `feedback_key`, from batched key-filtered listings."""
+    return {str(fb.run_id) for fb in load_key_feedback(client, run_ids, feedback_key, loader=loader)}
+
+
+def build_work_list(client, cache, project_id: str, query: WorkListQuery, loader=None) -> RunIndex:
+    """
+    Returns a RunIndex (newest first) over the candidate runs that lack the
+    feedback key. Candidates come from one filtered list_runs query and are
+    stored in the cache as summaries; existing annotations of the candidates
+    come from key-filtered list_feedback queries over batches of their IDs
+    and are anti-joined in memory, so the cost does not grow with a request
+    per run.
+    """
+    kwargs = build_list_runs_kwargs(project_id, query.runs)
+    kwargs["select"] = RUN_SUMMARY_FIELDS
+    if query.max_runs:
+        kwargs["limit"] = query.max_runs
+    if loader is not None:
+        listed = loader.call(client.list_runs, **kwargs)
+    else:
+        listed = list(client.list_runs(**kwargs))
+    candidates = RunIndex([RunSummary.from_run(run) for run in listed if matches(run, query.runs)])
+    cache.upsert_runs(candidates.runs.values(), project_id=project_id)
+
+    done = annotated_run_ids(client, query.feedback_key, candidates.ids, loader=loader)
+    return RunIndex([candidates.get(run_id) for run_id in candidates.ids if run_id not in done])
+
+
+class AnnotationQueue:
+    """
+    Cursor over a work list. Runs annotated through the queue are marked
+    done; next() and previous() skip them.
+    """
+    def __init__(self, work_list: RunIndex, query: WorkListQuery):
+        self.work_list = work_list
+        self.query = query
+        self.position = 0
+        self.done = set()
+
+    def __len__(self):
+        return len(self.work_list)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.work_list) - len(self.done)
+
+    @property
+    def current(self):
+        """The run to annotate, or None when the queue is exhausted."""
+        if 0 <= self.position < len(self.work_list) and self.work_list.ids[self.position] not in self.done:
+            return self.work_list.get(self.work_list.ids[self.position])
+        return None
+
+    def _move(self, step: int) -> bool:
+        position = self.position + step
+        while 0 <= position < len(self.work_list):
+            if self.work_list.ids[position] not in self.done:
+                self.position = position
+                return True
+            position += step
+        return False
+
+    def next(self) -> bool:
+        """Moves to the next run still to do. Returns False (and stays put) if there is none."""
+        return self._move(1)
+
+    def previous(self) -> bool:
+        return self._move(-1)
+
+    def mark_done(self, run_id=None):
+        """Marks a run (the current one by default) as annotated and moves on."""
+        run_id = str(run_id) if run_id is not None else self.work_list.ids[self.position]
+        self.done.add(run_id)
+        if not self.next():
+            self.previous()
+
+    def upcoming(self, count: int = QUEUE_LOOKAHEAD):
+        """IDs of the next `count` runs still to do after the current one."""
+        ids = []
+        for run_id in self.work_list.ids[self.position + 1:]:
+            if run_id not in self.done:
+                ids.append(run_id)
+                if len(ids) >= count:
+                    break
+        return ids
+
+
+def prefetch_upcoming(queue: AnnotationQueue, prefetcher, client, cache, loader=None, owner=None,
+                      count: int = QUEUE_LOOKAHEAD):
+    """Warms the payloads and feedback of the next `count` runs of a queue in the background."""
+    upcoming = queue.upcoming(count)
+    if not upcoming:
+        return
+    group = ("queue", queue.query)
+    for run_id in upcoming:
+        prefetcher.prefetch(("run_payload", run_id), get_run_payload, client, cache, run_id,
+                            loader=loader, owner=owner, group=group)
+    prefetcher.prefetch(("feedback", tuple(upcoming)), get_feedback_index, client, cache, upcoming,
+                        loader=loader, owner=owner, group=group)
+
+
+def work_list_query(feedback_key: str, run_type: str = None, name_contains: str = None,
+                    start_after=None, root_only: bool = True) -> WorkListQuery:
+    """Convenience constructor used by the front ends."""
+    return WorkListQuery(
+        feedback_key=feedback_key,
+        runs=SessionQuery(run_type=run_type or None, name_contains=name_contains or None,
+                          start_after=start_after, root_only=root_only),
+    )
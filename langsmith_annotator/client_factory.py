@@ -0,0 +1,66 @@
+"""
+Pluggable construction of the LangSmith client.
+
+LANGSMITH_ANNOTATOR_CLIENT selects the implementation:
+    langsmith        the real langsmith Client (default)
+    fake[:N]         a FakeClient with N synthetic runs (default 1000)
+    offline:<dir>    an OfflineClient serving an export directory
+LANGSMITH_OFFLINE_DIR is a shortcut for offline:<dir>.
+"""
+import os
+
+CLIENT_ENV_VAR = "LANGSMITH_ANNOTATOR_CLIENT"
+
+_factories = {}
+
+
+def register_client_factory(name: str, factory):
+    """Registers `factory(argument)` for specs of the form '<name>' or '<name>:<argument>'."""
+    _factories[name] = factory
+
+
+def _langsmith_client(argument):
+    from langsmith.client import Client
+    from .request_layer import mount_rate_limited_adapter
+    client = Client()
+    mount_rate_limited_adapter(client.session, prefix=client.api_url)
+    return client
+
+
+def _fake_client(argument):
+    from .fake_client import FakeClient
+    return FakeClient(n_runs=int(argument)) if argument else FakeClient()
+
+
+def _offline_client(argument):
+    from .offline_store import OfflineClient
+    if not argument:
+        raise ValueError("The offline client needs a directory: offline:<dir>")
+    return OfflineClient(argument)
+
+
+register_client_factory("langsmith", _langsmith_client)
+register_client_factory("fake", _fake_client)
+register_client_factory("offline", _offline_client)
+
+
+def default_client_spec() -> str:
+    if os.environ.get(CLIENT_ENV_VAR):
+        return os.environ[CLIENT_ENV_VAR]
+    if os.environ.get("LANGSMITH_OFFLINE_DIR"):
+        return f"offline:{os.environ['LANGSMITH_OFFLINE_DIR']}"
+    return "langsmith"
+
+
+def create_client(spec: str = None):
+    """Builds a client from a spec such as 'langsmith', 'fake:100000' or 'offline:./export'."""
+    spec = spec or default_client_spec()
+    name, _, argument = spec.partition(":")
+    if name not in _factories:
+        raise ValueError(f"Unknown client '{name}'. Choose one of: {', '.join(sorted(_factories))}")
+    return _factories[name](argument or None)
+
+
+def is_offline_spec(spec: str) -> bool:
+    """True for clients that do not talk to LangSmith (no API key needed)."""
+    return spec.partition(":")[0] != "langsmith"
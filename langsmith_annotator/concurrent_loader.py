@@ -0,0 +1,178 @@
+"""Bounded thread-pool loader with retry/backoff for LangSmith API calls."""
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+MAX_CONCURRENCY = int(os.environ.get("LANGSMITH_MAX_CONCURRENCY", "8"))
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+# Longest Retry-After the loader is willing to wait for before giving up on a retry.
+RETRY_AFTER_MAX_SECONDS = 60.0
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# langsmith raises these for 429, 5xx and dropped connections.
+RETRYABLE_ERROR_NAMES = {
+    "LangSmithRateLimitError",
+    "LangSmithAPIError",
+    "LangSmithConnectionError",
+}
+
+_STATUS_IN_MESSAGE = re.compile(r"\b(429|5\d\d)\b")
+
+
+def status_code_of(exc):
+    """Best-effort extraction of the HTTP status code behind an exception."""
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None) or getattr(exc, "status_code", None)
+    if code is not None:
+        return int(code)
+    match = _STATUS_IN_MESSAGE.search(str(exc))
+    return int(match.group(1)) if match else None
+
+
+def retry_after_of(exc):
+    """
+    Seconds the server asked us to wait (the Retry-After header of the
+    response behind an exception, in seconds or as an HTTP date), or None.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    return parse_retry_after(headers.get("Retry-After"))
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(exc, attempt: int, backoff_base: float = BACKOFF_BASE_SECONDS) -> float:
+    """
+    Seconds to wait before retry number `attempt + 1`: exponential backoff
+    with jitter, but never less than the Retry-After the server sent.
+    """
+    delay = min(BACKOFF_MAX_SECONDS, backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+    retry_after = retry_after_of(exc)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_AFTER_MAX_SECONDS))
+    return delay
+
+
+def is_retryable(exc) -> bool:
+    """Returns True for rate limiting (429), server errors (5xx) and connection errors."""
+    if type(exc).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return status_code_of(exc) in RETRYABLE_STATUS_CODES
+
+
+def call_with_retry(fn, *args, max_retries: int = MAX_RETRIES,
+                    backoff_base: float = BACKOFF_BASE_SECONDS, **kwargs):
+    """
+    Calls `fn`, retrying retryable errors with exponential backoff and jitter
+    (or after the server's Retry-After, when it is longer).
+    Generators returned by `fn` (e.g. list_runs) are consumed inside the retry
+    so that errors raised while paging are retried too.
+    """
+    attempt = 0
+    while True:
+        try:
+            result = fn(*args, **kwargs)
+            if hasattr(result, "__next__"):
+                result = list(result)
+            return result
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            time.sleep(backoff_delay(e, attempt, backoff_base))
+            attempt += 1
+
+
+def stream_with_retry(fn, *args, max_retries: int = MAX_RETRIES,
+                      backoff_base: float = BACKOFF_BASE_SECONDS, **kwargs):
+    """
+    Lazily yields the items of a list-style call such as list_runs. If paging
+    fails with a retryable error the call is re-issued and the items that were
+    already yielded are skipped, so consumers can stop early without the
+    whole listing ever being materialized.
+    """
+    yielded = 0
+    attempt = 0
+    while True:
+        try:
+            for position, item in enumerate(fn(*args, **kwargs)):
+                if position < yielded:
+                    continue
+                yield item
+                yielded += 1
+            return
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            time.sleep(backoff_delay(e, attempt, backoff_base))
+            attempt += 1
+
+
+class ConcurrentLoader:
+    """
+    Runs LangSmith calls on a bounded thread pool. Every call is retried on
+    429/5xx, and `map` returns results in the order of its inputs no matter
+    which request finishes first.
+    """
+    def __init__(self, max_workers: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE_SECONDS):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="langsmith-loader")
+
+    def call(self, fn, *args, **kwargs):
+        """Runs a single call with retries in the calling thread."""
+        return call_with_retry(fn, *args, max_retries=self.max_retries,
+                               backoff_base=self.backoff_base, **kwargs)
+
+    def stream(self, fn, *args, **kwargs):
+        """Lazily iterates a list-style call in the calling thread, retrying failed pages."""
+        return stream_with_retry(fn, *args, max_retries=self.max_retries,
+                                 backoff_base=self.backoff_base, **kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules a call with retries on the pool and returns its Future."""
+        return self._executor.submit(self.call, fn, *args, **kwargs)
+
+    def map(self, fn, items):
+        """Calls `fn(item)` for every item concurrently and returns the results in input order."""
+        futures = [self.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def map_settled(self, fn, items):
+        """
+        Like `map`, but a failed call does not hide the others: returns one
+        (result, None) or (None, exception) pair per item, in input order.
+        """
+        futures = [self.submit(fn, item) for item in items]
+        settled = []
+        for future in futures:
+            try:
+                settled.append((future.result(), None))
+            except Exception as e:
+                settled.append((None, e))
+        return settled
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
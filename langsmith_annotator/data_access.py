@@ -0,0 +1,244 @@
+"""
+Shared data access for the CLI and the Streamlit app. Runs and feedback are
+served from the local RunCache and only synced incrementally from LangSmith.
+"""
+import time
+
+from .feedback_loader import chunked, load_feedback_index
+from .instrumentation import record_cache
+from .models import PartialIndex, RunSummary
+from .run_cache import SCOPE_COLUMNS, from_iso
+from .run_payload import RUN_SUMMARY_FIELDS
+from .run_stream import paginate
+from .run_tree import build_tree
+
+# How long a synced run listing is served without asking LangSmith for newer runs.
+RUN_SYNC_INTERVAL_SECONDS = 60
+# How long cached feedback for a run is considered fresh.
+FEEDBACK_MAX_AGE_SECONDS = 60
+# How long the search index of a project is used without indexing newer runs.
+SEARCH_SYNC_INTERVAL_SECONDS = 60
+# Fields read for the search index: the summary plus inputs and outputs.
+SEARCH_SELECT_FIELDS = RUN_SUMMARY_FIELDS + ["inputs", "outputs"]
+# Run IDs re-read per request when indexing runs that were still in progress.
+SEARCH_REINDEX_BATCH_SIZE = 100
+
+# Maps a cache scope onto the matching list_runs keyword argument.
+SCOPE_QUERY_ARGS = {
+    "project": "project_id",
+    "parent": "parent_run_id",
+    "trace": "trace_id",
+}
+
+
+def _fetch(loader, fn, **kwargs):
+    """Runs a list-style API call, with retries when a loader is available."""
+    if loader is not None:
+        return loader.call(fn, **kwargs)
+    return list(fn(**kwargs))
+
+
+def _stream(loader, fn, **kwargs):
+    """Lazily iterates a list-style API call, retrying failed pages when a loader is available."""
+    if loader is not None:
+        return loader.stream(fn, **kwargs)
+    return fn(**kwargs)
+
+
+def sync_runs(client, cache, scope: str, scope_id: str, project_id: str = None, loader=None):
+    """
+    Fetches only the runs of a scope that started at or after the last stored
+    watermark, re-fetches cached runs that were still in progress, and stores
+    both in the cache. The listing is streamed into the cache page by page.
+    Only run summaries are fetched; see get_run_payload for inputs/outputs.
+    """
+    scope_key = f"{scope}:{scope_id}"
+    watermark, _ = cache.get_sync_state(scope_key)
+    query = {SCOPE_QUERY_ARGS[scope]: scope_id}
+
+    latest = cache.upsert_runs(
+        _stream(loader, client.list_runs, start_time=from_iso(watermark), select=RUN_SUMMARY_FIELDS, **query),
+        project_id=project_id,
+    )
+
+    unfinished = cache.get_unfinished_run_ids(scope, scope_id)
+    if unfinished:
+        cache.upsert_runs(_fetch(loader, client.list_runs, run_ids=unfinished, select=RUN_SUMMARY_FIELDS), project_id=project_id)
+
+    cache.set_sync_state(scope_key, max(filter(None, (watermark, latest)), default=None))
+
+
+def _needs_sync(cache, scope: str, scope_id: str, refresh: bool) -> bool:
+    if scope not in SCOPE_COLUMNS:
+        raise ValueError(f"Unknown run scope: {scope}")
+    _, synced_at = cache.get_sync_state(f"{scope}:{scope_id}")
+    needs_sync = refresh or synced_at is None or _is_older_than(synced_at, RUN_SYNC_INTERVAL_SECONDS)
+    record_cache("runs", hit=not needs_sync)
+    return needs_sync
+
+
+def ensure_synced(client, cache, scope: str, scope_id: str, project_id: str = None,
+                  refresh: bool = False, loader=None):
+    """
+    Syncs a scope when the cached listing is older than
+    RUN_SYNC_INTERVAL_SECONDS or `refresh` is set, without reading it back.
+    """
+    scope_id = str(scope_id)
+    if _needs_sync(cache, scope, scope_id, refresh):
+        sync_runs(client, cache, scope, scope_id, project_id=project_id, loader=loader)
+
+
+def get_runs(client, cache, scope: str, scope_id: str, project_id: str = None,
+             refresh: bool = False, loader=None):
+    """
+    Returns the runs of a project ("project"), trace ("trace") or the
+    children of a run ("parent"), newest first, syncing first when needed.
+    """
+    ensure_synced(client, cache, scope, scope_id, project_id=project_id, refresh=refresh, loader=loader)
+    return cache.get_runs(scope, str(scope_id))
+
+
+def iter_run_pages(client, cache, scope: str, scope_id: str, page_size: int, project_id: str = None,
+                   refresh: bool = False, loader=None):
+    """
+    Yields the runs of a scope newest first, `page_size` at a time.
+
+    A scope that was synced before is brought up to date (a cheap incremental
+    fetch) and then paged out of the cache. A scope that has never been
+    synced is streamed straight from LangSmith, storing each page in the
+    cache as it is yielded, so the first page is available after a single
+    request. Its watermark is only recorded once the listing is exhausted.
+    """
+    scope_id = str(scope_id)
+    watermark, _ = cache.get_sync_state(f"{scope}:{scope_id}")
+    if watermark is not None:
+        if _needs_sync(cache, scope, scope_id, refresh):
+            sync_runs(client, cache, scope, scope_id, project_id=project_id, loader=loader)
+        yield from cache.iter_run_pages(scope, scope_id, page_size)
+        return
+
+    record_cache("runs", hit=False)
+    query = {SCOPE_QUERY_ARGS[scope]: scope_id}
+    latest = None
+    for page in paginate(_stream(loader, client.list_runs, select=RUN_SUMMARY_FIELDS, **query), page_size):
+        page_latest = cache.upsert_runs(page, project_id=project_id)
+        latest = max(filter(None, (latest, page_latest)), default=None)
+        yield [RunSummary.from_run(run) for run in page]
+    cache.set_sync_state(f"{scope}:{scope_id}", latest)
+
+
+def get_trace_tree(client, cache, trace_id: str, project_id: str = None, refresh: bool = False, loader=None):
+    """
+    Returns the RunTree of every run in a trace, nested calls included. The
+    trace is listed with a single trace_id-filtered query (incrementally
+    after the first time) instead of one parent_run_id query per level.
+    """
+    return build_tree(get_runs(client, cache, "trace", trace_id, project_id=project_id,
+                               refresh=refresh, loader=loader))
+
+
+def get_run_payload(client, cache, run_id: str, refresh: bool = False, loader=None):
+    """
+    Returns the full run, inputs and outputs included. Listings only carry
+    summaries, so this is read from LangSmith the first time a run is
+    selected and served from the cache afterwards.
+    """
+    run = None if refresh else cache.get_run_payload(str(run_id))
+    record_cache("payloads", hit=run is not None)
+    if run is None:
+        run = loader.call(client.read_run, str(run_id)) if loader is not None else client.read_run(str(run_id))
+        cache.put_run_payload(run)
+    return run
+
+
+def get_runs_page(cache, scope: str, scope_id: str, page: int, page_size: int):
+    """Returns page number `page` (0-based) of the cached runs of a scope."""
+    return cache.get_runs_page(scope, str(scope_id), page * page_size, page_size)
+
+
+def count_runs(cache, scope: str, scope_id: str) -> int:
+    return cache.count_runs(scope, str(scope_id))
+
+
+def warm_runs_page(client, cache, scope: str, scope_id: str, page: int, page_size: int,
+                   project_id: str = None, loader=None):
+    """
+    Brings one page of a scope and the feedback of its runs into the cache
+    ahead of time, e.g. from a background prefetch. Returns the page's run count.
+    """
+    ensure_synced(client, cache, scope, scope_id, project_id=project_id, loader=loader)
+    runs = get_runs_page(cache, scope, scope_id, page, page_size)
+    if runs:
+        get_feedback_index(client, cache, [run.id for run in runs], loader=loader)
+    return len(runs)
+
+
+def get_feedback_index(client, cache, run_ids, refresh: bool = False, loader=None,
+                       partial: bool = False):
+    """
+    Returns feedback grouped by run ID. Only runs whose cached feedback is
+    missing or stale are fetched, in batched requests that run in parallel
+    when a loader is given.
+
+    With `partial`, batches that still fail after retries do not raise: the
+    result is a PartialIndex whose `missing` set names the runs that could
+    not be refreshed (their last cached feedback, if any, is still included).
+    """
+    run_ids = [str(run_id) for run_id in run_ids]
+    stale = run_ids if refresh else cache.get_stale_feedback_run_ids(run_ids, FEEDBACK_MAX_AGE_SECONDS)
+    record_cache("feedback", hit=True, count=len(run_ids) - len(stale))
+    record_cache("feedback", hit=False, count=len(stale))
+    loaded = PartialIndex()
+    if stale:
+        loaded = load_feedback_index(client, stale, loader=loader, partial=partial)
+        cache.replace_feedback(loaded)
+    index = cache.get_feedback_index(run_ids)
+    return PartialIndex(index, missing=loaded.missing, errors=loaded.errors) if partial else index
+
+
+def record_feedback(cache, feedback):
+    """Adds newly created feedback to the cache so it shows up without a refetch."""
+    cache.add_feedback(feedback)
+
+
+def create_annotation(client, cache, run_id: str, key: str, value, score=None, comment: str = None):
+    """Creates feedback on a run and records it in the cache. Returns the feedback."""
+    feedback = client.create_feedback(run_id=run_id, key=key, value=value, score=score, comment=comment)
+    record_feedback(cache, feedback)
+    return feedback
+
+
+def sync_search_index(client, cache, project_id: str, refresh: bool = False, loader=None) -> int:
+    """
+    Indexes the user input and final answer of the project's top-level runs
+    for search. Only runs that started at or after the last indexed one are
+    read, plus runs that were still in progress then; nothing is read when
+    the index was synced less than SEARCH_SYNC_INTERVAL_SECONDS ago.
+    Returns the number of indexed runs of the project.
+    """
+    project_id = str(project_id)
+    scope_key = f"search:{project_id}"
+    watermark, synced_at = cache.get_sync_state(scope_key)
+    needs_sync = refresh or synced_at is None or _is_older_than(synced_at, SEARCH_SYNC_INTERVAL_SECONDS)
+    record_cache("search", hit=not needs_sync)
+    if needs_sync:
+        unfinished = cache.get_unfinished_search_run_ids(project_id)
+        latest = cache.index_run_text(
+            _stream(loader, client.list_runs, project_id=project_id, is_root=True,
+                    start_time=from_iso(watermark), select=SEARCH_SELECT_FIELDS),
+            project_id=project_id,
+        )
+        for batch in chunked(unfinished, SEARCH_REINDEX_BATCH_SIZE):
+            cache.index_run_text(_fetch(loader, client.list_runs, run_ids=batch, select=SEARCH_SELECT_FIELDS),
+                                 project_id=project_id)
+        cache.set_sync_state(scope_key, max(filter(None, (watermark, latest)), default=None))
+    return cache.count_search_docs(project_id)
+
+
+def search_runs(cache, text: str, project_id: str = None, limit: int = 20):
+    """Ranked SearchHits for free text from the local index (see sync_search_index)."""
+    return cache.search_runs(text, project_id=project_id, limit=limit)
+
+
+def _is_older_than(timestamp: float, seconds: float) -> bool:
+    return time.time() - timestamp > seconds
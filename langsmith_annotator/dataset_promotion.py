@@ -0,0 +1,234 @@
+"""
+Promotion of annotated runs into LangSmith datasets: the runs of a project,
+session or trace that carry a given feedback key (and value) become dataset
+examples, their inputs/outputs reduced to the user input and final answer
+by the extraction engine. Example IDs are derived from the dataset and the
+run, so promoting the same runs again only adds the ones not copied yet.
+
+Feedback cannot be listed by project, so a promotion first lists the IDs of
+every run in scope (one list_runs page per 100 runs) and then reads their
+feedback in one list_feedback request per FEEDBACK_BATCH_SIZE run IDs. A
+100k-run project costs about 2000 requests, so the CLI and the Streamlit
+app limit whole-project promotions to the last PROMOTION_WINDOW_DAYS days
+unless asked otherwise.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .data_access import SCOPE_QUERY_ARGS, SEARCH_SELECT_FIELDS
+from .extraction import extract
+from .feedback_loader import FEEDBACK_BATCH_SIZE, chunked, load_key_feedback
+
+# Run IDs per list_runs / list_examples request when reading candidates.
+PROMOTION_READ_BATCH_SIZE = 100
+# Examples sent per create_examples request.
+EXAMPLE_BATCH_SIZE = 100
+# Days of runs a whole-project promotion covers by default (0: all).
+PROMOTION_WINDOW_DAYS = 7
+
+
+@dataclass
+class PromotionResult:
+    """Outcome of a promotion. Runs of failed batches are in `failed` and can simply be promoted again."""
+    dataset_id: str = None
+    dataset_name: str = None
+    selected: int = 0
+    created: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+    failed: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed
+
+
+def feedback_matches(fb, value: str = None) -> bool:
+    """Whether a feedback's value, or its score, equals `value` (any feedback when None)."""
+    if value is None or value == "":
+        return True
+    if fb.value is not None and str(fb.value) == value:
+        return True
+    score = getattr(fb, "score", None)
+    if score is None:
+        return False
+    try:
+        return float(score) == float(value)
+    except ValueError:
+        return False
+
+
+def _scope_filter(source) -> dict:
+    scope_filter = {SCOPE_QUERY_ARGS[source.scope]: source.scope_id}
+    if source.scope != "project":
+        scope_filter["project_id"] = source.project_id
+    return scope_filter
+
+
+def source_run_ids(client, source, start_after: datetime = None, loader=None) -> list:
+    """
+    The IDs of the runs of a RunSource, started at or after `start_after`
+    if given, from one ID-only list_runs listing.
+    """
+    list_runs_kwargs = dict(select=["id"], **_scope_filter(source))
+    if start_after is not None:
+        list_runs_kwargs["start_time"] = start_after
+    if loader is not None:
+        runs = loader.stream(client.list_runs, **list_runs_kwargs)
+    else:
+        runs = client.list_runs(**list_runs_kwargs)
+    return [str(run.id) for run in runs]
+
+
+def select_feedback(client, run_ids, feedback_key: str, value: str = None, loader=None) -> dict:
+    """
+    Matching feedback by run ID, for the runs among `run_ids`, from
+    key-filtered list_feedback calls over batches of those run IDs. When a
+    run has several matching annotations, the latest one is kept.
+    """
+    selected = {}
+    for fb in load_key_feedback(client, run_ids, feedback_key, loader=loader):
+        if not feedback_matches(fb, value):
+            continue
+        run_id = str(fb.run_id)
+        current = selected.get(run_id)
+        if current is None or (fb.created_at and current.created_at and fb.created_at > current.created_at):
+            selected[run_id] = fb
+    return selected
+
+
+def _map_settled(loader, fn, items):
+    if loader is not None:
+        return loader.map_settled(fn, items)
+    settled = []
+    for item in items:
+        try:
+            settled.append((fn(item), None))
+        except Exception as e:
+            settled.append((None, e))
+    return settled
+
+
+def load_selected_runs(client, source, run_ids, loader=None):
+    """
+    Reads the runs among `run_ids` that belong to a RunSource, inputs and
+    outputs included, in parallel batched list_runs calls. Returns
+    (runs, failed_run_ids, errors).
+    """
+    scope_filter = _scope_filter(source)
+
+    def read(batch):
+        return list(client.list_runs(run_ids=batch, select=SEARCH_SELECT_FIELDS, **scope_filter))
+
+    batches = list(chunked(run_ids, PROMOTION_READ_BATCH_SIZE))
+    runs, failed, errors = [], [], []
+    for batch, (listed, error) in zip(batches, _map_settled(loader, read, batches)):
+        if error is not None:
+            failed.extend(batch)
+            errors.append(error)
+        else:
+            runs.extend(listed)
+    return runs, failed, errors
+
+
+def get_or_create_dataset(client, name: str, description: str = None):
+    if client.has_dataset(dataset_name=name):
+        return client.read_dataset(dataset_name=name)
+    return client.create_dataset(name, description=description)
+
+
+def example_id(dataset_id, run_id) -> str:
+    """The example ID a run gets in a dataset; the same run always maps to the same example."""
+    return str(uuid.uuid5(uuid.UUID(str(dataset_id)), str(run_id)))
+
+
+def run_to_example(run, dataset_id, fb=None) -> dict:
+    """
+    A create_examples entry for a full run: the extracted user input and
+    final answer, falling back to the raw inputs/outputs for runs the
+    extraction schemas do not cover.
+    """
+    extraction = extract(run)
+    inputs = {"input": extraction.user_input} if extraction.user_input else (getattr(run, "inputs", None) or {})
+    final_output = extraction.final_output
+    outputs = {"output": final_output} if final_output else getattr(run, "outputs", None)
+    metadata = {"source_run_id": str(run.id), "run_name": getattr(run, "name", None)}
+    if fb is not None:
+        metadata.update(feedback_key=fb.key, feedback_value=fb.value, feedback_score=fb.score)
+    return {
+        "id": example_id(dataset_id, run.id),
+        "inputs": inputs,
+        "outputs": outputs,
+        "metadata": metadata,
+        "source_run_id": str(run.id),
+    }
+
+
+def existing_example_ids(client, dataset_id: str, ids, loader=None) -> set:
+    """Which of `ids` already exist in the dataset, from parallel batched list_examples calls."""
+    def read(batch):
+        return [str(example.id) for example in client.list_examples(dataset_id=dataset_id, example_ids=batch)]
+
+    batches = list(chunked(ids, PROMOTION_READ_BATCH_SIZE))
+    found = loader.map(read, batches) if loader is not None else [read(batch) for batch in batches]
+    return {example_id for batch in found for example_id in batch}
+
+
+def promote_runs(client, source, feedback_key: str, dataset_name: str, value: str = None,
+                 description: str = None, start_after: datetime = None, loader=None,
+                 progress=None) -> PromotionResult:
+    """
+    Copies the runs of `source` annotated with `feedback_key` (and `value`,
+    matched against the feedback value or score) into the dataset
+    `dataset_name`, creating it if needed. With `start_after`, only runs
+    started since then are considered; reading feedback costs one request
+    per FEEDBACK_BATCH_SIZE runs considered. Runs already in the dataset are
+    skipped. Examples are created in batches of EXAMPLE_BATCH_SIZE, sent in
+    parallel; a failed batch does not stop the others. `progress`, if
+    given, is called with a short status message between the steps.
+    """
+    report = progress or (lambda message: None)
+    result = PromotionResult(dataset_name=dataset_name)
+
+    run_ids = source_run_ids(client, source, start_after=start_after, loader=loader)
+    since = f" since {start_after:%Y-%m-%d %H:%M}" if start_after else ""
+    batches = -(-len(run_ids) // FEEDBACK_BATCH_SIZE)
+    report(f"{len(run_ids)} run(s) in {source.label or source.scope_id}{since}; "
+           f"reading their feedback in {batches} request(s)")
+    selected_feedback = select_feedback(client, run_ids, feedback_key, value, loader=loader)
+    report(f"{len(selected_feedback)} of them annotated with '{feedback_key}'"
+           + (f" = '{value}'" if value else ""))
+    if not selected_feedback:
+        return result
+    runs, result.failed, result.errors = load_selected_runs(client, source, list(selected_feedback), loader=loader)
+    result.selected = len(runs)
+    if not runs:
+        return result
+
+    dataset = get_or_create_dataset(client, dataset_name, description)
+    result.dataset_id = str(dataset.id)
+    existing = existing_example_ids(client, result.dataset_id,
+                                    [example_id(dataset.id, run.id) for run in runs], loader=loader)
+    examples = []
+    for run in runs:
+        example = run_to_example(run, dataset.id, selected_feedback.get(str(run.id)))
+        if example["id"] in existing:
+            result.skipped.append(str(run.id))
+        else:
+            examples.append(example)
+    report(f"{len(examples)} new example(s), {len(result.skipped)} already in '{dataset_name}'")
+
+    def create(batch):
+        client.create_examples(dataset_id=dataset.id, examples=batch)
+        return batch
+
+    batches = list(chunked(examples, EXAMPLE_BATCH_SIZE))
+    for batch, (_, error) in zip(batches, _map_settled(loader, create, batches)):
+        run_ids = [example["source_run_id"] for example in batch]
+        if error is not None:
+            result.failed.extend(run_ids)
+            result.errors.append(error)
+        else:
+            result.created.extend(run_ids)
+    return result
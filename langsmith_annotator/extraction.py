@@ -0,0 +1,250 @@
+"""
+Pluggable extraction of the readable parts of run payloads: the user's
+input, the final answer and the chat messages. Schemas describe where these
+live for a kind of run as accessor paths, e.g.
+
+    "output.return_values.output"         nested keys
+    "chat_history[type=human][0].content" first list item with type == "human"
+    "messages[-1]"                        last list item
+
+Paths are compiled once when a schema is registered. The schema of a run
+is picked once per (run_type, name) and the extraction of a finished run
+is memoized by run ID, so it is not recomputed when a view is redrawn.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from .keyed_cache import KeyedCache
+
+# Extractions kept in memory, by run ID.
+EXTRACTION_MEMO_SIZE = 10000
+# Distinct (run_type, name) pairs whose schema choice is remembered.
+SCHEMA_MEMO_SIZE = 1024
+
+_STEP = re.compile(r"\.?([^.\[\]]+)|\[(-?\d+)\]|\[([^=\]]+)=([^\]]*)\]")
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ExtractionSchema:
+    """
+    Where the user input, final answer and messages of a kind of run live.
+    A schema applies to runs whose run_type is in `run_types` (any when
+    empty) and whose name contains `name_contains` (any when None). Each
+    field lists candidate paths; the first one that yields a value wins.
+    Input paths are read from the run's inputs, output paths from its outputs.
+    """
+    name: str
+    run_types: tuple = ()
+    name_contains: Optional[str] = None
+    input_paths: tuple = ()
+    output_paths: tuple = ()
+    message_paths: tuple = ()
+
+    def applies_to(self, run_type, run_name) -> bool:
+        if self.run_types and run_type not in self.run_types:
+            return False
+        return self.name_contains is None or self.name_contains in (run_name or "")
+
+
+class Extraction:
+    """What a schema found in one run. Fields are None (or empty) when the run had none."""
+    __slots__ = ("schema", "user_input", "final_output", "messages")
+
+    def __init__(self, schema: str, user_input=None, final_output=None, messages=()):
+        self.schema = schema
+        self.user_input = user_input
+        self.final_output = final_output
+        self.messages = list(messages)
+
+    def __repr__(self):
+        return f"Extraction(schema={self.schema!r}, user_input={self.user_input!r:.40})"
+
+
+def compile_path(path: str):
+    """Compiles an accessor path into a function of a payload returning the value, or _MISSING."""
+    steps = []
+    position = 0
+    while position < len(path):
+        match = _STEP.match(path, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid extraction path {path!r} at position {position}")
+        key, index, filter_key, filter_value = match.groups()
+        if key is not None:
+            steps.append(_key_step(key))
+        elif index is not None:
+            steps.append(_index_step(int(index)))
+        else:
+            steps.append(_filter_step(filter_key, filter_value))
+        position = match.end()
+
+    def access(value):
+        for step in steps:
+            value = step(value)
+            if value is _MISSING:
+                return _MISSING
+        return value
+    return access
+
+
+def _key_step(key):
+    def step(value):
+        return value.get(key, _MISSING) if isinstance(value, dict) else _MISSING
+    return step
+
+
+def _index_step(index):
+    def step(value):
+        if isinstance(value, (list, tuple)) and -len(value) <= index < len(value):
+            return value[index]
+        return _MISSING
+    return step
+
+
+def _filter_step(key, wanted):
+    def step(value):
+        if not isinstance(value, (list, tuple)):
+            return _MISSING
+        return [item for item in value if isinstance(item, dict) and str(item.get(key)) == wanted]
+    return step
+
+
+class _CompiledSchema:
+    __slots__ = ("schema", "inputs", "outputs", "messages")
+
+    def __init__(self, schema: ExtractionSchema):
+        self.schema = schema
+        self.inputs = [compile_path(path) for path in schema.input_paths]
+        self.outputs = [compile_path(path) for path in schema.output_paths]
+        self.messages = [compile_path(path) for path in schema.message_paths]
+
+    def extract(self, run) -> Extraction:
+        inputs = getattr(run, "inputs", None)
+        outputs = getattr(run, "outputs", None)
+        return Extraction(
+            self.schema.name,
+            user_input=_first(self.inputs, inputs),
+            final_output=_first(self.outputs, outputs),
+            messages=_messages(_first(self.messages, inputs)),
+        )
+
+
+def _first(accessors, payload):
+    if payload is None:
+        return None
+    for access in accessors:
+        value = access(payload)
+        if value is not _MISSING and value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _messages(value):
+    """Normalizes a message list into (role, content) pairs."""
+    if not isinstance(value, (list, tuple)):
+        return []
+    messages = []
+    for msg in value:
+        if isinstance(msg, dict):
+            role = msg.get("role") or msg.get("type") or "system"
+            messages.append((role, msg.get("content", msg)))
+        else:
+            messages.append(("system", msg))
+    return messages
+
+
+class ExtractionEngine:
+    """
+    Ordered registry of extraction schemas. The first registered schema
+    that applies to a run is used; the choice is remembered per
+    (run_type, name), and extractions of finished runs per run ID.
+    """
+    def __init__(self, schemas=()):
+        self._schemas = []
+        self._lock = threading.Lock()
+        self._schema_memo = KeyedCache(max_entries=SCHEMA_MEMO_SIZE)
+        self.memo = KeyedCache(max_entries=EXTRACTION_MEMO_SIZE)
+        for schema in schemas:
+            self.register(schema)
+
+    @property
+    def schemas(self):
+        return [compiled.schema for compiled in self._schemas]
+
+    def register(self, schema: ExtractionSchema, first: bool = False):
+        """Adds a schema, by default after the ones already registered; `first` puts it in front."""
+        compiled = _CompiledSchema(schema)
+        with self._lock:
+            self._schemas = [c for c in self._schemas if c.schema.name != schema.name]
+            if first:
+                self._schemas.insert(0, compiled)
+            else:
+                self._schemas.append(compiled)
+        self._schema_memo.clear()
+        self.memo.clear()
+
+    def schema_for(self, run_type, run_name) -> Optional[ExtractionSchema]:
+        compiled = self._compiled_for(run_type, run_name)
+        return compiled.schema if compiled else None
+
+    def _compiled_for(self, run_type, run_name):
+        return self._schema_memo.get_or_load(
+            (run_type, run_name),
+            lambda: next((c for c in self._schemas if c.schema.applies_to(run_type, run_name)), None),
+        )
+
+    def cached(self, run_id) -> Optional[Extraction]:
+        """The memoized extraction of a run, without reading its payload; None if there is none."""
+        return self.memo.get(str(run_id))
+
+    def extract(self, run) -> Extraction:
+        """Extracts the readable parts of a full run (inputs/outputs included)."""
+        run_id = str(getattr(run, "id", ""))
+        extraction = self.memo.get(run_id) if run_id else None
+        if extraction is not None:
+            return extraction
+        compiled = self._compiled_for(getattr(run, "run_type", None), getattr(run, "name", None))
+        extraction = compiled.extract(run) if compiled else Extraction(None)
+        if run_id and getattr(run, "end_time", None) is not None:
+            self.memo.set(run_id, extraction)
+        return extraction
+
+    def extract_many(self, runs):
+        """Extracts a batch of full runs, e.g. a page of payloads as it is loaded. Returns {run_id: Extraction}."""
+        return {str(run.id): self.extract(run) for run in runs}
+
+
+AGENT_EXECUTOR = ExtractionSchema(
+    "agent_executor", run_types=("chain",), name_contains="AgentExecutor",
+    input_paths=("chat_history[type=human][0].content", "input"),
+    output_paths=("output.return_values.output", "output"),
+    message_paths=("chat_history",),
+)
+CHAT_MODEL = ExtractionSchema(
+    "chat_model", run_types=("llm", "chat_model"),
+    input_paths=("messages[role=user][-1].content", "messages[type=human][-1].content", "prompts[-1]"),
+    output_paths=("content", "generations[0][0].text", "generations[0].text"),
+    message_paths=("messages",),
+)
+TOOL = ExtractionSchema(
+    "tool", run_types=("tool",),
+    input_paths=("input", "query"),
+    output_paths=("output", "content"),
+)
+# Catch-all for chains and custom runs without a schema of their own.
+GENERIC = ExtractionSchema(
+    "generic",
+    input_paths=("input", "question", "query", "messages[-1].content"),
+    output_paths=("output", "answer", "content", "result"),
+    message_paths=("messages", "chat_history"),
+)
+
+# Process-wide engine used by the CLI, the Streamlit app and the search index.
+# Custom schemas are added with ENGINE.register(..., first=True).
+ENGINE = ExtractionEngine([AGENT_EXECUTOR, CHAT_MODEL, TOOL, GENERIC])
+
+
+def extract(run) -> Extraction:
+    return ENGINE.extract(run)
@@ -0,0 +1,123 @@
+"""
+Synthetic LangSmith data for local development and benchmarks. The
+FakeClient generates AgentExecutor traces shaped like the ones the
+annotator is built for and serves them through InMemoryClient.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from .memory_client import DEFAULT_PAGE_SIZE, InMemoryClient
+
+FAKE_PROJECT_ID = uuid.UUID("00000000-0000-4000-8000-000000000001")
+USER_QUESTIONS = [
+    "Where is my refund?",
+    "How do I reset my password?",
+    "Can I change my delivery address?",
+    "Why was my card declined?",
+    "Do you ship to Canada?",
+]
+FEEDBACK_KEYS = ["quality", "correctness", "helpfulness"]
+
+
+def _run(run_id, name, run_type, start_time, parent=None, trace_id=None, dotted_order="", inputs=None,
+         outputs=None, tokens=0):
+    return SimpleNamespace(
+        id=run_id,
+        name=name,
+        run_type=run_type,
+        session_id=FAKE_PROJECT_ID,
+        parent_run_id=parent,
+        trace_id=trace_id or run_id,
+        dotted_order=dotted_order,
+        status="success",
+        error=None,
+        start_time=start_time,
+        end_time=start_time + timedelta(seconds=1),
+        inputs=inputs or {},
+        outputs=outputs,
+        extra={},
+        tags=[],
+        prompt_tokens=tokens // 2,
+        completion_tokens=tokens - tokens // 2,
+        total_tokens=tokens,
+    )
+
+
+def _dotted(parent_order: str, start_time: datetime, run_id) -> str:
+    part = start_time.strftime("%Y%m%dT%H%M%S%fZ") + str(run_id)
+    return f"{parent_order}.{part}" if parent_order else part
+
+
+def generate_runs(n_runs: int, children_per_trace: int = 4, seed: int = 0):
+    """
+    Generates about `n_runs` runs: top-level AgentExecutor chains, each with
+    `children_per_trace` child runs (alternating LLM and tool calls) and one
+    nested LLM call under every tool call.
+    """
+    rng = random.Random(seed)
+    runs_per_trace = 1 + children_per_trace + children_per_trace // 2
+    n_traces = max(1, n_runs // runs_per_trace)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    runs = []
+    for t in range(n_traces):
+        start = now - timedelta(minutes=n_traces - t)
+        root_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        question = rng.choice(USER_QUESTIONS)
+        root_order = _dotted("", start, root_id)
+        runs.append(_run(
+            root_id, "AgentExecutor", "chain", start, dotted_order=root_order,
+            inputs={"input": question, "chat_history": [{"type": "human", "content": question}]},
+            outputs={"output": {"return_values": {"output": f"Answer to: {question}"}}},
+        ))
+        for c in range(children_per_trace):
+            child_start = start + timedelta(milliseconds=100 * (c + 1))
+            child_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            is_tool = c % 2 == 1
+            child_order = _dotted(root_order, child_start, child_id)
+            runs.append(_run(
+                child_id, "search_orders" if is_tool else "ChatOpenAI", "tool" if is_tool else "llm",
+                child_start, parent=root_id, trace_id=root_id, dotted_order=child_order,
+                inputs={"messages": [{"role": "user", "content": question}]},
+                outputs={"content": f"step {c} for: {question}"},
+                tokens=0 if is_tool else rng.randint(50, 500),
+            ))
+            if is_tool:
+                nested_start = child_start + timedelta(milliseconds=10)
+                nested_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+                runs.append(_run(
+                    nested_id, "ChatOpenAI", "llm", nested_start, parent=child_id, trace_id=root_id,
+                    dotted_order=_dotted(child_order, nested_start, nested_id),
+                    inputs={"messages": [{"role": "user", "content": question}]},
+                    outputs={"content": "tool summary"}, tokens=rng.randint(50, 500),
+                ))
+    return runs
+
+
+def generate_feedback(runs, feedback_ratio: float = 0.3, seed: int = 0):
+    """Attaches one feedback item to roughly `feedback_ratio` of the runs."""
+    rng = random.Random(seed + 1)
+    feedback = []
+    for run in runs:
+        if rng.random() < feedback_ratio:
+            score = rng.choice([0, 1])
+            feedback.append(SimpleNamespace(
+                id=uuid.UUID(int=rng.getrandbits(128), version=4), run_id=run.id,
+                key=rng.choice(FEEDBACK_KEYS), value="good" if score else "bad", score=score,
+                comment=None, created_at=run.end_time,
+            ))
+    return feedback
+
+
+class FakeClient(InMemoryClient):
+    """
+    A LangSmith stand-in over synthetic data, with configurable size,
+    simulated per-page latency and page size.
+    """
+    def __init__(self, n_runs: int = 1000, children_per_trace: int = 4, feedback_ratio: float = 0.3,
+                 latency_s: float = 0.0, page_size: int = DEFAULT_PAGE_SIZE, seed: int = 0):
+        runs = generate_runs(n_runs, children_per_trace, seed)
+        project = SimpleNamespace(id=FAKE_PROJECT_ID, name="fake-project")
+        super().__init__(project, runs, generate_feedback(runs, feedback_ratio, seed),
+                         page_size=page_size, latency_s=latency_s)
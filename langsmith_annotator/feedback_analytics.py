@@ -0,0 +1,189 @@
+"""
+Aggregated feedback analytics for a project and time window. Feedback is
+bulk-loaded into a pandas DataFrame and folded into running aggregates with
+vectorized group-bys; a refresh only processes feedback that is new, changed
+or deleted since the previous one.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from .data_access import ensure_synced, get_feedback_index
+
+# Default time window of the analytics view, by run start time.
+ANALYTICS_WINDOW_DAYS = 7
+
+FEEDBACK_COLUMNS = ["run_id", "session_id", "key", "value", "score", "annotator", "created_at"]
+
+
+def annotator_of(feedback) -> str:
+    """Best-effort name of whoever left a feedback item (cached feedback has dict sources)."""
+    source = getattr(feedback, "feedback_source", None) or {}
+    for attribute in ("user_name", "user_id", "type"):
+        value = source.get(attribute) if isinstance(source, dict) else getattr(source, attribute, None)
+        if value:
+            return str(value)
+    return "unknown"
+
+
+def value_label(value) -> str:
+    """Feedback values can be strings, numbers, dicts or missing; group them by their text."""
+    return "—" if value is None else str(value)
+
+
+def _version(feedback):
+    """What a refresh compares to tell whether a feedback item changed."""
+    return (
+        getattr(feedback, "modified_at", None) or getattr(feedback, "created_at", None),
+        feedback.key, value_label(getattr(feedback, "value", None)), getattr(feedback, "score", None),
+    )
+
+
+def feedback_frame(feedback, sessions) -> pd.DataFrame:
+    """
+    One row per feedback item, indexed by feedback ID. `sessions` maps run
+    IDs onto the session (trace) they belong to.
+    """
+    rows = {
+        str(fb.id): (
+            str(fb.run_id), sessions.get(str(fb.run_id), str(fb.run_id)), fb.key,
+            value_label(getattr(fb, "value", None)), getattr(fb, "score", None), annotator_of(fb),
+            getattr(fb, "created_at", None),
+        )
+        for fb in feedback
+    }
+    frame = pd.DataFrame.from_dict(rows, orient="index", columns=FEEDBACK_COLUMNS)
+    frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
+    frame["created_at"] = pd.to_datetime(frame["created_at"], utc=True)
+    return frame
+
+
+def _add(total, delta):
+    """Adds (or, with a negated delta, removes) aggregate rows; rows that drop to zero are kept."""
+    if total is None:
+        return delta
+    return total.add(delta, fill_value=0)
+
+
+class FeedbackAnalytics:
+    """
+    Feedback distributions per key, score averages per session and
+    annotator coverage over time for the runs of a project that started in
+    the window. The aggregates are kept as running sums and counts; each
+    refresh folds in the delta against what was processed before.
+    """
+    def __init__(self, project_id: str, days: int = ANALYTICS_WINDOW_DAYS):
+        self.project_id = str(project_id)
+        self.days = days
+        self.frame = feedback_frame([], {})
+        self.runs_in_window = 0
+        self.last_processed = 0
+        self.refreshed_at = None
+        self._versions = {}
+        self._key_values = None
+        self._key_scores = None
+        self._session_scores = None
+        self._coverage = None
+        self._lock = threading.Lock()
+
+    @property
+    def start_after(self):
+        return datetime.now(timezone.utc) - timedelta(days=self.days) if self.days else None
+
+    def refresh(self, client, cache, loader=None) -> int:
+        """
+        Syncs the project's runs and their feedback (both incrementally,
+        through the cache) and folds changed feedback into the aggregates.
+        Returns the number of feedback rows that were processed.
+        """
+        with self._lock:
+            return self._refresh(client, cache, loader)
+
+    def _refresh(self, client, cache, loader):
+        ensure_synced(client, cache, "project", self.project_id, project_id=self.project_id, loader=loader)
+        sessions = cache.get_run_traces("project", self.project_id, start_after=self.start_after)
+        feedback_index = get_feedback_index(client, cache, sessions, loader=loader)
+        current = {str(fb.id): fb for feedback_list in feedback_index.values() for fb in feedback_list}
+
+        changed = [fid for fid, fb in current.items() if self._versions.get(fid) != _version(fb)]
+        changed_ids = set(changed)
+        outdated = [fid for fid in self._versions if fid not in current or fid in changed_ids]
+        if outdated:
+            self._fold(self.frame.loc[outdated], sign=-1)
+            self.frame = self.frame.drop(index=outdated)
+        if changed:
+            added = feedback_frame([current[fid] for fid in changed], sessions)
+            self._fold(added, sign=1)
+            self.frame = pd.concat([self.frame, added]) if len(self.frame) else added
+        for fid in outdated:
+            self._versions.pop(fid, None)
+        self._versions.update((fid, _version(current[fid])) for fid in changed)
+
+        self.runs_in_window = len(sessions)
+        self.last_processed = len(changed) + len(outdated)
+        self.refreshed_at = datetime.now(timezone.utc)
+        return self.last_processed
+
+    def _fold(self, frame: pd.DataFrame, sign: int):
+        if frame.empty:
+            return
+        self._key_values = _add(self._key_values, sign * frame.groupby(["key", "value"]).size())
+        score_aggregates = dict(feedback=("key", "size"), scored=("score", "count"), score_sum=("score", "sum"))
+        self._key_scores = _add(self._key_scores, sign * frame.groupby("key").agg(**score_aggregates))
+        self._session_scores = _add(self._session_scores, sign * frame.groupby("session_id").agg(**score_aggregates))
+        day = frame["created_at"].dt.floor("D").rename("day")
+        self._coverage = _add(self._coverage, sign * frame.groupby([day, frame["annotator"]]).size())
+
+    # --- Results ---
+
+    def key_distribution(self) -> pd.DataFrame:
+        """Feedback counts per key (rows) and value (columns)."""
+        if self._key_values is None:
+            return pd.DataFrame()
+        counts = self._key_values[self._key_values > 0].astype("int64")
+        return counts.unstack(fill_value=0)
+
+    @staticmethod
+    def _with_mean(aggregates) -> pd.DataFrame:
+        if aggregates is None:
+            return pd.DataFrame(columns=["feedback", "scored", "mean_score"])
+        aggregates = aggregates[aggregates["feedback"] > 0]
+        return pd.DataFrame({
+            "feedback": aggregates["feedback"].astype("int64"),
+            "scored": aggregates["scored"].astype("int64"),
+            "mean_score": aggregates["score_sum"] / aggregates["scored"].where(aggregates["scored"] > 0),
+        })
+
+    def key_scores(self) -> pd.DataFrame:
+        """Number of feedback items, scored items and the mean score per key."""
+        return self._with_mean(self._key_scores)
+
+    def session_scores(self) -> pd.DataFrame:
+        """Number of feedback items and the mean score per session (trace), most annotated first."""
+        return self._with_mean(self._session_scores).sort_values("feedback", ascending=False)
+
+    def coverage(self) -> pd.DataFrame:
+        """Feedback items per day (rows) and annotator (columns)."""
+        if self._coverage is None:
+            return pd.DataFrame()
+        counts = self._coverage[self._coverage > 0].astype("int64")
+        return counts.unstack(fill_value=0).sort_index()
+
+    def annotated_runs(self) -> int:
+        return int(self.frame["run_id"].nunique())
+
+    def report(self) -> str:
+        """Plain-text report of all aggregates, used by the CLI."""
+        window = f"last {self.days} day(s)" if self.days else "all time"
+        ratio = self.annotated_runs() / self.runs_in_window if self.runs_in_window else 0.0
+        sections = [
+            f"Project {self.project_id}, {window}: {len(self.frame)} feedback item(s) on "
+            f"{self.annotated_runs()} of {self.runs_in_window} run(s) ({ratio:.1%} annotated).",
+            "Feedback per key and value:\n" + self.key_distribution().to_string(),
+            "Scores per key:\n" + self.key_scores().to_string(float_format="{:.2f}".format),
+            "Top sessions by feedback:\n"
+            + self.session_scores().head(10).to_string(float_format="{:.2f}".format),
+            "Feedback per day and annotator:\n" + self.coverage().to_string(),
+        ]
+        return "\n\n".join(sections)
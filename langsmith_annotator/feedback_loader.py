@@ -0,0 +1,73 @@
+"""Batched feedback loading shared by the CLI and the Streamlit app."""
+from .models import PartialIndex
+
+# Run IDs are sent as repeated query parameters, so keep each request well
+# below common URL length limits.
+FEEDBACK_BATCH_SIZE = 100
+
+
+def chunked(items, size: int):
+    """Yields successive lists of at most `size` items."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_batch(client, batch):
+    return list(client.list_feedback(run_ids=batch))
+
+
+def load_key_feedback(client, run_ids, feedback_key: str, batch_size: int = FEEDBACK_BATCH_SIZE, loader=None):
+    """
+    Returns the feedback with `feedback_key` on the given runs, from
+    key-filtered `list_feedback` calls over chunks of run IDs (in parallel
+    with a ConcurrentLoader), so the listing stays bounded by those runs.
+    """
+    batches = list(chunked(dict.fromkeys(str(run_id) for run_id in run_ids), batch_size))
+
+    def load(batch):
+        return list(client.list_feedback(run_ids=batch, feedback_key=[feedback_key]))
+
+    results = loader.map(load, batches) if loader is not None else [load(batch) for batch in batches]
+    return [fb for feedback_list in results for fb in feedback_list]
+
+
+def load_feedback_index(client, run_ids, batch_size: int = FEEDBACK_BATCH_SIZE, loader=None,
+                        partial: bool = False):
+    """
+    Fetches feedback for all given run IDs in chunked `list_feedback` calls
+    and groups it by run ID. Every requested run ID is present in the result,
+    mapped to an empty list when it has no feedback.
+
+    With a ConcurrentLoader the chunks are fetched in parallel; the merged
+    result is the same as fetching them one after another. With `partial`
+    a failed chunk does not raise: the result is a PartialIndex without the
+    runs of that chunk, which are listed in its `missing` set instead.
+    """
+    run_ids = list(dict.fromkeys(str(run_id) for run_id in run_ids))
+    batches = list(chunked(run_ids, batch_size))
+    if loader is not None and partial:
+        settled = loader.map_settled(lambda batch: _load_batch(client, batch), batches)
+    elif loader is not None:
+        settled = [(result, None) for result in loader.map(lambda batch: _load_batch(client, batch), batches)]
+    else:
+        settled = []
+        for batch in batches:
+            try:
+                settled.append((_load_batch(client, batch), None))
+            except Exception as e:
+                if not partial:
+                    raise
+                settled.append((None, e))
+
+    index = PartialIndex()
+    for batch, (feedback_list, error) in zip(batches, settled):
+        if error is not None:
+            index.missing.update(batch)
+            index.errors.append(error)
+            continue
+        for run_id in batch:
+            index.setdefault(run_id, [])
+        for fb in feedback_list:
+            index.setdefault(str(fb.run_id), []).append(fb)
+    return index
@@ -0,0 +1,141 @@
+"""Background queue that submits annotations in batches with retries."""
+import queue
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional
+
+from .concurrent_loader import call_with_retry, status_code_of
+
+FEEDBACK_BATCH_SIZE = 20
+# Failed submissions kept around for display.
+MAX_FAILURES_KEPT = 200
+
+
+@dataclass
+class FeedbackSubmission:
+    """One annotation waiting to be sent. The feedback ID is generated locally
+    so that retries cannot create duplicates."""
+    run_id: str
+    key: str
+    value: Optional[str] = None
+    score: Optional[float] = None
+    comment: Optional[str] = None
+    feedback_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    def as_feedback(self):
+        """A stand-in for the created feedback, used to patch caches before the API answers."""
+        return SimpleNamespace(
+            id=self.feedback_id, run_id=self.run_id, key=self.key, value=self.value,
+            score=self.score, comment=self.comment, created_at=datetime.now(timezone.utc),
+        )
+
+
+class FeedbackQueue:
+    """
+    Accepts annotations without blocking and submits them from a background
+    thread, `batch_size` at a time (in parallel when a ConcurrentLoader is
+    given), retrying 429/5xx. Each submission is written to the cache
+    optimistically as pending feedback, which feedback refreshes keep. It is
+    confirmed once sent and removed again if it ultimately fails; `on_change`,
+    if given, is called with the run ID whenever that happens so that
+    in-memory caches can drop just that run's entry.
+    """
+    def __init__(self, client, cache=None, loader=None, batch_size: int = FEEDBACK_BATCH_SIZE,
+                 on_change=None):
+        self.client = client
+        self.cache = cache
+        self.loader = loader
+        self.on_change = on_change
+        self.batch_size = batch_size
+        self.succeeded = 0
+        self.failures = deque(maxlen=MAX_FAILURES_KEPT)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="feedback-queue", daemon=True)
+        self._worker.start()
+
+    def submit(self, submission: FeedbackSubmission) -> FeedbackSubmission:
+        if self.cache is not None:
+            self.cache.add_feedback(submission.as_feedback(), pending=True)
+        if self.on_change is not None:
+            self.on_change(submission.run_id)
+        self._queue.put(submission)
+        return submission
+
+    def submit_many(self, submissions):
+        return [self.submit(submission) for submission in submissions]
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        """Blocks until every queued submission has been sent or has failed."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._send_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send_batch(self, batch):
+        if self.loader is not None:
+            futures = [(s, self.loader.submit(self._create, s)) for s in batch]
+            outcomes = []
+            for submission, future in futures:
+                try:
+                    future.result()
+                    outcomes.append((submission, None))
+                except Exception as e:
+                    outcomes.append((submission, e))
+        else:
+            outcomes = []
+            for submission in batch:
+                try:
+                    call_with_retry(self._create, submission)
+                    outcomes.append((submission, None))
+                except Exception as e:
+                    outcomes.append((submission, e))
+
+        for submission, error in outcomes:
+            with self._lock:
+                if error is None:
+                    self.succeeded += 1
+                else:
+                    self.failures.append((submission, error))
+            if self.cache is not None:
+                if error is None:
+                    self.cache.confirm_feedback(submission.feedback_id)
+                else:
+                    self.cache.delete_feedback(submission.feedback_id)
+            if error is not None and self.on_change is not None:
+                self.on_change(submission.run_id)
+
+    def _create(self, submission: FeedbackSubmission):
+        try:
+            return self.client.create_feedback(
+                run_id=submission.run_id,
+                key=submission.key,
+                value=submission.value,
+                score=submission.score,
+                comment=submission.comment,
+                feedback_id=submission.feedback_id,
+            )
+        except Exception as e:
+            # A retry of a request whose response was lost; the feedback exists.
+            if status_code_of(e) == 409:
+                return None
+            raise
@@ -0,0 +1,268 @@
+"""
+Request-level instrumentation for LangSmith calls: per-method latency, page
+count and payload size histograms, plus cache hit/miss counters, with a
+plain-text summary and Prometheus text exposition output.
+"""
+import bisect
+import functools
+import math
+import threading
+import time
+from collections import defaultdict
+
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PAGE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+# Page size langsmith uses when paging through list endpoints; used to
+# estimate pages when the client does not expose its HTTP responses.
+ASSUMED_PAGE_SIZE = 100
+
+# Client methods that are not API calls and are passed through untouched.
+UNINSTRUMENTED = frozenset({"session", "api_url", "api_key"})
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-quantile (inf if above the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class Metrics:
+    """Thread-safe registry of call and cache metrics."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS_S))
+        self.pages = defaultdict(lambda: Histogram(PAGE_BUCKETS))
+        self.payload_bytes = defaultdict(lambda: Histogram(BYTES_BUCKETS))
+        self.errors = defaultdict(int)
+        self.cache = defaultdict(int)  # (cache name, "hit" | "miss") -> count
+        self.timings = defaultdict(lambda: Histogram(LATENCY_BUCKETS_S))
+
+    def record_call(self, method: str, seconds: float, pages: int, payload_bytes: int, error: bool = False):
+        with self._lock:
+            self.latency[method].observe(seconds)
+            self.pages[method].observe(pages)
+            if payload_bytes:
+                self.payload_bytes[method].observe(payload_bytes)
+            if error:
+                self.errors[method] += 1
+
+    def record_cache(self, name: str, hit: bool, count: int = 1):
+        with self._lock:
+            self.cache[(name, "hit" if hit else "miss")] += count
+
+    def record_timing(self, name: str, seconds: float):
+        """Records a non-API duration, e.g. a Streamlit rerun."""
+        with self._lock:
+            self.timings[name].observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            for table in (self.latency, self.pages, self.payload_bytes, self.errors, self.cache, self.timings):
+                table.clear()
+
+    def rows(self):
+        """One summary dict per API method, slowest total time first."""
+        with self._lock:
+            rows = [
+                {
+                    "method": method,
+                    "calls": hist.count,
+                    "errors": self.errors.get(method, 0),
+                    "total_s": round(hist.sum, 3),
+                    "mean_ms": round(hist.mean * 1000, 1),
+                    "p95_ms": round(hist.quantile(0.95) * 1000, 1),
+                    "pages": int(self.pages[method].sum),
+                    "payload_kb": round(self.payload_bytes[method].sum / 1000, 1)
+                                  if method in self.payload_bytes else None,
+                }
+                for method, hist in self.latency.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def cache_rows(self):
+        with self._lock:
+            names = sorted({name for name, _ in self.cache})
+            return [
+                {"cache": name, "hits": self.cache.get((name, "hit"), 0), "misses": self.cache.get((name, "miss"), 0)}
+                for name in names
+            ]
+
+    def summary(self) -> str:
+        """Plain-text table for the CLI --profile flag."""
+        lines = [f"{'method':<20} {'calls':>6} {'errors':>6} {'total s':>9} {'mean ms':>9} "
+                 f"{'p95 ms':>9} {'pages':>6} {'payload kB':>11}"]
+        for row in self.rows():
+            payload = f"{row['payload_kb']:.1f}" if row["payload_kb"] is not None else "n/a"
+            lines.append(f"{row['method']:<20} {row['calls']:>6} {row['errors']:>6} {row['total_s']:>9.3f} "
+                         f"{row['mean_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['pages']:>6} {payload:>11}")
+        for row in self.cache_rows():
+            total = row["hits"] + row["misses"]
+            lines.append(f"cache {row['cache']}: {row['hits']}/{total} hits")
+        return "\n".join(lines)
+
+    def render_prometheus(self, prefix: str = "langsmith_annotator") -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        out = []
+        with self._lock:
+            for name, table, label, help_text in (
+                ("call_duration_seconds", self.latency, "method", "Latency of LangSmith API calls."),
+                ("call_pages", self.pages, "method", "Pages fetched per LangSmith API call."),
+                ("call_payload_bytes", self.payload_bytes, "method", "Response bytes per LangSmith API call."),
+                ("duration_seconds", self.timings, "name", "Durations of non-API work."),
+            ):
+                if not table:
+                    continue
+                metric = f"{prefix}_{name}"
+                out.append(f"# HELP {metric} {help_text}")
+                out.append(f"# TYPE {metric} histogram")
+                for key, hist in sorted(table.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + (math.inf,), hist.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else repr(float(bound))
+                        out.append(f'{metric}_bucket{{{label}="{key}",le="{le}"}} {cumulative}')
+                    out.append(f'{metric}_sum{{{label}="{key}"}} {hist.sum}')
+                    out.append(f'{metric}_count{{{label}="{key}"}} {hist.count}')
+            if self.errors:
+                metric = f"{prefix}_call_errors_total"
+                out.append(f"# HELP {metric} Failed LangSmith API calls.")
+                out.append(f"# TYPE {metric} counter")
+                for method, count in sorted(self.errors.items()):
+                    out.append(f'{metric}{{method="{method}"}} {count}')
+            if self.cache:
+                metric = f"{prefix}_cache_requests_total"
+                out.append(f"# HELP {metric} Cache lookups by result.")
+                out.append(f"# TYPE {metric} counter")
+                for (name, result), count in sorted(self.cache.items()):
+                    out.append(f'{metric}{{cache="{name}",result="{result}"}} {count}')
+        return "\n".join(out) + "\n"
+
+
+# Process-wide registry used by default.
+METRICS = Metrics()
+
+
+def record_cache(name: str, hit: bool, count: int = 1):
+    """Records lookups of a local cache in the process-wide registry."""
+    if count:
+        METRICS.record_cache(name, hit, count)
+
+
+class _CallContext:
+    __slots__ = ("pages", "payload_bytes", "http_seen")
+
+    def __init__(self):
+        self.pages = 0
+        self.payload_bytes = 0
+        self.http_seen = False
+
+
+class InstrumentedClient:
+    """
+    Wraps a client and records every API method call in `metrics`.
+
+    For the real langsmith Client, pages and payload bytes come from a
+    response hook on its HTTP session, attributed to the call running on
+    the same thread. For clients without one (fake/offline), pages are
+    estimated from the number of items returned. Iterators returned by
+    list_* methods are timed only while they are being advanced, so time
+    spent by the caller between pages is not counted.
+    """
+    def __init__(self, client, metrics: Metrics = METRICS):
+        self._client = client
+        self._metrics = metrics
+        self._local = threading.local()
+        session = getattr(client, "session", None)
+        hooks = getattr(session, "hooks", None)
+        if isinstance(hooks, dict):
+            hooks.setdefault("response", []).append(self._on_response)
+
+    @property
+    def wrapped(self):
+        return self._client
+
+    def _on_response(self, response, *args, **kwargs):
+        context = getattr(self._local, "context", None)
+        if context is not None:
+            context.pages += 1
+            context.http_seen = True
+            length = response.headers.get("Content-Length")
+            context.payload_bytes += int(length) if length else len(response.content or b"")
+        return response
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or name in UNINSTRUMENTED or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def instrumented(*args, **kwargs):
+            context = _CallContext()
+            started = time.perf_counter()
+            try:
+                result = self._run(context, attr, *args, **kwargs)
+            except Exception:
+                self._finish(name, context, time.perf_counter() - started, 0, error=True)
+                raise
+            if hasattr(result, "__next__"):
+                return self._iterate(name, context, result, time.perf_counter() - started)
+            self._finish(name, context, time.perf_counter() - started, 1)
+            return result
+        return instrumented
+
+    def _run(self, context, fn, *args, **kwargs):
+        previous = getattr(self._local, "context", None)
+        self._local.context = context
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.context = previous
+
+    def _iterate(self, name, context, iterator, elapsed):
+        items = 0
+        error = False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = self._run(context, next, iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - started
+                    return
+                elapsed += time.perf_counter() - started
+                items += 1
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._finish(name, context, elapsed, items, error=error)
+
+    def _finish(self, name, context, elapsed, items, error=False):
+        pages = context.pages if context.http_seen else max(1, math.ceil(items / ASSUMED_PAGE_SIZE))
+        self._metrics.record_call(name, elapsed, pages, context.payload_bytes, error=error)
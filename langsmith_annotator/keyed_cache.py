@@ -0,0 +1,88 @@
+"""Thread-safe, size-bounded LRU cache with per-key and per-tag invalidation."""
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 2048
+
+_MISSING = object()
+
+
+class KeyedCache:
+    """
+    Maps hashable keys to values, evicting the least recently used entry once
+    `max_entries` is exceeded. Entries can carry tags (e.g. "session:<id>")
+    so that everything belonging to one session can be dropped without
+    touching the rest of the cache. Entries expire after `ttl_s` seconds,
+    which can be overridden per entry.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_s: float = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at, tags)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] is not None and time.time() > entry[1]:
+                self._remove(key)
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, tags=(), ttl_s: float = None):
+        ttl_s = self.ttl_s if ttl_s is None else ttl_s
+        expires_at = time.time() + ttl_s if ttl_s is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            tags = frozenset(tags)
+            self._entries[key] = (value, expires_at, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def get_or_load(self, key, load, tags=(), ttl_s: float = None):
+        """Returns the cached value for `key`, calling `load()` and caching its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = load()
+            self.set(key, value, tags, ttl_s)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tag(self, tag):
+        """Drops every entry stored with `tag`."""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -0,0 +1,159 @@
+"""
+Live tail of a project: polls for sessions that started after a start-time
+watermark and for feedback added to watched runs since the last poll, so
+new traffic shows up without re-listing the whole session list. The poll
+interval shrinks while there is activity and grows while there is none.
+"""
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+
+from .data_access import get_feedback_index
+from .models import Session
+from .session_discovery import AGENT_EXECUTOR_SESSIONS, discover_sessions
+
+TAIL_MIN_INTERVAL_SECONDS = 2.0
+TAIL_MAX_INTERVAL_SECONDS = 30.0
+# Growth of the interval after every poll that found nothing new.
+TAIL_IDLE_BACKOFF = 1.5
+# Sessions listed per window and poll at most. When a poll is cut short, the
+# unlisted part of its window is kept and listed over the next polls.
+TAIL_MAX_NEW_SESSIONS = 100
+# Sessions kept in the tailed list; the oldest ones drop off the end.
+TAIL_MAX_SESSIONS = 200
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class TailUpdate:
+    """What one poll found: sessions that are new to the list, and feedback not seen before."""
+    sessions: list = field(default_factory=list)
+    feedback: list = field(default_factory=list)
+    error: Exception = None
+
+    def __bool__(self):
+        return bool(self.sessions or self.feedback)
+
+
+class LiveTail:
+    """
+    Keeps `sessions` (newest first) current for a project and session query.
+
+    Each poll lists only the sessions that started at or after the newest
+    one already known, plus one window of the backlog left when an earlier
+    listing hit TAIL_MAX_NEW_SESSIONS. Feedback is refreshed, in batched
+    requests, only for the `watch`ed runs and the sessions that poll found;
+    the rest of the list is not re-read. Feedback IDs seen before are not
+    reported again. After a poll with news the interval drops back to
+    `min_interval`; after an idle or failed one it grows by
+    TAIL_IDLE_BACKOFF up to `max_interval`.
+    """
+    def __init__(self, project_id: str, query=AGENT_EXECUTOR_SESSIONS, sessions=(),
+                 min_interval: float = TAIL_MIN_INTERVAL_SECONDS, max_interval: float = TAIL_MAX_INTERVAL_SECONDS):
+        self.project_id = str(project_id)
+        self.query = query
+        self.sessions = list(sessions)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.polls = 0
+        self.last_poll = None
+        self.last_error = None
+        self._known_ids = {str(s.id) for s in self.sessions}
+        self._seen_feedback = set()
+        self._polled_runs = set()
+        # (start_after, start_before) windows of older sessions still to list, newest first.
+        self._backlog = []
+        self._watermark = max((_session_time(s) for s in self.sessions if _session_time(s)),
+                              default=datetime.now(timezone.utc))
+        self._next_poll = time.monotonic()
+        self._lock = threading.Lock()
+
+    def next_poll_in(self) -> float:
+        """Seconds until the next poll is due (0 when it is due now)."""
+        return max(0.0, self._next_poll - time.monotonic())
+
+    def due(self) -> bool:
+        return self.next_poll_in() == 0
+
+    def poll(self, client, cache, watch=(), loader=None) -> TailUpdate:
+        """
+        Fetches what is new since the last poll and prepends new sessions to
+        `sessions`. Errors do not raise: they are returned on the update and
+        slow the tail down like an idle poll.
+        """
+        with self._lock:
+            update = TailUpdate()
+            try:
+                update.sessions = self._poll_sessions(client, loader)
+                update.feedback = self._poll_feedback(client, cache, update.sessions, watch, loader)
+            except Exception as e:
+                update.error = e
+            self.polls += 1
+            self.last_poll = datetime.now(timezone.utc)
+            self.last_error = update.error
+            if update:
+                self.interval = self.min_interval
+            elif self.polls > 1:
+                self.interval = min(self.max_interval, self.interval * TAIL_IDLE_BACKOFF)
+            self._next_poll = time.monotonic() + self.interval
+            return update
+
+    def _poll_sessions(self, client, loader):
+        start_after = max(filter(None, (_aware(self.query.start_after), self._watermark)))
+        head, head_rest = self._discover(client, loader, start_after, self.query.start_before)
+        found, backlog = list(head), self._backlog[1:]
+        if self._backlog:
+            gap, gap_rest = self._discover(client, loader, *self._backlog[0])
+            found.extend(gap)
+            backlog = [gap_rest] + backlog if gap_rest else backlog
+        self._backlog = [head_rest] + backlog if head_rest else backlog
+
+        new = list({str(s.id): s for s in found if str(s.id) not in self._known_ids}.values())
+        if not new:
+            return []
+        new.sort(key=lambda s: _session_time(s) or _EPOCH, reverse=True)
+        self._known_ids.update(str(s.id) for s in new)
+        self._watermark = max([self._watermark] + [_session_time(s) for s in head if _session_time(s)])
+        self.sessions = sorted(new + self.sessions, key=lambda s: _session_time(s) or _EPOCH,
+                               reverse=True)[:TAIL_MAX_SESSIONS]
+        return new
+
+    def _discover(self, client, loader, start_after, start_before):
+        """
+        Sessions that started in [start_after, start_before), newest first, and
+        the part of that window left unlisted when the listing was cut short.
+        """
+        query = replace(self.query, start_after=start_after, start_before=start_before)
+        discovery = discover_sessions(client, self.project_id, TAIL_MAX_NEW_SESSIONS, query, loader=loader)
+        truncated = (len(discovery.sessions) >= TAIL_MAX_NEW_SESSIONS
+                     or bool(query.max_scan and discovery.scanned_runs >= query.max_scan))
+        earliest = _aware(discovery.earliest)
+        rest = (start_after, earliest) if truncated and earliest is not None and earliest > start_after else None
+        return [Session.from_dict(data) for data in discovery.sessions], rest
+
+    def _poll_feedback(self, client, cache, new_sessions, watch, loader):
+        run_ids = list(dict.fromkeys([str(s.id) for s in new_sessions] + [str(run_id) for run_id in watch]))
+        if not run_ids:
+            return []
+        feedback_index = get_feedback_index(client, cache, run_ids, refresh=True, loader=loader)
+        current = {str(fb.id): fb for feedback_list in feedback_index.values() for fb in feedback_list}
+        # Feedback of runs polled for the first time already existed; it is only learned.
+        first_seen = set(run_ids) - self._polled_runs
+        new = [fb for fid, fb in current.items()
+               if fid not in self._seen_feedback and str(fb.run_id) not in first_seen]
+        self._seen_feedback.update(current)
+        self._polled_runs.update(run_ids)
+        return new
+
+
+def _session_time(session):
+    return _aware(session.start_time or session.created_at)
+
+
+def _aware(value):
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value if isinstance(value, datetime) else None
@@ -0,0 +1,209 @@
+"""
+In-memory implementation of the parts of the langsmith Client API the
+annotator uses. Shared by the OfflineClient (export files) and the
+FakeClient (synthetic data).
+"""
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class InMemoryClient:
+    """
+    Serves a project's runs and feedback from memory. list_runs supports the
+    keyword filters the annotator uses; `filter` query strings are not
+    evaluated, so callers re-check their predicates locally. It takes no
+    keyword arguments the real list_runs lacks, so a call LangSmith would
+    not understand fails here too.
+
+    Datasets and examples are kept in memory only, for the lifetime of the
+    client. Listings are returned in pages of `page_size`, each page costing
+    `latency_s` of simulated network time; `requests` counts calls (and
+    pages) per method.
+    """
+    def __init__(self, project, runs, feedback=(), page_size: int = DEFAULT_PAGE_SIZE, latency_s: float = 0.0):
+        self.project = project
+        self.page_size = page_size
+        self.latency_s = latency_s
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._runs = sorted(
+            runs,
+            key=lambda r: r.start_time or datetime.min.replace(tzinfo=timezone.utc),
+            reverse=True,
+        )
+        self._runs_by_id = {str(r.id): r for r in self._runs}
+        self._feedback = defaultdict(list)
+        for fb in feedback:
+            self._feedback[str(fb.run_id)].append(fb)
+        self._datasets = {}
+        self._examples = defaultdict(dict)
+
+    def _request(self, method: str):
+        with self._lock:
+            self.requests[method] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _paged(self, method: str, items):
+        """Yields items lazily, charging one request per page like the real client."""
+        position = 0
+        for item in items:
+            if position % self.page_size == 0:
+                self._request(method)
+            yield item
+            position += 1
+        if position == 0:
+            self._request(method)
+
+    def reset_stats(self):
+        self.requests.clear()
+
+    # --- Projects ---
+
+    def list_projects(self, limit: int = None, **kwargs):
+        self._request("list_projects")
+        return iter([self.project])
+
+    # --- Runs ---
+
+    def read_run(self, run_id, **kwargs):
+        self._request("read_run")
+        return self._runs_by_id[str(run_id)]
+
+    def list_runs(self, *, project_id=None, project_name=None, run_type=None, trace_id=None,
+                  reference_example_id=None, query=None, filter=None, trace_filter=None, tree_filter=None,
+                  is_root=None, parent_run_id=None, start_time=None, error=None, run_ids=None,
+                  limit=None, execution_order=None, select=None):
+        runs = self._filter_runs(
+            project_id=project_id, run_type=run_type, trace_id=trace_id, is_root=is_root,
+            parent_run_id=parent_run_id, start_time=start_time, error=error, run_ids=run_ids,
+            limit=limit, execution_order=execution_order,
+        )
+        if select is not None:
+            fields = set(select) | {"id"}
+            runs = (SimpleNamespace(**{k: v for k, v in vars(run).items() if k in fields}) for run in runs)
+        return self._paged("list_runs", runs)
+
+    def _filter_runs(self, *, project_id, run_type, trace_id, is_root, parent_run_id, start_time, error,
+                     run_ids, limit, execution_order):
+        if project_id is not None and str(project_id) != str(self.project.id):
+            return
+        if execution_order == 1:
+            is_root = True
+        wanted_ids = {str(run_id) for run_id in run_ids} if run_ids is not None else None
+        if start_time is not None and start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=timezone.utc)
+
+        candidates = self._runs
+        if wanted_ids is not None:
+            candidates = [self._runs_by_id[run_id] for run_id in wanted_ids if run_id in self._runs_by_id]
+
+        returned = 0
+        for run in candidates:
+            if parent_run_id is not None and str(run.parent_run_id) != str(parent_run_id):
+                continue
+            if trace_id is not None and str(run.trace_id) != str(trace_id):
+                continue
+            if is_root is not None and (run.parent_run_id is None) != is_root:
+                continue
+            if run_type is not None and run.run_type != run_type:
+                continue
+            if error is not None and bool(run.error) != error:
+                continue
+            if start_time is not None and (run.start_time is None or run.start_time < start_time):
+                continue
+            yield run
+            returned += 1
+            if limit is not None and returned >= limit:
+                return
+
+    # --- Feedback ---
+
+    def list_feedback(self, *, run_ids=None, feedback_key=None, limit=None, **kwargs):
+        return self._paged("list_feedback", self._filter_feedback(run_ids, feedback_key, limit))
+
+    def _filter_feedback(self, run_ids, feedback_key, limit):
+        if run_ids is None:
+            candidates = [fb for fbs in list(self._feedback.values()) for fb in list(fbs)]
+        else:
+            candidates = [fb for run_id in run_ids for fb in list(self._feedback.get(str(run_id), ()))]
+        if feedback_key is not None:
+            keys = set(feedback_key) if isinstance(feedback_key, (list, tuple, set)) else {feedback_key}
+            candidates = [fb for fb in candidates if fb.key in keys]
+        return candidates[:limit] if limit is not None else candidates
+
+    def create_feedback(self, run_id, key, *, score=None, value=None, comment=None, feedback_id=None,
+                        **kwargs):
+        self._request("create_feedback")
+        fb = SimpleNamespace(
+            id=uuid.UUID(str(feedback_id)) if feedback_id else uuid.uuid4(),
+            run_id=uuid.UUID(str(run_id)), key=key, value=value, score=score, comment=comment,
+            created_at=datetime.now(timezone.utc),
+        )
+        with self._lock:
+            self._feedback[str(run_id)].append(fb)
+        self._feedback_created(fb)
+        return fb
+
+    def _feedback_created(self, fb):
+        """Hook for subclasses that persist new feedback."""
+
+    # --- Datasets ---
+
+    def has_dataset(self, *, dataset_name=None, dataset_id=None):
+        self._request("read_dataset")
+        return any(self._dataset_matches(ds, dataset_name, dataset_id) for ds in self._datasets.values())
+
+    def read_dataset(self, *, dataset_name=None, dataset_id=None):
+        self._request("read_dataset")
+        for ds in self._datasets.values():
+            if self._dataset_matches(ds, dataset_name, dataset_id):
+                return ds
+        raise LookupError(f"Dataset {dataset_name or dataset_id} not found")
+
+    @staticmethod
+    def _dataset_matches(ds, dataset_name, dataset_id):
+        return (dataset_id is not None and str(ds.id) == str(dataset_id)) or (
+            dataset_name is not None and ds.name == dataset_name)
+
+    def create_dataset(self, dataset_name, *, description=None, **kwargs):
+        self._request("create_dataset")
+        with self._lock:
+            if any(ds.name == dataset_name for ds in self._datasets.values()):
+                raise ValueError(f"Dataset {dataset_name} already exists")
+            ds = SimpleNamespace(id=uuid.uuid4(), name=dataset_name, description=description,
+                                 created_at=datetime.now(timezone.utc))
+            self._datasets[str(ds.id)] = ds
+        return ds
+
+    def list_examples(self, *, dataset_id=None, example_ids=None, limit=None, **kwargs):
+        examples = list(self._examples.get(str(dataset_id), {}).values())
+        if example_ids is not None:
+            wanted = {str(example_id) for example_id in example_ids}
+            examples = [example for example in examples if str(example.id) in wanted]
+        return self._paged("list_examples", examples[:limit] if limit is not None else examples)
+
+    def create_examples(self, *, dataset_id=None, examples=(), **kwargs):
+        self._request("create_examples")
+        created = [
+            SimpleNamespace(
+                id=uuid.UUID(str(example.get("id"))) if example.get("id") else uuid.uuid4(),
+                dataset_id=uuid.UUID(str(dataset_id)), inputs=example.get("inputs"),
+                outputs=example.get("outputs"), metadata=example.get("metadata"),
+                source_run_id=example.get("source_run_id"), created_at=datetime.now(timezone.utc),
+            )
+            for example in examples
+        ]
+        with self._lock:
+            stored = self._examples[str(dataset_id)]
+            conflicts = [str(example.id) for example in created if str(example.id) in stored]
+            if conflicts:
+                raise ValueError(f"Examples already exist: {', '.join(conflicts)}")
+            stored.update((str(example.id), example) for example in created)
+        return {"example_ids": [str(example.id) for example in created], "count": len(created)}
@@ -0,0 +1,76 @@
+"""
+Several projects or sessions viewed as one listing. Their runs are synced
+concurrently, then merged newest first with a k-way heap merge over the
+cached listings, which are already ordered by start time.
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from .data_access import ensure_synced
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class RunSource:
+    """One listing taking part in a merged view: a whole project or a session in one."""
+    scope: str
+    scope_id: str
+    project_id: str
+    label: str = ""
+
+
+def project_source(project) -> RunSource:
+    return RunSource("project", str(project.id), str(project.id), label=getattr(project, "name", None) or str(project.id))
+
+
+def session_source(session, project_id: str, scope: str = "trace") -> RunSource:
+    """A session of a project; `scope` is the cache scope its runs are listed by."""
+    return RunSource(scope, str(session.id), str(project_id), label=getattr(session, "name", None) or str(session.id))
+
+
+def sync_sources(client, cache, loader, sources, refresh: bool = False) -> dict:
+    """
+    Brings the cached listings of all sources up to date concurrently.
+    Returns {source: exception} for the sources that failed, so the others
+    can still be shown.
+    """
+    futures = {
+        source: loader.submit(ensure_synced, client, cache, source.scope, source.scope_id,
+                              project_id=source.project_id, refresh=refresh)
+        for source in sources
+    }
+    failures = {}
+    for source, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            failures[source] = e
+    return failures
+
+
+def _tagged(source, runs):
+    for run in runs:
+        yield source, run
+
+
+def _start_time(item):
+    return item[1].start_time or _EPOCH
+
+
+def merge_by_time(streams):
+    """
+    Merges (source, runs) streams whose runs are ordered newest first into
+    one stream of (source, run), newest first. Only the head of every
+    stream is held in the heap, so streams can be lazy.
+    """
+    return heapq.merge(*(_tagged(source, runs) for source, runs in streams), key=_start_time, reverse=True)
+
+
+def iter_merged_runs(cache, sources, page_size: int = 100):
+    """Yields (source, run) over the cached runs of all sources, newest first."""
+    return merge_by_time(
+        (source, (run for page in cache.iter_run_pages(source.scope, source.scope_id, page_size) for run in page))
+        for source in sources
+    )
@@ -0,0 +1,111 @@
+"""
+Lightweight, `__slots__`-based records for sessions, run summaries and
+search hits, and the partial-result index of batched loads, shared by the
+CLI and the Streamlit app.
+"""
+from datetime import datetime, timezone
+
+from .run_payload import RUN_SUMMARY_FIELDS
+
+
+def get_timestamp_from_run(run, fallback_to_now: bool = True):
+    """
+    Safely gets a timestamp from a run object, trying multiple attributes.
+    Returns the current time (or None without `fallback_to_now`) if it has none.
+    """
+    for attribute in ("start_time", "created_at"):
+        value = getattr(run, attribute, None)
+        if value is not None:
+            return value
+    extra = getattr(run, "extra", None)
+    if isinstance(extra, dict):
+        for key in ("start_time", "created_at"):
+            if extra.get(key) is not None:
+                return extra[key]
+    return datetime.now(timezone.utc) if fallback_to_now else None
+
+
+class Session:
+    """A session shown in the session list: a top-level run or a group of runs."""
+    __slots__ = ("id", "name", "created_at", "start_time", "end_time")
+
+    def __init__(self, id, name=None, created_at=None, start_time=None, end_time=None):
+        self.id = id
+        self.name = name
+        self.created_at = created_at
+        self.start_time = start_time
+        self.end_time = end_time
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    def __repr__(self):
+        return f"Session(id={self.id!r}, name={self.name!r})"
+
+
+class RunSummary:
+    """
+    The fields of a run that listings carry (see run_payload.RUN_SUMMARY_FIELDS);
+    inputs and outputs are read separately with data_access.get_run_payload.
+    """
+    __slots__ = tuple(RUN_SUMMARY_FIELDS)
+
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_run(cls, run):
+        """Builds a summary from any run-like object, e.g. a langsmith Run."""
+        if isinstance(run, cls):
+            return run
+        return cls(**{field: getattr(run, field, None) for field in cls.__slots__})
+
+    def __repr__(self):
+        return f"RunSummary(id={self.id!r}, name={self.name!r}, run_type={self.run_type!r})"
+
+
+class SearchHit:
+    """A run matching a full-text search, with a snippet around the best match."""
+    __slots__ = ("run_id", "trace_id", "start_time", "name", "snippet", "score")
+
+    def __init__(self, run_id, trace_id=None, start_time=None, name=None, snippet=None, score=0.0):
+        self.run_id = run_id
+        self.trace_id = trace_id
+        self.start_time = start_time
+        self.name = name
+        self.snippet = snippet
+        self.score = score
+
+    @property
+    def id(self):
+        return self.run_id
+
+    def __repr__(self):
+        return f"SearchHit(run_id={self.run_id!r}, score={self.score:.2f})"
+
+
+class PartialIndex(dict):
+    """
+    Results of a batched load keyed by ID. Batches that failed even after
+    retries (e.g. still rate limited) do not fail the whole load: their IDs
+    are listed in `missing`, with the exceptions in `errors`, so the UIs can
+    say that data is unavailable instead of showing it as empty.
+    """
+    def __init__(self, items=(), missing=(), errors=()):
+        super().__init__(items)
+        self.missing = set(missing)
+        self.errors = list(errors)
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    def merge(self, other):
+        """Takes over the entries of another index; IDs it loaded are no longer missing."""
+        self.update(other)
+        other_missing = getattr(other, "missing", set())
+        self.missing = (self.missing - set(other)) | other_missing
+        self.errors.extend(getattr(other, "errors", ()))
+        return self
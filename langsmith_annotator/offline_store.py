@@ -0,0 +1,257 @@
+"""
+Export of a project's runs and feedback to chunked, flat files (compressed
+JSONL or Parquet), and an OfflineClient that serves those files through the
+subset of the langsmith Client API the annotator uses.
+"""
+import glob
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from .feedback_loader import load_feedback_index
+from .memory_client import InMemoryClient
+from .run_cache import from_iso, to_iso
+
+EXPORT_CHUNK_ROWS = 5000
+MANIFEST_FILE = "manifest.json"
+# Annotations made while working offline are appended here.
+LOCAL_FEEDBACK_FILE = "feedback-local.jsonl"
+
+FORMATS = {
+    "jsonl": "jsonl.gz",
+    "parquet": "parquet",
+}
+
+# Nested values are stored as JSON strings so every column stays flat.
+RUN_COLUMNS = [
+    "id", "project_id", "session_id", "parent_run_id", "trace_id", "dotted_order",
+    "name", "run_type", "status", "error", "start_time", "end_time",
+    "prompt_tokens", "completion_tokens", "total_tokens",
+    "inputs", "outputs", "extra", "tags",
+]
+RUN_JSON_COLUMNS = ("inputs", "outputs", "extra", "tags")
+FEEDBACK_COLUMNS = ["id", "run_id", "key", "value", "score", "comment", "created_at"]
+
+
+def _json_or_none(value):
+    return json.dumps(value, default=str) if value is not None else None
+
+
+def _str_or_none(value):
+    return str(value) if value is not None else None
+
+
+def run_to_row(run, project_id: str) -> dict:
+    """Flattens a run into one export row."""
+    return {
+        "id": str(run.id),
+        "project_id": project_id,
+        "session_id": _str_or_none(getattr(run, "session_id", None)),
+        "parent_run_id": _str_or_none(getattr(run, "parent_run_id", None)),
+        "trace_id": _str_or_none(getattr(run, "trace_id", None)),
+        "dotted_order": getattr(run, "dotted_order", None),
+        "name": getattr(run, "name", None),
+        "run_type": getattr(run, "run_type", None),
+        "status": getattr(run, "status", None),
+        "error": getattr(run, "error", None),
+        "start_time": to_iso(getattr(run, "start_time", None)),
+        "end_time": to_iso(getattr(run, "end_time", None)),
+        "prompt_tokens": getattr(run, "prompt_tokens", None),
+        "completion_tokens": getattr(run, "completion_tokens", None),
+        "total_tokens": getattr(run, "total_tokens", None),
+        "inputs": _json_or_none(getattr(run, "inputs", None)),
+        "outputs": _json_or_none(getattr(run, "outputs", None)),
+        "extra": _json_or_none(getattr(run, "extra", None)),
+        "tags": _json_or_none(getattr(run, "tags", None)),
+    }
+
+
+def feedback_to_row(fb) -> dict:
+    """Flattens a feedback item into one export row."""
+    return {
+        "id": str(fb.id),
+        "run_id": str(fb.run_id),
+        "key": fb.key,
+        "value": _json_or_none(getattr(fb, "value", None)),
+        "score": getattr(fb, "score", None),
+        "comment": getattr(fb, "comment", None),
+        "created_at": to_iso(getattr(fb, "created_at", None)),
+    }
+
+
+def _clean(value):
+    # Parquet round-trips missing numbers as NaN.
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _uuid_or_none(value):
+    return uuid.UUID(value) if value else None
+
+
+def run_from_row(row: dict):
+    """Rebuilds a run-like object from an export row."""
+    data = {column: _clean(row.get(column)) for column in RUN_COLUMNS}
+    for column in RUN_JSON_COLUMNS:
+        data[column] = json.loads(data[column]) if data[column] else None
+    for column in ("id", "session_id", "parent_run_id", "trace_id"):
+        data[column] = _uuid_or_none(data[column])
+    data["start_time"] = from_iso(data["start_time"])
+    data["end_time"] = from_iso(data["end_time"])
+    data["inputs"] = data["inputs"] or {}
+    return SimpleNamespace(**data)
+
+
+def feedback_from_row(row: dict):
+    """Rebuilds a feedback-like object from an export row."""
+    data = {column: _clean(row.get(column)) for column in FEEDBACK_COLUMNS}
+    data["value"] = json.loads(data["value"]) if data["value"] else None
+    data["id"] = _uuid_or_none(data["id"])
+    data["run_id"] = _uuid_or_none(data["run_id"])
+    data["created_at"] = from_iso(data["created_at"])
+    return SimpleNamespace(**data)
+
+
+# --- Writing ---
+
+def _chunk_path(directory: str, table: str, index: int, fmt: str) -> str:
+    return os.path.join(directory, f"{table}-{index:05d}.{FORMATS[fmt]}")
+
+
+def _clear_export(directory: str):
+    """Removes the manifest and chunk files of an earlier export; feedback made offline is kept."""
+    stale = [os.path.join(directory, MANIFEST_FILE)]
+    for table in ("runs", "feedback"):
+        for extension in FORMATS.values():
+            stale.extend(glob.glob(os.path.join(directory, f"{table}-*.{extension}")))
+    for path in stale:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _write_chunk(directory: str, table: str, index: int, rows, fmt: str, columns):
+    path = _chunk_path(directory, table, index, fmt)
+    if fmt == "parquet":
+        try:
+            import pandas as pd
+            pd.DataFrame(rows, columns=columns).to_parquet(path, index=False)
+        except ImportError as e:
+            raise RuntimeError(
+                "Parquet export needs pandas and pyarrow (pip install pyarrow), "
+                "or use --format jsonl."
+            ) from e
+    else:
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    return path
+
+
+def export_project(client, project_id: str, out_dir: str, fmt: str = "jsonl", project_name: str = None,
+                   loader=None, chunk_rows: int = EXPORT_CHUNK_ROWS, progress=None):
+    """
+    Streams every run of a project and its feedback into chunked files in
+    `out_dir`. Runs are fetched lazily and written `chunk_rows` at a time,
+    together with the feedback of exactly those runs, so memory stays
+    bounded by one chunk. An earlier export in `out_dir` is replaced.
+    Returns the manifest that was written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    os.makedirs(out_dir, exist_ok=True)
+    _clear_export(out_dir)
+    if loader is not None:
+        runs = loader.stream(client.list_runs, project_id=project_id)
+    else:
+        runs = client.list_runs(project_id=project_id)
+
+    counts = {"runs": 0, "feedback": 0}
+    chunk_index = 0
+    rows = []
+
+    def flush():
+        nonlocal chunk_index, rows
+        if not rows:
+            return
+        feedback_index = load_feedback_index(client, [row["id"] for row in rows], loader=loader)
+        feedback_rows = [feedback_to_row(fb) for fbs in feedback_index.values() for fb in fbs]
+        _write_chunk(out_dir, "runs", chunk_index, rows, fmt, RUN_COLUMNS)
+        _write_chunk(out_dir, "feedback", chunk_index, feedback_rows, fmt, FEEDBACK_COLUMNS)
+        counts["runs"] += len(rows)
+        counts["feedback"] += len(feedback_rows)
+        chunk_index += 1
+        rows = []
+        if progress is not None:
+            progress(counts)
+
+    for run in runs:
+        rows.append(run_to_row(run, str(project_id)))
+        if len(rows) >= chunk_rows:
+            flush()
+    flush()
+
+    manifest = {
+        "project_id": str(project_id),
+        "project_name": project_name,
+        "format": fmt,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "chunks": chunk_index,
+        **counts,
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# --- Reading ---
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_rows(directory: str, table: str, fmt: str, chunks: int):
+    """Yields the rows of the first `chunks` chunks of a table (those listed in the manifest), in order."""
+    for index in range(chunks):
+        path = _chunk_path(directory, table, index, fmt)
+        if fmt == "parquet":
+            import pandas as pd
+            yield from pd.read_parquet(path).to_dict("records")
+        else:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+class OfflineClient(InMemoryClient):
+    """
+    Serves an export directory through the same Client methods as the live
+    API, so both front ends can run without network access. Feedback
+    created offline is appended to feedback-local.jsonl in the export
+    directory.
+    """
+    def __init__(self, directory: str, **kwargs):
+        self.directory = directory
+        manifest = read_manifest(directory)
+        fmt = manifest["format"]
+        project = SimpleNamespace(
+            id=uuid.UUID(manifest["project_id"]),
+            name=manifest.get("project_name") or os.path.basename(os.path.abspath(directory)),
+        )
+        feedback = [feedback_from_row(row) for row in iter_rows(directory, "feedback", fmt, manifest["chunks"])]
+        self._local_feedback_path = os.path.join(directory, LOCAL_FEEDBACK_FILE)
+        if os.path.exists(self._local_feedback_path):
+            with open(self._local_feedback_path, encoding="utf-8") as f:
+                feedback.extend(feedback_from_row(json.loads(line)) for line in f if line.strip())
+        runs = [run_from_row(row) for row in iter_rows(directory, "runs", fmt, manifest["chunks"])]
+        super().__init__(project, runs, feedback, **kwargs)
+
+    def _feedback_created(self, fb):
+        with self._lock:
+            with open(self._local_feedback_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(feedback_to_row(fb)) + "\n")
@@ -0,0 +1,72 @@
+"""
+Background cache warming on a small, bounded thread pool. Prefetches are
+best effort: they are dropped when too many are already in flight and
+can be cancelled once the user has moved on.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_IN_FLIGHT = 6
+
+
+class Prefetcher:
+    """
+    Runs warm-up calls in the background. Every prefetch has a `key` (a
+    duplicate key is not scheduled twice), an `owner` (e.g. one browser
+    session) and a `group` (e.g. the session being viewed). cancel_stale()
+    drops an owner's queued prefetches outside its current group; ones that
+    already started run to completion, since they only fill caches.
+    """
+    def __init__(self, max_workers: int = PREFETCH_WORKERS, max_in_flight: int = PREFETCH_MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> (future, owner, group)
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.cancelled = 0
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def prefetch(self, key, fn, *args, owner=None, group=None, **kwargs) -> bool:
+        """Schedules `fn(*args, **kwargs)` unless `key` is already in flight or the cap is reached."""
+        with self._lock:
+            if key in self._in_flight:
+                return True
+            if len(self._in_flight) >= self.max_in_flight:
+                self.dropped += 1
+                return False
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._in_flight[key] = (future, owner, group)
+        future.add_done_callback(lambda f: self._done(key, f))
+        return True
+
+    def _done(self, key, future):
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None and entry[0] is future:
+                del self._in_flight[key]
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def cancel_stale(self, owner, group) -> int:
+        """Cancels the queued prefetches of `owner` that belong to another group. Returns how many."""
+        with self._lock:
+            stale = [future for future, task_owner, task_group in self._in_flight.values()
+                     if task_owner == owner and task_group != group]
+        cancelled = sum(1 for future in stale if future.cancel())
+        with self._lock:
+            self.cancelled += cancelled
+        return cancelled
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,188 @@
+"""
+Shared HTTP request layer for the LangSmith client: a pooled keep-alive
+session whose every request first takes a token from a client-side rate
+limiter, adaptive slow-down on 429 responses, and coalescing of identical
+read calls that are already in flight on another thread.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from .concurrent_loader import MAX_CONCURRENCY, parse_retry_after
+from .instrumentation import METRICS, record_cache
+
+# Sustained requests per second sent to LangSmith by this process, and how
+# many may be sent back to back after a quiet period.
+MAX_REQUESTS_PER_SECOND = float(os.environ.get("LANGSMITH_MAX_REQUESTS_PER_SECOND", "10"))
+REQUEST_BURST = int(os.environ.get("LANGSMITH_REQUEST_BURST", "20"))
+# The rate never drops below this, however many 429s come back.
+MIN_REQUESTS_PER_SECOND = 0.5
+# Requests per second won back after each successful response once throttled.
+RATE_RECOVERY_STEP = 0.25
+# How long to hold all requests after a 429 that carries no Retry-After.
+DEFAULT_RATE_LIMIT_PAUSE_SECONDS = 1.0
+
+# Read calls whose identical concurrent invocations share one request.
+# list_runs is left out: it is streamed page by page and must stay lazy.
+COALESCED_METHODS = frozenset({"list_feedback", "list_projects", "read_project", "read_run"})
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter shared by all threads. Tokens refill at `rate`
+    per second up to `burst`; `acquire` blocks until one is available.
+
+    The rate adapts to the server: a 429 halves it (down to `min_rate`) and
+    holds every request until the Retry-After has passed, and each
+    successful response after that wins back `recovery_step` until the
+    configured rate is reached again.
+    """
+    def __init__(self, rate: float = MAX_REQUESTS_PER_SECOND, burst: int = REQUEST_BURST,
+                 min_rate: float = MIN_REQUESTS_PER_SECOND, recovery_step: float = RATE_RECOVERY_STEP):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery_step = recovery_step
+        self.rate_limited = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Takes one token, waiting for it if needed. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                wait = max(wait, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            METRICS.record_timing("rate_limit_wait", waited)
+        return waited
+
+    def on_rate_limited(self, retry_after: float = None):
+        """Backs off after a 429: halves the rate and pauses until Retry-After has passed."""
+        pause = DEFAULT_RATE_LIMIT_PAUSE_SECONDS if retry_after is None else retry_after
+        with self._lock:
+            self.rate_limited += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+
+# Process-wide limiter shared by every LangSmith session of this process.
+RATE_LIMITER = TokenBucket()
+
+
+def mount_rate_limited_adapter(session, prefix: str = "https://", limiter: TokenBucket = RATE_LIMITER,
+                               pool_size: int = MAX_CONCURRENCY):
+    """
+    Mounts a keep-alive connection pool sized for the loader's threads on
+    `session` for URLs starting with `prefix`. Every request sent through it
+    takes a token from `limiter` first, and 429 responses slow the limiter
+    down. The adapter does not retry, whatever the one it replaces did:
+    ConcurrentLoader owns the retry policy, and retries at both levels
+    would multiply.
+    """
+    from requests.adapters import HTTPAdapter
+
+    class RateLimitedAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            limiter.acquire()
+            response = super().send(request, **kwargs)
+            if response.status_code == 429:
+                limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+            elif response.status_code < 500:
+                limiter.on_success()
+            return response
+
+    adapter = RateLimitedAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True, max_retries=0,
+    )
+    session.mount(prefix, adapter)
+    return adapter
+
+
+def _freeze(value):
+    """A hashable stand-in for call arguments (lists and dicts included)."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_freeze(item) for item in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    hash(value)
+    return value
+
+
+class CoalescingClient:
+    """
+    Wraps a client so that a read call (see COALESCED_METHODS) made while
+    an identical one is in flight on another thread waits for that call and
+    shares its result instead of sending a second request. List results are
+    materialized once and every caller gets its own copy.
+    """
+    def __init__(self, client, methods=COALESCED_METHODS):
+        self._client = client
+        self._methods = frozenset(methods)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def wrapped(self):
+        return self._client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self._methods or not callable(attr):
+            return attr
+
+        def coalesced(*args, **kwargs):
+            return self._call(name, attr, args, kwargs)
+        return coalesced
+
+    def _call(self, name, fn, args, kwargs):
+        try:
+            key = (name, _freeze(args), _freeze(kwargs))
+        except TypeError:
+            return fn(*args, **kwargs)
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+        record_cache("coalesced", hit=not leader)
+        if not leader:
+            result = flight.result()
+            return list(result) if isinstance(result, list) else result
+
+        try:
+            result = fn(*args, **kwargs)
+            if hasattr(result, "__next__"):
+                result = list(result)
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return list(result) if isinstance(result, list) else result
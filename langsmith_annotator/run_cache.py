@@ -0,0 +1,557 @@
+"""On-disk SQLite cache of LangSmith runs and feedback."""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import UUID
+
+from .models import RunSummary, SearchHit
+from .extraction import ENGINE
+
+DEFAULT_CACHE_PATH = os.environ.get("LANGSMITH_CACHE_PATH", ".langsmith_cache.sqlite3")
+
+# Number of runs written per transaction when storing a (lazy) run listing.
+WRITE_CHUNK_SIZE = 500
+
+# Attributes that are turned back into datetimes when a record is read.
+DATETIME_FIELDS = ("start_time", "end_time", "created_at", "modified_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    project_id TEXT,
+    session_id TEXT,
+    parent_run_id TEXT,
+    trace_id TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_project ON runs(project_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_runs_parent ON runs(parent_run_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_runs_start ON runs(start_time);
+CREATE INDEX IF NOT EXISTS idx_runs_project_order ON runs(project_id, COALESCE(start_time, ''), run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_parent_order ON runs(parent_run_id, COALESCE(start_time, ''), run_id);
+
+-- Full runs (inputs/outputs included) read on demand; `runs` holds summaries.
+CREATE TABLE IF NOT EXISTS run_payloads (
+    run_id TEXT PRIMARY KEY,
+    complete INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+
+-- pending: written optimistically, not confirmed by LangSmith yet.
+CREATE TABLE IF NOT EXISTS feedback (
+    feedback_id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    pending INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_run ON feedback(run_id);
+
+CREATE TABLE IF NOT EXISTS feedback_sync (
+    run_id TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+
+# Full-text index over the user input and final answer of runs. Needs an
+# SQLite built with FTS5; without it search is unavailable.
+SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    doc_id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL UNIQUE,
+    project_id TEXT,
+    trace_id TEXT,
+    start_time TEXT,
+    complete INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_docs_project ON search_docs(project_id, complete);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5(
+    name, user_input, final_output, tokenize = 'porter unicode61'
+);
+"""
+
+# bm25 weights of the name, user_input and final_output columns.
+SEARCH_COLUMN_WEIGHTS = (0.5, 2.0, 1.0)
+# Tokens of context around the best match in a search snippet.
+SNIPPET_TOKENS = 12
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Listing order key. Runs without a start_time sort as '' (last, newest
+# first), so keyset cursors never compare against NULL.
+ORDER_START_TIME = "COALESCE(start_time, '')"
+
+# Columns a run listing can be scoped by.
+SCOPE_COLUMNS = {
+    "project": "project_id",
+    "parent": "parent_run_id",
+    "trace": "trace_id",
+}
+
+
+def to_iso(value):
+    """Formats a datetime as a fixed-width UTC string that sorts chronologically."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def from_iso(value):
+    """Parses a string written by `to_iso` (or any ISO timestamp) into a datetime."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return to_iso(value)
+    if isinstance(value, UUID):
+        return str(value)
+    return str(value)
+
+
+def _as_dict(obj):
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    if not hasattr(obj, "__dict__"):
+        return {field: getattr(obj, field) for field in obj.__slots__}
+    return dict(vars(obj))
+
+
+def _dump(obj) -> str:
+    return json.dumps(_as_dict(obj), default=_json_default)
+
+
+def _load(payload: str):
+    data = json.loads(payload)
+    for field in DATETIME_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] = from_iso(data[field])
+    return SimpleNamespace(**data)
+
+
+def _load_summary(payload: str) -> RunSummary:
+    data = json.loads(payload)
+    for field in DATETIME_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] = from_iso(data[field])
+    return RunSummary(**data)
+
+
+def _chunks(iterable, size):
+    page = []
+    for item in iterable:
+        page.append(item)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _str_or_none(value):
+    return str(value) if value is not None else None
+
+
+def _text_or_none(value):
+    if value is None:
+        return None
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def fts_query(text: str):
+    """
+    Turns free text typed by a user into an FTS5 query: every word must
+    match, and the last one may be a prefix so results follow the typing.
+    Returns None when the text has no words.
+    """
+    words = _WORD.findall(text or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+class RunCache:
+    """
+    Stores runs and feedback keyed by project/session/run ID, plus the sync
+    watermark of every scope that has been fetched. Safe to share between
+    threads.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            try:
+                self._conn.executescript(SEARCH_SCHEMA)
+                self.search_available = True
+            except sqlite3.OperationalError:
+                self.search_available = False
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        if "trace_id" not in columns:
+            # Caches written before trace lookups; rows get their trace_id on the next sync.
+            self._conn.execute("ALTER TABLE runs ADD COLUMN trace_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_trace ON runs(trace_id, start_time)")
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_runs_trace_order ON runs(trace_id, {ORDER_START_TIME}, run_id)"
+        )
+        feedback_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(feedback)")}
+        if "pending" not in feedback_columns:
+            self._conn.execute("ALTER TABLE feedback ADD COLUMN pending INTEGER NOT NULL DEFAULT 0")
+        # Listings are no longer scoped by session_id (it is the project ID).
+        self._conn.execute("DROP INDEX IF EXISTS idx_runs_session")
+        self._conn.execute("DROP INDEX IF EXISTS idx_runs_session_order")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Runs ---
+
+    def upsert_runs(self, runs, project_id: str = None):
+        """
+        Stores runs and returns the latest start_time seen (as an ISO string),
+        or None when `runs` was empty. `runs` may be any iterable; it is
+        written in chunks so a lazy listing is never held in memory at once.
+        """
+        latest = None
+        for page in _chunks(runs, WRITE_CHUNK_SIZE):
+            page_latest = self._upsert_page(page, project_id)
+            if page_latest and (latest is None or page_latest > latest):
+                latest = page_latest
+        return latest
+
+    def _upsert_page(self, runs, project_id):
+        rows = []
+        latest = None
+        for run in runs:
+            start_time = to_iso(getattr(run, "start_time", None))
+            rows.append((
+                str(run.id),
+                project_id or _str_or_none(getattr(run, "session_id", None)),
+                _str_or_none(getattr(run, "session_id", None)),
+                _str_or_none(getattr(run, "parent_run_id", None)),
+                _str_or_none(getattr(run, "trace_id", None)),
+                start_time,
+                to_iso(getattr(run, "end_time", None)),
+                _dump(run),
+            ))
+            if start_time and (latest is None or start_time > latest):
+                latest = start_time
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO runs "
+                "(run_id, project_id, session_id, parent_run_id, trace_id, start_time, end_time, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return latest
+
+    def get_runs(self, scope: str, scope_id: str):
+        """Returns cached run summaries of a project, session, trace or parent run, newest first."""
+        return [run for page in self.iter_run_pages(scope, scope_id) for run in page]
+
+    def iter_run_pages(self, scope: str, scope_id: str, page_size: int = 100):
+        """
+        Yields cached runs of a scope newest first, one page at a time, using
+        keyset pagination so every page is a cheap indexed query.
+        """
+        column = SCOPE_COLUMNS[scope]
+        cursor = None
+        while True:
+            with self._lock:
+                if cursor is None:
+                    rows = self._conn.execute(
+                        f"SELECT {ORDER_START_TIME}, run_id, payload FROM runs WHERE {column} = ? "
+                        f"ORDER BY {ORDER_START_TIME} DESC, run_id DESC LIMIT ?",
+                        (str(scope_id), page_size),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        f"SELECT {ORDER_START_TIME}, run_id, payload FROM runs WHERE {column} = ? "
+                        f"AND ({ORDER_START_TIME}, run_id) < (?, ?) "
+                        f"ORDER BY {ORDER_START_TIME} DESC, run_id DESC LIMIT ?",
+                        (str(scope_id), *cursor, page_size),
+                    ).fetchall()
+            if not rows:
+                return
+            yield [_load_summary(payload) for _, _, payload in rows]
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1][:2]
+
+    def get_runs_page(self, scope: str, scope_id: str, offset: int, limit: int):
+        """Returns one page of cached runs of a scope, newest first."""
+        column = SCOPE_COLUMNS[scope]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT payload FROM runs WHERE {column} = ? "
+                f"ORDER BY {ORDER_START_TIME} DESC, run_id DESC LIMIT ? OFFSET ?",
+                (str(scope_id), limit, offset),
+            ).fetchall()
+        return [_load_summary(payload) for (payload,) in rows]
+
+    def count_runs(self, scope: str, scope_id: str) -> int:
+        column = SCOPE_COLUMNS[scope]
+        with self._lock:
+            (count,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM runs WHERE {column} = ?", (str(scope_id),)
+            ).fetchone()
+        return count
+
+    def get_run_traces(self, scope: str, scope_id: str, start_after=None):
+        """
+        Maps the IDs of cached runs in a scope (started at or after
+        `start_after`, if given) onto their trace IDs. Runs without a
+        start_time are only included when there is no `start_after`.
+        """
+        column = SCOPE_COLUMNS[scope]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT run_id, trace_id FROM runs WHERE {column} = ? AND {ORDER_START_TIME} >= ?",
+                (str(scope_id), to_iso(start_after) or ""),
+            ).fetchall()
+        return {run_id: trace_id or run_id for run_id, trace_id in rows}
+
+    def get_unfinished_run_ids(self, scope: str, scope_id: str):
+        """Returns IDs of cached runs in a scope that had no end_time yet."""
+        column = SCOPE_COLUMNS[scope]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT run_id FROM runs WHERE {column} = ? AND end_time IS NULL",
+                (str(scope_id),),
+            ).fetchall()
+        return [run_id for (run_id,) in rows]
+
+    def get_run_payload(self, run_id: str):
+        """Returns the cached full run, or None if it was never read or had not finished then."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM run_payloads WHERE run_id = ? AND complete = 1", (str(run_id),)
+            ).fetchone()
+        return _load(row[0]) if row else None
+
+    def put_run_payload(self, run):
+        """
+        Stores a full run and indexes its text for search. Runs that are
+        still in progress are re-read next time.
+        """
+        complete = 1 if getattr(run, "end_time", None) is not None else 0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO run_payloads (run_id, complete, payload) VALUES (?, ?, ?)",
+                (str(run.id), complete, _dump(run)),
+            )
+        self.index_run_text([run])
+
+    # --- Search ---
+
+    def index_run_text(self, runs, project_id: str = None):
+        """
+        Adds or replaces the search entries of full runs (inputs and outputs
+        included) and returns the latest start_time seen as an ISO string.
+        Written in chunks, so `runs` may be a lazy listing.
+        """
+        latest = None
+        if not self.search_available:
+            return latest
+        for page in _chunks(runs, WRITE_CHUNK_SIZE):
+            # Extracted before taking the lock; the extractions are memoized for display too.
+            extractions = ENGINE.extract_many(page)
+            with self._lock, self._conn:
+                for run in page:
+                    start_time = to_iso(getattr(run, "start_time", None))
+                    if start_time and (latest is None or start_time > latest):
+                        latest = start_time
+                    self._index_run(run, extractions[str(run.id)], project_id, start_time)
+        return latest
+
+    def _index_run(self, run, extraction, project_id, start_time):
+        run_id = str(run.id)
+        self._conn.execute(
+            "INSERT INTO search_docs (run_id, project_id, trace_id, start_time, complete) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(run_id) DO UPDATE SET "
+            "project_id = excluded.project_id, trace_id = excluded.trace_id, "
+            "start_time = excluded.start_time, complete = excluded.complete",
+            (
+                run_id,
+                project_id or _str_or_none(getattr(run, "session_id", None)),
+                _str_or_none(getattr(run, "trace_id", None)),
+                start_time,
+                1 if getattr(run, "end_time", None) is not None else 0,
+            ),
+        )
+        (doc_id,) = self._conn.execute("SELECT doc_id FROM search_docs WHERE run_id = ?", (run_id,)).fetchone()
+        self._conn.execute("DELETE FROM search_text WHERE rowid = ?", (doc_id,))
+        self._conn.execute(
+            "INSERT INTO search_text (rowid, name, user_input, final_output) VALUES (?, ?, ?, ?)",
+            (doc_id, getattr(run, "name", None), _text_or_none(extraction.user_input),
+             _text_or_none(extraction.final_output)),
+        )
+
+    def get_unfinished_search_run_ids(self, project_id: str):
+        """IDs of indexed runs of a project that had not finished when they were indexed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id FROM search_docs WHERE project_id = ? AND complete = 0", (str(project_id),)
+            ).fetchall()
+        return [run_id for (run_id,) in rows]
+
+    def search_runs(self, text: str, project_id: str = None, limit: int = 20):
+        """
+        Returns the best `limit` SearchHits for free text, ranked by bm25
+        over name, user input and final answer, optionally within a project.
+        """
+        query = fts_query(text)
+        if query is None or not self.search_available:
+            return []
+        sql = (
+            "SELECT d.run_id, d.trace_id, d.start_time, search_text.name, "
+            f"snippet(search_text, -1, '[', ']', '…', {SNIPPET_TOKENS}), "
+            "bm25(search_text, ?, ?, ?) AS rank "
+            "FROM search_text JOIN search_docs d ON d.doc_id = search_text.rowid "
+            "WHERE search_text MATCH ?"
+        )
+        params = [*SEARCH_COLUMN_WEIGHTS, query]
+        if project_id is not None:
+            sql += " AND d.project_id = ?"
+            params.append(str(project_id))
+        sql += " ORDER BY rank, d.start_time DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            SearchHit(run_id=run_id, trace_id=trace_id or run_id, start_time=from_iso(start_time), name=name,
+                      snippet=snippet, score=-rank)
+            for run_id, trace_id, start_time, name, snippet, rank in rows
+        ]
+
+    def count_search_docs(self, project_id: str = None) -> int:
+        if not self.search_available:
+            return 0
+        with self._lock:
+            if project_id is None:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()
+            else:
+                (count,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM search_docs WHERE project_id = ?", (str(project_id),)
+                ).fetchone()
+        return count
+
+    # --- Sync state ---
+
+    def get_sync_state(self, scope_key: str):
+        """Returns (watermark, synced_at) for a scope, or (None, None) if never synced."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, synced_at FROM sync_state WHERE scope = ?",
+                (scope_key,),
+            ).fetchone()
+        return row if row else (None, None)
+
+    def set_sync_state(self, scope_key: str, watermark):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (scope, watermark, synced_at) VALUES (?, ?, ?)",
+                (scope_key, watermark, time.time()),
+            )
+
+    # --- Feedback ---
+
+    def replace_feedback(self, feedback_index):
+        """
+        Replaces the cached feedback of every run in `feedback_index`.
+        Pending feedback is kept: a listing may have been read before it
+        was created.
+        """
+        run_ids = list(feedback_index)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM feedback WHERE run_id = ? AND NOT pending", [(run_id,) for run_id in run_ids]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO feedback (feedback_id, run_id, payload) VALUES (?, ?, ?)",
+                [
+                    (str(fb.id), run_id, _dump(fb))
+                    for run_id, feedback_list in feedback_index.items()
+                    for fb in feedback_list
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO feedback_sync (run_id, synced_at) VALUES (?, ?)",
+                [(run_id, now) for run_id in run_ids],
+            )
+
+    def add_feedback(self, feedback, pending: bool = False):
+        """
+        Stores a single feedback item, e.g. one that was just created.
+        `pending` feedback is not sent yet; replace_feedback keeps it until
+        it is confirmed or deleted.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feedback (feedback_id, run_id, payload, pending) VALUES (?, ?, ?, ?)",
+                (str(feedback.id), str(feedback.run_id), _dump(feedback), int(pending)),
+            )
+
+    def confirm_feedback(self, feedback_id: str):
+        """Marks pending feedback as created, so the next replace_feedback may drop it."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE feedback SET pending = 0 WHERE feedback_id = ?", (str(feedback_id),))
+
+    def delete_feedback(self, feedback_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM feedback WHERE feedback_id = ?", (str(feedback_id),))
+
+    def get_stale_feedback_run_ids(self, run_ids, max_age_s: float):
+        """Returns the run IDs whose feedback was never synced or is older than `max_age_s`."""
+        run_ids = [str(run_id) for run_id in run_ids]
+        cutoff = time.time() - max_age_s
+        fresh = set()
+        with self._lock:
+            for start in range(0, len(run_ids), 500):
+                batch = run_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                fresh.update(run_id for (run_id,) in self._conn.execute(
+                    f"SELECT run_id FROM feedback_sync WHERE run_id IN ({placeholders}) AND synced_at >= ?",
+                    (*batch, cutoff),
+                ))
+        return [run_id for run_id in run_ids if run_id not in fresh]
+
+    def get_feedback_index(self, run_ids):
+        """Returns cached feedback grouped by run ID, with an entry for every requested run."""
+        run_ids = [str(run_id) for run_id in run_ids]
+        index = {run_id: [] for run_id in run_ids}
+        with self._lock:
+            for start in range(0, len(run_ids), 500):
+                batch = run_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for run_id, payload in self._conn.execute(
+                    f"SELECT run_id, payload FROM feedback WHERE run_id IN ({placeholders}) ORDER BY rowid",
+                    batch,
+                ):
+                    index[run_id].append(_load(payload))
+        return index
@@ -0,0 +1,92 @@
+"""
+ID-keyed index over the runs of a session, built once per listing: O(1)
+lookup of a run and its position, precomputed display labels, and
+search/filter by name, type and status.
+"""
+import threading
+from collections import OrderedDict
+
+# Distinct (text, type, status) queries whose results are kept per index.
+FILTER_MEMO_SIZE = 32
+
+
+def run_label(number: int, run) -> str:
+    return f"{number}. {run.name} ({run.run_type}) - {str(run.id)[:8]}..."
+
+
+class RunIndex:
+    """
+    Runs keyed by their full ID, in display order. `labels` maps run IDs to
+    display strings (numbered run labels by default). Filtering by type or
+    status reads precomputed buckets; text search scans precomputed
+    lowercase "name type status" strings.
+    """
+    def __init__(self, runs, labels=None):
+        self.ids = []
+        self.runs = {}
+        self.positions = {}
+        self.labels = {}
+        self._search_text = {}
+        self._by_type = {}
+        self._by_status = {}
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        for position, run in enumerate(runs):
+            run_id = str(run.id)
+            run_type = getattr(run, "run_type", None) or ""
+            status = getattr(run, "status", None) or ""
+            self.ids.append(run_id)
+            self.runs[run_id] = run
+            self.positions[run_id] = position
+            self.labels[run_id] = labels[run_id] if labels else run_label(position + 1, run)
+            self._search_text[run_id] = f"{getattr(run, 'name', None) or ''} {run_type} {status}".lower()
+            self._by_type.setdefault(run_type, []).append(run_id)
+            self._by_status.setdefault(status, []).append(run_id)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, run_id):
+        return str(run_id) in self.runs
+
+    def get(self, run_id):
+        return self.runs.get(str(run_id))
+
+    def label(self, run_id) -> str:
+        return self.labels[str(run_id)]
+
+    @property
+    def run_types(self):
+        return sorted(t for t in self._by_type if t)
+
+    @property
+    def statuses(self):
+        return sorted(s for s in self._by_status if s)
+
+    def filter(self, text: str = "", run_types=(), statuses=()):
+        """
+        Returns the IDs, in display order, of runs whose name, type or status
+        contains `text` and whose type/status is among the given ones (all
+        when empty). Results are memoized per query.
+        """
+        text = (text or "").strip().lower()
+        query = (text, tuple(sorted(run_types)), tuple(sorted(statuses)))
+        with self._memo_lock:
+            if query in self._memo:
+                self._memo.move_to_end(query)
+                return self._memo[query]
+
+        candidates = None
+        for wanted, buckets in ((query[1], self._by_type), (query[2], self._by_status)):
+            if wanted:
+                selected = {run_id for value in wanted for run_id in buckets.get(value, ())}
+                candidates = selected if candidates is None else candidates & selected
+        ids = self.ids if candidates is None else sorted(candidates, key=self.positions.__getitem__)
+        if text:
+            ids = [run_id for run_id in ids if text in self._search_text[run_id]]
+
+        with self._memo_lock:
+            self._memo[query] = ids
+            if len(self._memo) > FILTER_MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return ids
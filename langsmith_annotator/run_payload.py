@@ -0,0 +1,60 @@
+"""
+Run summaries and on-demand payloads. Run listings request only the
+summary fields; a run's inputs/outputs are read when it is selected and
+trimmed for display when they are very large (see extraction for the
+user input and final answer).
+"""
+import json
+
+# Fields requested for run listings; inputs/outputs are left out on purpose.
+RUN_SUMMARY_FIELDS = [
+    "id",
+    "name",
+    "run_type",
+    "status",
+    "error",
+    "session_id",
+    "parent_run_id",
+    "trace_id",
+    "dotted_order",
+    "start_time",
+    "end_time",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "tags",
+]
+
+# Strings longer than this are cut when displayed.
+PREVIEW_MAX_CHARS = 2000
+# Lists longer than this (e.g. long chat histories) show only their last items.
+PREVIEW_MAX_ITEMS = 50
+
+
+def truncate_text(text: str, max_chars: int = PREVIEW_MAX_CHARS) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}… [{len(text) - max_chars} more characters]"
+
+
+def truncate_payload(value, max_chars: int = PREVIEW_MAX_CHARS, max_items: int = PREVIEW_MAX_ITEMS):
+    """
+    Returns a display copy of an inputs/outputs value in which long strings
+    are cut to `max_chars` and long lists keep only their last `max_items`
+    entries. Small values are returned as they are.
+    """
+    if isinstance(value, str):
+        return truncate_text(value, max_chars)
+    if isinstance(value, dict):
+        return {key: truncate_payload(item, max_chars, max_items) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [truncate_payload(item, max_chars, max_items) for item in value[-max_items:]]
+        if len(value) > max_items:
+            items.insert(0, f"… [{len(value) - max_items} earlier items]")
+        return items
+    return value
+
+
+def payload_size(value) -> int:
+    """Approximate size in characters of a payload once serialized."""
+    return len(json.dumps(value, default=str)) if value is not None else 0
@@ -0,0 +1,31 @@
+"""Generator helpers for consuming run listings lazily."""
+from itertools import islice
+
+
+def paginate(iterable, page_size: int):
+    """Yields lists of at most `page_size` items, pulling from `iterable` only as needed."""
+    iterator = iter(iterable)
+    while True:
+        page = list(islice(iterator, page_size))
+        if not page:
+            return
+        yield page
+
+
+def take_distinct(iterable, key, limit: int):
+    """
+    Yields the first item seen for each distinct `key(item)` (skipping items
+    whose key is None) and stops consuming `iterable` once `limit` distinct
+    keys have been found.
+    """
+    seen = set()
+    if limit <= 0:
+        return
+    for item in iterable:
+        item_key = key(item)
+        if item_key is None or item_key in seen:
+            continue
+        seen.add(item_key)
+        yield item
+        if len(seen) >= limit:
+            return
@@ -0,0 +1,83 @@
+"""
+In-memory tree index over the runs of one trace: parent -> children,
+depth, and depth-first display order.
+"""
+from datetime import datetime, timezone
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+class TraceNode:
+    __slots__ = ("run", "depth", "children")
+
+    def __init__(self, run, depth: int = 0):
+        self.run = run
+        self.depth = depth
+        self.children = []
+
+    @property
+    def id(self) -> str:
+        return str(self.run.id)
+
+
+class RunTree:
+    """
+    The runs of a trace indexed by ID. Runs whose parent is not part of the
+    listing (normally just the trace root) become roots.
+    """
+    def __init__(self, roots):
+        self.roots = roots
+        self.nodes = {node.id: node for node in self.walk()}  # in depth-first order
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, run_id):
+        return self.nodes.get(str(run_id))
+
+    def walk(self, collapsed=()):
+        """Yields nodes depth-first, skipping the descendants of run IDs in `collapsed`."""
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.id not in collapsed:
+                stack.extend(reversed(node.children))
+
+
+def _order_key(run):
+    # dotted_order is "<time><id>.<time><id>...", so sorting by it lists a
+    # trace depth-first with siblings in start order. Runs without one fall
+    # back to their start time.
+    return (getattr(run, "dotted_order", None) or "", getattr(run, "start_time", None) or _EPOCH)
+
+
+def build_tree(runs) -> RunTree:
+    """
+    Builds the tree index of a trace. Runs are sorted by dotted_order once;
+    in that order every parent precedes its children, so depths and child
+    lists are filled in a single pass.
+    """
+    ordered = sorted(runs, key=_order_key)
+    has_dotted_order = all(getattr(run, "dotted_order", None) for run in ordered)
+    nodes = {str(run.id): TraceNode(run) for run in ordered}
+    roots = []
+    for run in ordered:
+        node = nodes[str(run.id)]
+        parent = nodes.get(str(run.parent_run_id)) if getattr(run, "parent_run_id", None) else None
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.children.append(node)
+            node.depth = parent.depth + 1
+    if not has_dotted_order:
+        # Without dotted_order a child may have been visited before its
+        # parent; recompute depths from the roots.
+        for root in roots:
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                for child in node.children:
+                    child.depth = node.depth + 1
+                    stack.append(child)
+    return RunTree(roots)
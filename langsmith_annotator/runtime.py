@@ -0,0 +1,56 @@
+"""
+Process-wide objects shared by the front ends, built lazily on first use:
+one instrumented, request-coalescing client per client spec, one run
+cache and one loader pool. Module state survives Streamlit reruns, so none of this is rebuilt
+when the script re-executes.
+"""
+import threading
+
+from .client_factory import create_client, default_client_spec, is_offline_spec
+from .concurrent_loader import ConcurrentLoader
+from .instrumentation import InstrumentedClient
+from .request_layer import CoalescingClient
+from .run_cache import DEFAULT_CACHE_PATH, RunCache
+
+_lock = threading.Lock()
+_clients = {}
+_caches = {}
+_loader = None
+
+
+def get_client(spec: str = None):
+    """
+    Returns the client for `spec` ('langsmith', 'fake[:N]', 'offline:<dir>'),
+    creating it on first use. Reusing one client keeps its pooled HTTP
+    connections alive across calls, and lets identical concurrent reads
+    share one request.
+    """
+    spec = spec or default_client_spec()
+    with _lock:
+        if spec not in _clients:
+            _clients[spec] = CoalescingClient(InstrumentedClient(create_client(spec)))
+        return _clients[spec]
+
+
+def get_run_cache(spec: str = None) -> RunCache:
+    """
+    Returns the run cache for `spec`. Live data shares the on-disk cache;
+    offline and fake data is kept in memory, per spec, so it never mixes
+    with live data.
+    """
+    spec = spec or default_client_spec()
+    path = ":memory:" if is_offline_spec(spec) else DEFAULT_CACHE_PATH
+    key = spec if is_offline_spec(spec) else path
+    with _lock:
+        if key not in _caches:
+            _caches[key] = RunCache(path)
+        return _caches[key]
+
+
+def get_loader() -> ConcurrentLoader:
+    """Returns the bounded thread pool used for LangSmith calls."""
+    global _loader
+    with _lock:
+        if _loader is None:
+            _loader = ConcurrentLoader()
+        return _loader
@@ -0,0 +1,174 @@
+"""
+Configurable session discovery. Predicates are pushed into the list_runs
+query so LangSmith only returns candidate runs, and only the fields needed
+for the session list are requested.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from .models import get_timestamp_from_run
+
+# Everything the session list needs; inputs/outputs are left out on purpose.
+SESSION_SELECT_FIELDS = [
+    "id",
+    "name",
+    "run_type",
+    "session_id",
+    "parent_run_id",
+    "trace_id",
+    "start_time",
+    "end_time",
+]
+
+
+@dataclass(frozen=True)
+class SessionQuery:
+    """
+    Describes which runs count as sessions.
+
+    group_by="run" treats every matching run as its own session (the
+    Streamlit app's top-level AgentExecutor runs). group_by="session_id"
+    groups matching runs by their session_id (the CLI), ignoring the IDs in
+    `exclude_session_ids`.
+    """
+    run_type: Optional[str] = None
+    name_contains: Optional[str] = None
+    start_after: Optional[datetime] = None
+    start_before: Optional[datetime] = None
+    root_only: bool = True
+    group_by: str = "run"
+    exclude_session_ids: frozenset = field(default_factory=frozenset)
+    # Safety net against scanning a whole project when matches are rare.
+    max_scan: Optional[int] = None
+
+
+AGENT_EXECUTOR_SESSIONS = SessionQuery(run_type="chain", name_contains="AgentExecutor")
+
+
+@dataclass
+class DiscoveryResult:
+    sessions: list
+    scanned_runs: int = 0
+    earliest: Optional[datetime] = None
+    latest: Optional[datetime] = None
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _iso(value: datetime) -> str:
+    return _utc(value).isoformat()
+
+
+def build_filter(query: SessionQuery) -> Optional[str]:
+    """Translates the predicates list_runs has no keyword argument for into a filter query."""
+    clauses = []
+    if query.name_contains:
+        clauses.append(f"search({_quote(query.name_contains)})")
+    if query.start_before:
+        clauses.append(f"lt(start_time, {_quote(_iso(query.start_before))})")
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return f"and({', '.join(clauses)})"
+
+
+def build_list_runs_kwargs(project_id: str, query: SessionQuery) -> dict:
+    """Returns the list_runs arguments for a session query."""
+    kwargs = {"project_id": project_id, "select": SESSION_SELECT_FIELDS}
+    if query.root_only:
+        kwargs["is_root"] = True
+    if query.run_type:
+        kwargs["run_type"] = query.run_type
+    if query.start_after:
+        kwargs["start_time"] = query.start_after
+    run_filter = build_filter(query)
+    if run_filter:
+        kwargs["filter"] = run_filter
+    return kwargs
+
+
+def matches(run, query: SessionQuery) -> bool:
+    """
+    Re-checks a run locally. search() is a full-text match, so a run can be
+    returned because the text appears somewhere other than its name, and
+    clients that do not evaluate filter queries ignore `start_before`.
+    """
+    if query.run_type and getattr(run, "run_type", None) != query.run_type:
+        return False
+    if query.name_contains and query.name_contains not in (getattr(run, "name", None) or ""):
+        return False
+    if query.start_before:
+        start_time = getattr(run, "start_time", None)
+        if start_time is not None and _utc(start_time) >= _utc(query.start_before):
+            return False
+    return True
+
+
+def discover_sessions(client, project_id: str, limit: int, query: SessionQuery = AGENT_EXECUTOR_SESSIONS,
+                      loader=None) -> DiscoveryResult:
+    """
+    Streams candidate runs newest first and keeps paging until exactly
+    `limit` sessions were found (or the project has no more candidates).
+    """
+    list_runs_kwargs = build_list_runs_kwargs(project_id, query)
+    if loader is not None:
+        runs = loader.stream(client.list_runs, **list_runs_kwargs)
+    else:
+        runs = client.list_runs(**list_runs_kwargs)
+
+    result = DiscoveryResult(sessions=[])
+    sessions_map = {}
+    for run in runs:
+        result.scanned_runs += 1
+        timestamp = get_timestamp_from_run(run, fallback_to_now=False)
+        if timestamp is not None:
+            result.earliest = timestamp if result.earliest is None else min(result.earliest, timestamp)
+            result.latest = timestamp if result.latest is None else max(result.latest, timestamp)
+
+        if matches(run, query):
+            if query.group_by == "session_id":
+                _add_grouped_session(sessions_map, run, query)
+            elif str(run.id) not in sessions_map:
+                sessions_map[str(run.id)] = {
+                    "id": run.id,
+                    "name": run.name or f"Session {str(run.id)[:8]}",
+                    "created_at": timestamp,
+                    "start_time": getattr(run, "start_time", None),
+                    "end_time": getattr(run, "end_time", None),
+                }
+
+        if len(sessions_map) >= limit:
+            break
+        if query.max_scan and result.scanned_runs >= query.max_scan:
+            break
+
+    result.sessions = list(sessions_map.values())[:limit]
+    return result
+
+
+def _add_grouped_session(sessions_map, run, query: SessionQuery):
+    session_id = getattr(run, "session_id", None)
+    if not session_id or str(session_id) in query.exclude_session_ids:
+        return
+    session_uuid = str(session_id)
+    if session_uuid not in sessions_map:
+        sessions_map[session_uuid] = {
+            "id": uuid.UUID(session_uuid),
+            "name": f"Session {session_uuid[:8]}...",
+            "created_at": get_timestamp_from_run(run, fallback_to_now=False),
+            "start_time": getattr(run, "start_time", None),
+            "end_time": getattr(run, "end_time", None),
+        }
+    if getattr(run, "run_type", None) == "session" and getattr(run, "name", None):
+        sessions_map[session_uuid]["name"] = run.name
@@ -0,0 +1,54 @@
+"""Session list loading shared by the CLI and the Streamlit app."""
+import uuid
+from datetime import datetime, timezone
+
+from .models import Session
+from .session_discovery import AGENT_EXECUTOR_SESSIONS, discover_sessions
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def get_default_project(client, loader=None):
+    """Returns the first project of the account, or None if there is none."""
+    if loader is not None:
+        projects = loader.call(client.list_projects, limit=1)
+    else:
+        projects = list(client.list_projects(limit=1))
+    return projects[0] if projects else None
+
+
+def list_projects(client, limit: int = None, loader=None):
+    """Returns the projects of the account, in the order LangSmith lists them."""
+    if loader is not None:
+        return loader.call(client.list_projects, limit=limit)
+    return list(client.list_projects(limit=limit))
+
+
+def find_project(projects, name_or_id: str):
+    """Returns the project whose ID or name is `name_or_id`, or None."""
+    for project in projects:
+        if name_or_id in (str(project.id), project.name):
+            return project
+    return None
+
+
+def load_sessions(client, project_id: str, limit: int, query=AGENT_EXECUTOR_SESSIONS, loader=None,
+                  project_name: str = None, project_fallback: bool = False):
+    """
+    Returns the latest `limit` sessions of a project as Session records,
+    newest first. With `project_fallback`, a project whose runs have no
+    distinct sessions is returned as a single session covering the whole
+    project, with the project ID as its ID.
+    """
+    discovery = discover_sessions(client, project_id, limit, query, loader=loader)
+    sessions = [Session.from_dict(data) for data in discovery.sessions]
+    if not sessions and project_fallback and discovery.scanned_runs:
+        sessions = [Session(
+            id=uuid.UUID(str(project_id)),
+            name=project_name or "Default Project Session",
+            created_at=discovery.earliest,
+            start_time=discovery.earliest,
+            end_time=discovery.latest,
+        )]
+    sessions.sort(key=lambda s: s.created_at or _EPOCH, reverse=True)
+    return sessions[:limit]
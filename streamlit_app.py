@@ -2,40 +2,83 @@ import streamlit as st
 
 # Must be the first Streamlit command
 st.set_page_config(layout="wide", page_title="LangSmith Session Annotator")
-st.session_state.project_id = "7850c373-f1e7-4138-94b9-05253ecee199"
-st.session_state.project_name = "langsmtih_stefan"
 import os
-import streamlit as st
-
-# Set environment variables from Streamlit secrets
-os.environ["LANGSMITH_API_KEY"] = st.secrets["LANGSMITH_API_KEY"]
-os.environ["LANGCHAIN_TRACING_V2"] = st.secrets.get("LANGCHAIN_TRACING_V2", "true")
-
+import time
 import uuid
-from langsmith.client import Client
-from datetime import datetime, timezone
-client = Client()
-
-# --- MockSession class moved to global scope for Streamlit caching compatibility ---
-class MockSession:
-    def __init__(self, data):
-        for k, v in data.items():
-            setattr(self, k, v)
-
-# --- LangSmith Client Initialization ---
-# try:
-#     client = Client()
-#     test_projects = list(client.list_projects(limit=3))
-#     if not test_projects:
-#         st.error("❌ No LangSmith projects found. Please ensure your API key is correct and you have projects in LangSmith.")
-#         st.stop()
-#     st.session_state.project_id = str(test_projects[1].id)
-#     st.session_state.project_name = test_projects[0].name
-#     st.success(f"Connected to LangSmith! Using Project: {st.session_state.project_name} (ID: {st.session_state.project_id})")
-# except Exception as e:
-#     st.error("❌ Failed to connect to LangSmith. Please check your `LANGSMITH_API_KEY` or `secrets.toml`.")
-#     st.error(f"Error details: {e}")
-#     st.stop()
+from datetime import datetime, timedelta, timezone
+from langsmith_annotator import data_access, runtime
+from langsmith_annotator.annotation_queue import AnnotationQueue, build_work_list, prefetch_upcoming, work_list_query
+from langsmith_annotator.client_factory import default_client_spec, is_offline_spec
+from langsmith_annotator.dataset_promotion import PROMOTION_WINDOW_DAYS, promote_runs
+from langsmith_annotator.extraction import ENGINE
+from langsmith_annotator.feedback_analytics import ANALYTICS_WINDOW_DAYS, FeedbackAnalytics
+from langsmith_annotator.feedback_queue import FeedbackQueue, FeedbackSubmission
+from langsmith_annotator.instrumentation import METRICS
+from langsmith_annotator.keyed_cache import KeyedCache
+from langsmith_annotator.live_tail import TAIL_MIN_INTERVAL_SECONDS, LiveTail
+from langsmith_annotator.merged_runs import RunSource, iter_merged_runs, project_source, session_source, sync_sources
+from langsmith_annotator.models import PartialIndex
+from langsmith_annotator.prefetcher import Prefetcher
+from langsmith_annotator.request_layer import RATE_LIMITER
+from langsmith_annotator.run_index import RunIndex
+from langsmith_annotator.run_payload import PREVIEW_MAX_ITEMS, truncate_payload, truncate_text
+from langsmith_annotator.session_discovery import SessionQuery
+from langsmith_annotator.sessions import list_projects, load_sessions
+
+RERUN_STARTED = time.perf_counter()
+
+# 'langsmith', 'fake[:N]' or 'offline:<dir>' (see client_factory).
+CLIENT_SPEC = default_client_spec()
+OFFLINE = is_offline_spec(CLIENT_SPEC)
+
+# Set environment variables from Streamlit secrets (once per server process)
+if not OFFLINE and "LANGSMITH_API_KEY" not in os.environ:
+    os.environ["LANGSMITH_API_KEY"] = st.secrets["LANGSMITH_API_KEY"]
+    os.environ["LANGCHAIN_TRACING_V2"] = st.secrets.get("LANGCHAIN_TRACING_V2", "true")
+
+# The client, run cache and loader are process-wide singletons in
+# langsmith_annotator.runtime, built on first use and kept across reruns.
+client = runtime.get_client(CLIENT_SPEC)
+get_loader = runtime.get_loader
+
+def get_run_cache():
+    """The run/feedback cache shared by all Streamlit sessions (in memory for offline and fake data)."""
+    return runtime.get_run_cache(CLIENT_SPEC)
+
+@st.cache_resource
+def get_memory_cache():
+    """
+    In-memory LRU in front of the run cache, shared by all Streamlit sessions.
+    Entries are keyed per run or per session so an annotation only
+    invalidates the feedback of the run it was added to.
+    """
+    return KeyedCache(max_entries=MEMORY_CACHE_MAX_ENTRIES)
+
+@st.cache_resource
+def get_feedback_queue():
+    """Background annotation queue shared by all Streamlit sessions."""
+    memory = get_memory_cache()
+    return FeedbackQueue(
+        client, cache=get_run_cache(), loader=get_loader(),
+        on_change=lambda run_id: memory.invalidate(feedback_key(run_id)),
+    )
+
+@st.cache_resource
+def get_prefetcher():
+    """Bounded background pool, shared by all Streamlit sessions, that warms
+    the run cache for what the user is likely to open next."""
+    return Prefetcher()
+
+@st.cache_resource
+def get_feedback_analytics(project_id: str, days: int):
+    """Feedback aggregates shared by all Streamlit sessions; each refresh only folds in new feedback."""
+    return FeedbackAnalytics(project_id, days=days)
+
+def feedback_key(run_id):
+    return ("feedback", str(run_id))
+
+def session_tag(session_id):
+    return f"session:{session_id}"
 
 # --- Global State ---
 if 'current_project_id' not in st.session_state:
@@ -46,86 +89,582 @@ if 'all_sessions' not in st.session_state:
     st.session_state.all_sessions = []
 
 SESSION_DISPLAY_LIMIT = 10
+RUN_PAGE_SIZE = 25
+SESSION_LIST_TTL_SECONDS = 300
+MEMORY_CACHE_MAX_ENTRIES = 4096
+# Sessions on each side of the selected one whose first page is prefetched.
+PREFETCH_SESSION_NEIGHBORS = 1
+# Runs after (and before) the selected one whose payload is prefetched.
+PREFETCH_RUN_NEIGHBORS = 2
+# Newest runs shown in the merged view of several projects or sessions.
+MERGED_RUN_LIMIT = 500
+# Search results listed in the sidebar.
+SEARCH_RESULT_LIMIT = 10
+# Session state keys of the views that replace the selected session in the main area.
+MAIN_VIEWS = ("analytics_days", "annotation_queue", "merged_sources", "search_hit")
+
+def get_projects():
+    """The projects of the account, shared by all Streamlit sessions for a few minutes."""
+    try:
+        return get_memory_cache().get_or_load(
+            ("projects",),
+            lambda: list_projects(client, loader=get_loader()),
+            ttl_s=SESSION_LIST_TTL_SECONDS,
+        )
+    except Exception as e:
+        st.error(f"❌ Failed to fetch projects: {e}")
+        return []
 
-def get_timestamp_from_run(run):
-    if hasattr(run, 'start_time') and run.start_time:
-        return run.start_time
-    if hasattr(run, 'created_at') and run.created_at:
-        return run.created_at
-    if hasattr(run, 'extra') and isinstance(run.extra, dict):
-        if run.extra.get('start_time'):
-            return run.extra['start_time']
-        if run.extra.get('created_at'):
-            return run.extra['created_at']
-    return datetime.now(timezone.utc)
-
-@st.cache_data(ttl=300)
-def get_last_n_sessions(limit: int = 10):
+def select_project(project):
+    """Switches to another project and drops everything that was loaded for the previous one."""
+    st.session_state.project_id = str(project.id)
+    st.session_state.project_name = project.name
+    st.session_state.all_sessions = []
+    st.session_state.selected_session = None
+    open_view(None)
+
+def open_view(view: str, value=None):
+    """Shows one of MAIN_VIEWS in the main area instead of the selected session (None: the session)."""
+    for key in MAIN_VIEWS:
+        st.session_state.pop(key, None)
+    if view is not None:
+        st.session_state[view] = value
+
+def session_query(run_type: str, name_contains: str, days: int) -> SessionQuery:
+    return SessionQuery(
+        run_type=run_type or None,
+        name_contains=name_contains or None,
+        start_after=datetime.now(timezone.utc) - timedelta(days=days) if days else None,
+    )
+
+def get_last_n_sessions(limit: int = 10, run_type: str = "chain", name_contains: str = "AgentExecutor",
+                        days: int = 0):
     """
-    Return the last N top-level AgentExecutor runs as 'sessions'.
+    Return the last N top-level runs matching the session filters (by default
+    AgentExecutor chains) as 'sessions'. The filters are applied by LangSmith,
+    so paging continues until exactly N sessions are found.
     """
+    query = session_query(run_type, name_contains, days)
+    project_id = st.session_state.project_id
     try:
-        runs = list(client.list_runs(
-            project_id=st.session_state.project_id,
-            execution_order=1,  # Top-level only
-            limit=limit * 2
-        ))
-
-        sessions = []
-        for run in runs:
-            if run.run_type == "chain" and "AgentExecutor" in run.name:
-                sessions.append({
-                    "id": run.id,
-                    "name": run.name or f"Session {str(run.id)[:8]}",
-                    "created_at": run.start_time or run.created_at,
-                    "start_time": run.start_time,
-                    "end_time": run.end_time
-                })
-            if len(sessions) >= limit:
-                break
-
-        return [MockSession(s) for s in sessions]
+        return get_memory_cache().get_or_load(
+            ("sessions", project_id, limit, run_type, name_contains, days),
+            lambda: load_sessions(client, project_id, limit, query, loader=get_loader()),
+            tags=("sessions",),
+            ttl_s=SESSION_LIST_TTL_SECONDS,
+        )
 
     except Exception as e:
         st.error(f"❌ Failed to fetch sessions: {e}")
         return []
 
 
-@st.cache_data(ttl=300)
-def get_runs_for_id(target_id: str):
+def sync_runs_for_id(target_id: str, refresh: bool = False):
     """
-    Fetches all child runs of a top-level AgentExecutor run using parent_run_id.
+    Makes sure the child runs of a top-level AgentExecutor run are in the
+    local cache, syncing incrementally using parent_run_id.
+    Returns the number of cached child runs.
     """
-    st.info(f"Fetching child runs for session (AgentExecutor): {target_id}...")
+    memory = get_memory_cache()
+    count_key = ("run_count", target_id)
+    run_count = None if refresh else memory.get(count_key)
+    if run_count is not None:
+        return run_count
+    # A new sync can shift every page of this session, and only this session.
+    memory.invalidate_tag(session_tag(target_id))
     try:
-        return list(client.list_runs(parent_run_id=target_id))
+        cache = get_run_cache()
+        data_access.ensure_synced(
+            client, cache, "parent", target_id,
+            project_id=st.session_state.project_id, refresh=refresh, loader=get_loader(),
+        )
+        run_count = data_access.count_runs(cache, "parent", target_id)
     except Exception as e:
         st.error(f"❌ Error fetching child runs: {e}")
-        return []
+        return 0
+    memory.set(count_key, run_count, tags=(session_tag(target_id),),
+               ttl_s=data_access.RUN_SYNC_INTERVAL_SECONDS)
+    return run_count
+
+def get_run_index_for_id(target_id: str):
+    """
+    Returns the RunIndex over all cached child runs (summaries) of a session,
+    newest first. Built once per sync and shared by reruns and sessions.
+    """
+    return get_memory_cache().get_or_load(
+        ("run_index", target_id),
+        lambda: RunIndex(data_access.get_runs(client, get_run_cache(), "parent", target_id,
+                                              project_id=st.session_state.project_id, loader=get_loader())),
+        tags=(session_tag(target_id),),
+        ttl_s=data_access.RUN_SYNC_INTERVAL_SECONDS,
+    )
+
+def get_trace_for_id(trace_id: str, refresh: bool = False):
+    """
+    Returns (RunTree, RunIndex) for a whole trace, nested tool and LLM calls
+    included, loaded with one trace_id query. The index lists the runs in
+    tree order with indented labels. Returns (None, None) on error.
+    """
+    memory = get_memory_cache()
+    trace_key = ("trace", trace_id)
+    if refresh:
+        memory.invalidate(trace_key)
+
+    def load():
+        tree = data_access.get_trace_tree(
+            client, get_run_cache(), trace_id, project_id=st.session_state.project_id,
+            refresh=refresh, loader=get_loader(),
+        )
+        nodes = list(tree.walk())
+        labels = {
+            node.id: f"{tree_indent(node.depth)}{node.run.name} ({node.run.run_type}) - {node.id[:8]}..."
+            for node in nodes
+        }
+        return tree, RunIndex([node.run for node in nodes], labels=labels)
+
+    try:
+        return memory.get_or_load(trace_key, load, tags=(session_tag(trace_id),),
+                                  ttl_s=data_access.RUN_SYNC_INTERVAL_SECONDS)
+    except Exception as e:
+        st.error(f"❌ Error fetching trace: {e}")
+        return None, None
+
+def tree_indent(depth: int):
+    # Em spaces survive Markdown whitespace collapsing.
+    return "\u2003\u2003" * depth
+
+def render_trace_tree(tree):
+    """
+    Draws a trace as an indented tree. Branches collapse and expand with
+    their button; returns the runs that are currently visible, in tree order.
+    """
+    collapsed = st.session_state.setdefault("collapsed_runs", set())
+    visible = []
+    for node in tree.walk(collapsed):
+        visible.append(node)
+        label = f"{tree_indent(node.depth)}{node.run.name} ({node.run.run_type})"
+        if node.children:
+            icon = "▸" if node.id in collapsed else "▾"
+            if st.button(f"{icon} {label} · {len(node.children)}", key=f"tree_toggle_{node.id}"):
+                collapsed.symmetric_difference_update({node.id})
+                st.rerun()
+        else:
+            st.markdown(f"{label} `{node.id[:8]}`")
+    return visible
+
+def get_run_payload_for_id(run_id: str):
+    """
+    Returns the full run (inputs and outputs) for the selected run. Payloads
+    stay in the on-disk run cache only, so large ones do not pile up in
+    memory. Returns None on error.
+    """
+    try:
+        return data_access.get_run_payload(client, get_run_cache(), run_id, loader=get_loader())
+    except Exception as e:
+        st.error(f"❌ Error fetching the inputs and outputs of this run: {e}")
+        return None
 
+def show_message(text, key: str):
+    """Shows a message as code, cut to PREVIEW_MAX_CHARS unless the user asks for all of it."""
+    text = text if isinstance(text, str) else str(text)
+    preview = truncate_text(text)
+    if preview != text and st.checkbox(f"Show all {len(text):,} characters", key=f"show_all_{key}"):
+        preview = text
+    st.code(preview, language="markdown")
 
+def prefetch_owner():
+    """Identifies this browser session's prefetches in the shared pool."""
+    return st.session_state.setdefault("prefetch_owner", str(uuid.uuid4()))
 
-@st.cache_data(ttl=60)
-def get_feedback_for_run(run_id: str):
+def prefetch_around_session(sessions, selected_index: int):
+    """
+    Warms the first page of runs (and their feedback) of the sessions next to
+    the selected one in the background. Queued prefetches for a session the
+    user has since moved away from are cancelled.
+    """
+    prefetcher = get_prefetcher()
+    group = str(sessions[selected_index].id)
+    prefetcher.cancel_stale(prefetch_owner(), group)
+    for distance in range(1, PREFETCH_SESSION_NEIGHBORS + 1):
+        for index in (selected_index + distance, selected_index - distance):
+            if 0 <= index < len(sessions):
+                neighbor_id = str(sessions[index].id)
+                prefetcher.prefetch(
+                    ("runs_page", neighbor_id, 0), data_access.warm_runs_page,
+                    client, get_run_cache(), "parent", neighbor_id, 0, RUN_PAGE_SIZE,
+                    project_id=st.session_state.project_id, loader=get_loader(),
+                    owner=prefetch_owner(), group=group,
+                )
+
+def prefetch_around_run(session_id: str, run_ids, selected_index: int, next_page_ids=()):
+    """Warms the payloads of the runs next to the selected one, and the feedback of the next page."""
+    prefetcher = get_prefetcher()
+    for distance in range(1, PREFETCH_RUN_NEIGHBORS + 1):
+        for index in (selected_index + distance, selected_index - distance):
+            if 0 <= index < len(run_ids):
+                prefetcher.prefetch(
+                    ("run_payload", run_ids[index]), data_access.get_run_payload,
+                    client, get_run_cache(), run_ids[index], loader=get_loader(),
+                    owner=prefetch_owner(), group=session_id,
+                )
+    if next_page_ids:
+        prefetcher.prefetch(
+            ("feedback", session_id, next_page_ids[0]), data_access.get_feedback_index,
+            client, get_run_cache(), list(next_page_ids), loader=get_loader(),
+            owner=prefetch_owner(), group=session_id,
+        )
+
+def get_feedback_for_runs(run_ids):
+    """
+    Returns feedback for the given runs grouped by run ID. Each run's
+    feedback is cached under its own key; only the runs that are not cached
+    are loaded, in batched requests. Runs whose feedback could not be loaded
+    are listed in the result's `missing` set and are not cached.
+    """
+    memory = get_memory_cache()
+    feedback_index = PartialIndex()
+    missing = []
+    for run_id in run_ids:
+        feedback_list = memory.get(feedback_key(run_id))
+        if feedback_list is None:
+            missing.append(run_id)
+        else:
+            feedback_index[run_id] = feedback_list
+    if not missing:
+        return feedback_index
     try:
-        return list(client.list_feedback(run_ids=[run_id]))
+        loaded = data_access.get_feedback_index(client, get_run_cache(), missing, loader=get_loader(), partial=True)
     except Exception as e:
-        st.error(f"❌ Error fetching feedback for run {run_id}: {e}")
-        return []
+        loaded = PartialIndex(missing=missing, errors=[e])
+    if not loaded.complete:
+        st.warning(f"⚠️ Feedback for {len(loaded.missing)} of {len(run_ids)} runs could not be loaded "
+                   f"({loaded.errors[-1]}). Their annotations may be missing or outdated; refresh to retry.")
+    for run_id, feedback_list in loaded.items():
+        if run_id not in loaded.missing:
+            memory.set(feedback_key(run_id), feedback_list, ttl_s=data_access.FEEDBACK_MAX_AGE_SECONDS)
+    return feedback_index.merge(loaded)
 
 def create_new_annotation(run_id: str, key: str, value: str):
     st.info(f"Adding annotation to run {run_id} (Key: '{key}', Value: '{value}')...")
     try:
-        feedback = client.create_feedback(run_id=run_id, key=key, value=value)
+        feedback = data_access.create_annotation(client, get_run_cache(), run_id, key, value)
+        get_memory_cache().invalidate(feedback_key(run_id))
         st.success("✅ Annotation added successfully!")
         st.write(f"Feedback ID: {feedback.id}")
-        get_runs_for_id.clear()
-        get_feedback_for_run.clear()
         return feedback
     except Exception as e:
         st.error(f"❌ Failed to add annotation. Error: {e}")
         return None
 
+def queue_bulk_annotation(run_ids, key: str, value: str, score=None):
+    """Queues the same annotation for many runs. The cache is patched right away,
+    the submissions are sent in the background."""
+    submissions = get_feedback_queue().submit_many(
+        FeedbackSubmission(run_id=run_id, key=key, value=value, score=score) for run_id in run_ids
+    )
+    st.success(f"⏳ Queued {len(submissions)} annotations (Key: '{key}', Value: '{value}').")
+    return submissions
+
+def show_run_payload(selected_run):
+    """Shows the user input, messages and final response of a run. The
+    extraction of a run seen before is memoized, so redraws do not read or
+    walk its inputs/outputs again; the raw outputs are loaded only on request."""
+    run_id = str(selected_run.id)
+    extraction = ENGINE.cached(run_id)
+    if extraction is None:
+        payload_run = get_run_payload_for_id(run_id)
+        if payload_run is None:
+            return
+        extraction = ENGINE.extract(payload_run)
+
+    if extraction.user_input:
+        st.markdown("### 🧠 User Input")
+        show_message(extraction.user_input, key=f"input_{run_id}")
+
+    if len(extraction.messages) > 1:
+        with st.expander(f"💬 Messages ({len(extraction.messages)})"):
+            for role, content in extraction.messages[-PREVIEW_MAX_ITEMS:]:
+                st.markdown(f"**{role}:** {truncate_text(str(content))}")
+
+    if extraction.final_output:
+        st.markdown("### 🤖 Assistant's Final Response")
+        show_message(extraction.final_output, key=f"output_{run_id}")
+    else:
+        st.warning("⚠️ Could not extract the final output.")
+        if st.checkbox("Show raw outputs", key=f"raw_outputs_{run_id}"):
+            payload_run = get_run_payload_for_id(run_id)
+            st.json(truncate_payload(getattr(payload_run, "outputs", None)), expanded=False)
+
+def promote_annotated_runs(source, feedback_key: str, value: str, dataset_name: str, start_after=None):
+    """
+    Copies the runs of `source` (started since `start_after`, if given)
+    annotated with `feedback_key` (and `value`) into a dataset and reports
+    the outcome.
+    """
+    try:
+        with st.status(f"Promoting runs annotated with '{feedback_key}' to '{dataset_name}'...") as status:
+            result = promote_runs(client, source, feedback_key, dataset_name, value=value or None,
+                                  start_after=start_after, loader=get_loader(), progress=status.write)
+    except Exception as e:
+        st.error(f"❌ Promotion failed: {e}")
+        return
+    if not result.selected:
+        st.info("No matching runs to promote.")
+    else:
+        st.success(f"✅ {len(result.created)} example(s) added to '{dataset_name}', "
+                   f"{len(result.skipped)} already there.")
+    if result.failed:
+        st.warning(f"⚠️ {len(result.failed)} run(s) could not be promoted ({result.errors[0]}). "
+                   "Promote again to retry them.")
+
+def start_annotation_queue(feedback_key: str, run_type: str, name_contains: str, days: int):
+    """Builds the work list of runs missing `feedback_key` and opens it in the main area."""
+    query = work_list_query(
+        feedback_key, run_type, name_contains,
+        start_after=datetime.now(timezone.utc) - timedelta(days=days) if days else None,
+    )
+    try:
+        work_list = build_work_list(client, get_run_cache(), st.session_state.project_id, query, loader=get_loader())
+    except Exception as e:
+        st.error(f"❌ Failed to build the work list: {e}")
+        return
+    open_view("annotation_queue", AnnotationQueue(work_list, query))
+
+def render_annotation_queue(queue):
+    """Shows the current run of the annotation queue with next/previous navigation."""
+    feedback_key = queue.query.feedback_key
+    st.header(f"Annotation Queue: '{feedback_key}'")
+    if st.button("✖️ Leave queue"):
+        del st.session_state.annotation_queue
+        st.rerun()
+    run = queue.current
+    if run is None:
+        st.success(f"🎉 No runs left without a '{feedback_key}' annotation "
+                   f"({len(queue.done)} annotated in this queue).")
+        return
+    prefetch_upcoming(queue, get_prefetcher(), client, get_run_cache(), loader=get_loader(), owner=prefetch_owner())
+
+    st.progress(len(queue.done) / len(queue))
+    st.caption(f"Run {queue.position + 1} of {len(queue)} · {queue.remaining} left")
+    col_prev, col_next = st.columns(2)
+    if col_prev.button("⬅️ Previous"):
+        queue.previous()
+        st.rerun()
+    if col_next.button("Next ➡️"):
+        queue.next()
+        st.rerun()
+
+    st.markdown(f"#### Run: {run.name} (ID: `{run.id}`)")
+    st.write(f"**Type:** {run.run_type}  ·  **Start Time:** "
+             f"{run.start_time.strftime('%Y-%m-%d %H:%M:%S UTC') if run.start_time else 'N/A'}")
+    show_run_payload(run)
+    for fb in get_feedback_for_runs([str(run.id)]).get(str(run.id), []):
+        st.caption(f"🔑 {fb.key}: {fb.value}")
+
+    with st.form(f"queue_form_{run.id}"):
+        queue_value = st.text_input(f"Value for '{feedback_key}' (e.g., good)")
+        queue_score = st.text_input("Score (optional)")
+        if st.form_submit_button("Submit and next"):
+            try:
+                score = float(queue_score) if queue_score.strip() else None
+            except ValueError:
+                st.warning("Score must be a number.")
+            else:
+                if queue_value:
+                    get_feedback_queue().submit(FeedbackSubmission(
+                        run_id=str(run.id), key=feedback_key, value=queue_value, score=score,
+                    ))
+                    queue.mark_done()
+                    st.rerun()
+                else:
+                    st.warning("Please fill in a value.")
+
+def get_merged_runs(sources, refresh: bool = False):
+    """
+    Returns (RunIndex, failures) over the newest MERGED_RUN_LIMIT runs of
+    several projects or sessions. Their listings are synced concurrently and
+    merged newest first; a run listed by two sources is shown once.
+    `failures` maps the sources that could not be loaded to their error.
+    """
+    memory = get_memory_cache()
+    merged_key = ("merged_runs", tuple(sources))
+    cached = None if refresh else memory.get(merged_key)
+    if cached is not None:
+        return cached, {}
+
+    cache = get_run_cache()
+    failures = sync_sources(client, cache, get_loader(), sources, refresh=refresh)
+    runs, labels = [], {}
+    merged = iter_merged_runs(cache, [source for source in sources if source not in failures], page_size=RUN_PAGE_SIZE)
+    for source, run in merged:
+        run_id = str(run.id)
+        if run_id in labels:
+            continue
+        runs.append(run)
+        labels[run_id] = f"{len(runs)}. [{source.label}] {run.name} ({run.run_type}) - {run_id[:8]}..."
+        if len(runs) == MERGED_RUN_LIMIT:
+            break
+    run_index = RunIndex(runs, labels)
+    if not failures:
+        memory.set(merged_key, run_index, ttl_s=data_access.RUN_SYNC_INTERVAL_SECONDS)
+    return run_index, failures
+
+def render_merged_runs(sources):
+    """Shows the runs of several projects or sessions as one time-ordered listing."""
+    st.header("Merged Runs")
+    st.caption(" + ".join(f"{source.label} ({source.scope})" for source in sources))
+    col_refresh, col_leave = st.columns(2)
+    if col_leave.button("✖️ Leave merged view"):
+        del st.session_state.merged_sources
+        st.rerun()
+    refresh = col_refresh.button("🔄 Refresh runs")
+    with st.spinner(f"Loading {len(sources)} sources concurrently..."):
+        run_index, failures = get_merged_runs(sources, refresh=refresh)
+    for source, error in failures.items():
+        st.error(f"❌ Failed to load the runs of {source.label}: {error}")
+    if not len(run_index):
+        st.info("No runs found.")
+        return
+
+    page_count = max(1, (len(run_index) + RUN_PAGE_SIZE - 1) // RUN_PAGE_SIZE)
+    page = 0
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count}, {len(run_index)} newest runs)",
+                               min_value=1, max_value=page_count, value=1, step=1, key="merged_page") - 1
+    page_ids = run_index.ids[page * RUN_PAGE_SIZE:(page + 1) * RUN_PAGE_SIZE]
+    selected_run_id = st.selectbox("Select a Run:", page_ids, format_func=run_index.label, key="merged_run_selector")
+    run = run_index.get(selected_run_id)
+
+    render_run_annotation(run, page_ids, form_key="merged_form")
+
+def render_run_annotation(run, feedback_run_ids, form_key: str):
+    """
+    Shows one run with its payload and annotations and a form to add one.
+    Feedback is loaded for all of `feedback_run_ids` (e.g. the page the run
+    is on) in one batch.
+    """
+    st.markdown(f"#### Run: {run.name} (ID: `{run.id}`)")
+    st.write(f"**Type:** {run.run_type}  ·  **Start Time:** "
+             f"{run.start_time.strftime('%Y-%m-%d %H:%M:%S UTC') if run.start_time else 'N/A'}")
+    show_run_payload(run)
+    for fb in get_feedback_for_runs(feedback_run_ids).get(str(run.id), []):
+        st.caption(f"🔑 {fb.key}: {fb.value}")
+
+    with st.form(f"{form_key}_{run.id}"):
+        annotation_key = st.text_input("Key (e.g., quality)")
+        annotation_value = st.text_input("Value (e.g., good)")
+        if st.form_submit_button("Submit"):
+            if annotation_key and annotation_value:
+                create_new_annotation(str(run.id), annotation_key, annotation_value)
+                st.rerun()
+            else:
+                st.warning("Please fill in both key and value.")
+
+def search_runs(text: str):
+    """
+    Ranked runs of the current project whose user input or final answer
+    matches `text`, from the local full-text index. The index is brought up
+    to date incrementally, at most once per SEARCH_SYNC_INTERVAL_SECONDS.
+    """
+    cache = get_run_cache()
+    if not cache.search_available:
+        st.warning("⚠️ Search needs an SQLite build with FTS5.")
+        return []
+    try:
+        data_access.sync_search_index(client, cache, st.session_state.project_id, loader=get_loader())
+    except Exception as e:
+        st.warning(f"⚠️ Could not index the newest runs, results may be incomplete: {e}")
+    return data_access.search_runs(cache, text, st.session_state.project_id, limit=SEARCH_RESULT_LIMIT)
+
+def render_search_hit(hit):
+    """Opens a search result for annotation, with its whole trace one click away."""
+    st.header("Search Result")
+    st.caption(hit.snippet)
+    if st.button("✖️ Back"):
+        open_view(None)
+        st.rerun()
+    run = get_run_payload_for_id(hit.run_id)
+    if run is None:
+        return
+    render_run_annotation(run, [hit.run_id], form_key="search_form")
+    tree, _ = get_trace_for_id(hit.trace_id)
+    if tree is not None and len(tree) > 1:
+        with st.expander(f"🌳 Trace tree ({len(tree)} runs)"):
+            render_trace_tree(tree)
+
+def get_live_tail(session_filters):
+    """This browser session's tail of the session list, restarted when the project or filters change."""
+    tail_key = (st.session_state.project_id, session_filters)
+    if st.session_state.get("live_tail_key") != tail_key:
+        st.session_state.live_tail_key = tail_key
+        st.session_state.live_tail = LiveTail(st.session_state.project_id, session_query(*session_filters),
+                                              st.session_state.all_sessions)
+    return st.session_state.live_tail
+
+@st.fragment(run_every=TAIL_MIN_INTERVAL_SECONDS)
+def render_live_tail(session_filters):
+    """
+    Polls the tail whenever it is due (the interval adapts to activity) and
+    reruns the app when new sessions or new feedback on the watched runs came in.
+    """
+    tail = get_live_tail(session_filters)
+    if tail.due():
+        update = tail.poll(client, get_run_cache(), watch=st.session_state.get("watched_run_ids", ()),
+                           loader=get_loader())
+        memory = get_memory_cache()
+        for fb in update.feedback:
+            memory.invalidate(feedback_key(fb.run_id))
+        if update:
+            st.session_state.all_sessions = list(tail.sessions)
+            st.session_state.tail_news = (f"{len(update.sessions)} new session(s), "
+                                          f"{len(update.feedback)} new annotation(s)")
+            st.rerun()
+    if tail.last_error is not None:
+        st.warning(f"⚠️ Last poll failed: {tail.last_error}")
+    if st.session_state.get("tail_news"):
+        st.caption(f"🆕 {st.session_state.tail_news}")
+    st.caption(f"📡 {tail.polls} poll(s), next in {tail.next_poll_in():.0f}s "
+               f"(every {tail.interval:.0f}s while idle).")
+
+def render_feedback_analytics(days: int):
+    """Feedback distributions per key, score averages per session and annotator coverage over time."""
+    analytics = get_feedback_analytics(st.session_state.project_id, days)
+    st.header("Feedback Analytics")
+    col_refresh, col_leave = st.columns(2)
+    if col_leave.button("✖️ Leave analytics"):
+        del st.session_state.analytics_days
+        st.rerun()
+    if col_refresh.button("🔄 Refresh analytics") or analytics.refreshed_at is None:
+        with st.spinner("Loading feedback..."):
+            try:
+                processed = analytics.refresh(client, get_run_cache(), loader=get_loader())
+            except Exception as e:
+                st.error(f"❌ Failed to load feedback: {e}")
+                return
+        st.caption(f"{processed} new or changed annotation(s) processed.")
+
+    window = f"last {days} day(s)" if days else "all time"
+    st.caption(f"Project `{st.session_state.project_id}`, runs of the {window}, "
+               f"updated {analytics.refreshed_at.strftime('%H:%M:%S UTC')}")
+    col_feedback, col_runs, col_ratio = st.columns(3)
+    col_feedback.metric("Annotations", len(analytics.frame))
+    col_runs.metric("Annotated runs", f"{analytics.annotated_runs()} / {analytics.runs_in_window}")
+    col_ratio.metric("Coverage", f"{analytics.annotated_runs() / max(1, analytics.runs_in_window):.1%}")
+    if analytics.frame.empty:
+        st.info("No feedback in this window yet.")
+        return
+
+    st.subheader("Feedback per key and value")
+    distribution = analytics.key_distribution()
+    st.bar_chart(distribution)
+    st.dataframe(distribution)
+    st.subheader("Scores per key")
+    st.dataframe(analytics.key_scores())
+    st.subheader("Scores per session")
+    st.dataframe(analytics.session_scores())
+    st.subheader("Annotations per day and annotator")
+    st.bar_chart(analytics.coverage())
+
 # --- UI ---
 st.title("LangSmith Session Annotator")
 
@@ -133,29 +672,78 @@ st.markdown("""
 This application allows you to browse your LangSmith project's runs (sessions)
 and add custom annotations (feedback) directly from a web UI.
 """)
+if OFFLINE:
+    st.info(f"📦 Not connected to LangSmith: serving data from `{CLIENT_SPEC}`.")
 
 # Sidebar
 with st.sidebar:
+    projects = get_projects()
+    if not projects:
+        st.error("❌ No LangSmith projects found. Please ensure your API key is correct "
+                 "and you have projects in LangSmith.")
+        st.stop()
+    projects_by_id = {str(p.id): p for p in projects}
+    project_id = st.selectbox("📁 Project", list(projects_by_id), key="project_selector",
+                              format_func=lambda i: projects_by_id[i].name)
+    if project_id != st.session_state.get("project_id"):
+        select_project(projects_by_id[project_id])
+
     st.header("Chat Sessions")
 
+    with st.expander("Session filters"):
+        filter_run_type = st.text_input("Run type", value="chain")
+        filter_name = st.text_input("Name contains", value="AgentExecutor")
+        filter_days = st.number_input("Only the last N days (0 = all)", min_value=0, value=0, step=1)
+    session_filters = (filter_run_type.strip(), filter_name.strip(), int(filter_days))
+    live_tail_on = st.toggle("📡 Live tail (poll for new sessions and annotations)", key="live_tail_on")
+
+    with st.expander("📋 Annotation Queue"):
+        with st.form("queue_builder"):
+            queue_key = st.text_input("Feedback key to fill in", value="quality")
+            queue_run_type = st.text_input("Run type", value="chain", key="queue_run_type")
+            queue_name = st.text_input("Name contains", value="AgentExecutor", key="queue_name")
+            queue_days = st.number_input("Only the last N days (0 = all)", min_value=0, value=7, step=1,
+                                         key="queue_days")
+            if st.form_submit_button("Start queue") and queue_key.strip():
+                start_annotation_queue(queue_key.strip(), queue_run_type.strip(), queue_name.strip(),
+                                       int(queue_days))
+
+    with st.expander("📊 Feedback Analytics"):
+        analytics_days = st.number_input("Only runs of the last N days (0 = all)", min_value=0,
+                                         value=ANALYTICS_WINDOW_DAYS, step=1, key="analytics_days_input")
+        if st.button("Open analytics"):
+            open_view("analytics_days", int(analytics_days))
+
     if st.button("🔄 Refresh"):
-        get_last_n_sessions.clear()
-        st.session_state.all_sessions = get_last_n_sessions()
+        get_memory_cache().invalidate_tag("sessions")
+        st.session_state.pop("live_tail_key", None)
+        st.session_state.refresh_runs = True
+        st.session_state.all_sessions = get_last_n_sessions(SESSION_DISPLAY_LIMIT, *session_filters)
+
+    if not st.session_state.all_sessions or st.session_state.get("session_filters") != session_filters:
+        st.session_state.session_filters = session_filters
+        st.session_state.all_sessions = get_last_n_sessions(SESSION_DISPLAY_LIMIT, *session_filters)
 
-    if not st.session_state.all_sessions:
-        st.session_state.all_sessions = get_last_n_sessions()
+    if live_tail_on:
+        render_live_tail(session_filters)
 
     if st.session_state.all_sessions:
-        session_names = [
-            f"{s.name} ({str(s.id)[:8]})" for s in st.session_state.all_sessions
-        ]
-        selected_index = st.selectbox(
+        # Options are session IDs so the selection stays put when the live tail prepends sessions.
+        session_ids = [str(s.id) for s in st.session_state.all_sessions]
+        session_names = {
+            str(s.id): f"{s.name} ({str(s.id)[:8]})" for s in st.session_state.all_sessions
+        }
+        previous = st.session_state.selected_session
+        selected_id = st.selectbox(
             "🧠 Select a recent chat session:",
-            options=range(len(session_names)),
-            format_func=lambda i: session_names[i],
+            options=session_ids,
+            index=session_ids.index(str(previous.id)) if previous and str(previous.id) in session_ids else 0,
+            format_func=session_names.get,
             key="session_selector"
         )
+        selected_index = session_ids.index(selected_id)
         st.session_state.selected_session = st.session_state.all_sessions[selected_index]
+        prefetch_around_session(st.session_state.all_sessions, selected_index)
 
         s = st.session_state.selected_session
         st.markdown("---")
@@ -175,73 +763,139 @@ with st.sidebar:
         st.write(f"**ID:** `{s.id}`")
         st.write(f"**Created At:** {s.created_at.strftime('%Y-%m-%d %H:%M:%S UTC')}")
 
+    with st.expander("🔀 Merged View"):
+        sessions_by_id = {str(s.id): s for s in st.session_state.all_sessions}
+        merge_project_ids = st.multiselect("Projects", list(projects_by_id), key="merge_projects",
+                                           format_func=lambda i: projects_by_id[i].name)
+        merge_session_ids = st.multiselect("Sessions of this project", list(sessions_by_id), key="merge_sessions",
+                                           format_func=lambda i: f"{sessions_by_id[i].name} ({i[:8]})")
+        if st.button("Open merged view") and (merge_project_ids or merge_session_ids):
+            open_view("merged_sources", (
+                [project_source(projects_by_id[i]) for i in merge_project_ids]
+                + [session_source(sessions_by_id[i], st.session_state.project_id, scope="parent")
+                   for i in merge_session_ids]
+            ))
+
+    with st.expander("📚 Promote to Dataset"):
+        with st.form("promote_runs"):
+            promote_key = st.text_input("Feedback key", value="quality", key="promote_key")
+            promote_value = st.text_input("Value or score (empty = any)", value="good", key="promote_value")
+            promote_dataset = st.text_input("Dataset (created if it does not exist)", key="promote_dataset")
+            promote_scope = st.radio("Runs of", ["Whole project", "Selected session"], key="promote_scope")
+            promote_days = st.number_input("Whole project: runs of the last N days (0 = all)", min_value=0,
+                                           value=PROMOTION_WINDOW_DAYS, key="promote_days")
+            if st.form_submit_button("Promote runs") and promote_key.strip() and promote_dataset.strip():
+                promote_start = None
+                if promote_scope == "Selected session" and st.session_state.selected_session:
+                    promote_source = session_source(st.session_state.selected_session,
+                                                    st.session_state.project_id, scope="trace")
+                else:
+                    promote_source = RunSource("project", st.session_state.project_id, st.session_state.project_id)
+                    if promote_days:
+                        promote_start = datetime.now(timezone.utc) - timedelta(days=int(promote_days))
+                promote_annotated_runs(promote_source, promote_key.strip(), promote_value.strip(),
+                                       promote_dataset.strip(), start_after=promote_start)
+
+    with st.expander("🔎 Search runs", expanded=bool(st.session_state.get("run_search_text"))):
+        search_text = st.text_input("Words in the user input or final answer", key="run_search_text")
+        if search_text.strip():
+            hits = search_runs(search_text)
+            if not hits:
+                st.caption("No matching runs.")
+            for hit in hits:
+                started = hit.start_time.strftime('%Y-%m-%d %H:%M') if hit.start_time else 'N/A'
+                if st.button(f"{hit.name} · {started}", key=f"search_hit_{hit.run_id}"):
+                    open_view("search_hit", hit)
+                st.caption(hit.snippet)
+
+    feedback_queue = get_feedback_queue()
+    if feedback_queue.pending or feedback_queue.failures:
+        st.markdown("---")
+        st.subheader("Annotation Queue")
+        st.write(f"**Pending:** {feedback_queue.pending}  ·  **Sent:** {feedback_queue.succeeded}")
+        if feedback_queue.failures:
+            st.error(f"❌ {len(feedback_queue.failures)} annotation(s) failed.")
+            for submission, error in list(feedback_queue.failures)[-5:]:
+                st.caption(f"`{submission.run_id[:8]}` {submission.key}={submission.value}: {error}")
+            if st.button("Clear failures"):
+                feedback_queue.failures.clear()
+
     st.markdown("### 💡 Recent Sessions")
     for s in st.session_state.all_sessions:
         st.write(f"• `{str(s.id)[:8]}` → **{s.name}**")
 
 # Main content
-if st.session_state.selected_session:
+if st.session_state.get("analytics_days") is not None:
+    render_feedback_analytics(st.session_state.analytics_days)
+elif st.session_state.get("annotation_queue") is not None:
+    render_annotation_queue(st.session_state.annotation_queue)
+elif st.session_state.get("merged_sources"):
+    render_merged_runs(st.session_state.merged_sources)
+elif st.session_state.get("search_hit") is not None:
+    render_search_hit(st.session_state.search_hit)
+elif st.session_state.selected_session:
     s = st.session_state.selected_session
     st.header(f"Runs in Session: {s.name}")
     st.markdown("---")
-    runs = get_runs_for_id(str(s.id))
-
-    if runs:
+    refresh_runs = st.session_state.pop("refresh_runs", False)
+    run_view = st.radio("Show", ["Direct child runs", "Full trace tree"], horizontal=True, key="run_view")
+
+    run_index = None
+    visible_ids = None
+    if run_view == "Full trace tree":
+        tree, run_index = get_trace_for_id(str(s.id), refresh=refresh_runs)
+        if tree is not None and len(tree):
+            with st.expander(f"🌳 Trace tree ({len(tree)} runs)", expanded=True):
+                visible_ids = {node.id for node in render_trace_tree(tree)}
+    elif sync_runs_for_id(str(s.id), refresh=refresh_runs):
+        run_index = get_run_index_for_id(str(s.id))
+
+    if run_index is not None and len(run_index):
         st.subheader("Run Details")
-        run_dict = {str(r.id): r for r in runs}
-        run_options = [f"{i+1}. {r.name} ({r.run_type}) - {str(r.id)[:8]}..." for i, r in enumerate(runs)]
-
-        selected_run_option = st.selectbox("Select a Run:", run_options, key="run_selector")
-        selected_run_id_prefix = selected_run_option.split(" - ")[1][:8]
-
-        selected_run = next((r for r in runs if str(r.id).startswith(selected_run_id_prefix)), None)
+        search_col, type_col, status_col = st.columns([2, 1, 1])
+        run_search = search_col.text_input("Search runs (name, type, status)", key=f"run_search_{s.id}")
+        run_types = type_col.multiselect("Type", run_index.run_types, key=f"run_types_{s.id}")
+        run_statuses = status_col.multiselect("Status", run_index.statuses, key=f"run_statuses_{s.id}")
+        matching_ids = run_index.filter(run_search, run_types, run_statuses)
+        if visible_ids is not None:
+            matching_ids = [run_id for run_id in matching_ids if run_id in visible_ids]
+
+        page_count = max(1, (len(matching_ids) + RUN_PAGE_SIZE - 1) // RUN_PAGE_SIZE)
+        page = 0
+        if page_count > 1:
+            page = st.number_input(
+                f"Page (of {page_count}, {len(matching_ids)} of {len(run_index)} runs)",
+                min_value=1, max_value=page_count, value=1, step=1, key=f"run_page_{s.id}_{len(matching_ids)}",
+            ) - 1
+        page_ids = matching_ids[page * RUN_PAGE_SIZE:(page + 1) * RUN_PAGE_SIZE]
+        next_page_ids = matching_ids[(page + 1) * RUN_PAGE_SIZE:(page + 2) * RUN_PAGE_SIZE]
+        st.session_state.watched_run_ids = page_ids
+
+        selected_run = None
+        if page_ids:
+            selected_run_id = st.selectbox("Select a Run:", page_ids, format_func=run_index.label,
+                                           key=f"run_selector_{s.id}")
+            selected_run = run_index.get(selected_run_id)
+        else:
+            st.info("No runs match this search.")
 
         if selected_run:
+            prefetch_around_run(str(s.id), page_ids, page_ids.index(selected_run_id), next_page_ids)
             st.markdown(f"#### Run: {selected_run.name} (ID: `{selected_run.id}`)")
             col1, col2, col3 = st.columns(3)
             col1.write(f"**Type:** {selected_run.run_type}")
             col2.write(f"**Start Time:** {selected_run.start_time.strftime('%H:%M:%S UTC') if selected_run.start_time else 'N/A'}")
             col3.write(f"**End Time:** {selected_run.end_time.strftime('%H:%M:%S UTC') if selected_run.end_time else 'N/A'}")
 
-            if selected_run.inputs:
-                user_input = None
-                if isinstance(selected_run.inputs, dict):
-                    # Check for chat history format
-                    if "chat_history" in selected_run.inputs and isinstance(selected_run.inputs["chat_history"], list):
-                        for msg in selected_run.inputs["chat_history"]:
-                            if msg.get("type") == "human":
-                                user_input = msg.get("content")
-                                break
-                    # Or fallback to a general 'input' key
-                    if not user_input and "input" in selected_run.inputs:
-                        user_input = selected_run.inputs["input"]
-
-                if user_input:
-                    st.markdown("### 🧠 User Input")
-                    st.code(user_input, language="markdown")
-
-            if selected_run.outputs:
-                final_output = None
-
-                if isinstance(selected_run.outputs, dict):
-                    output_wrapper = selected_run.outputs.get("output")
-                    if isinstance(output_wrapper, dict):
-                        return_values = output_wrapper.get("return_values")
-                        if isinstance(return_values, dict):
-                            final_output = return_values.get("output")
-
-                if final_output:
-                    st.markdown("### 🤖 Assistant's Final Response")
-                    st.code(final_output, language="markdown")
-                else:
-                    st.warning("⚠️ Could not extract the final output.")
-                    st.json(selected_run.outputs)
-
-
+            show_run_payload(selected_run)
 
             st.subheader("📝 Existing Annotations")
-            feedback_list = get_feedback_for_run(str(selected_run.id))
+            feedback_index = get_feedback_for_runs(page_ids)
+            feedback_list = feedback_index.get(str(selected_run.id), [])
 
+            if str(selected_run.id) in feedback_index.missing:
+                st.warning("⚠️ The annotations of this run could not be loaded"
+                           + ("; showing the last cached ones." if feedback_list else "."))
             if feedback_list:
                 for i, fb in enumerate(feedback_list, 1):
                     with st.expander(f"Annotation #{i}"):
@@ -250,7 +904,7 @@ if st.session_state.selected_session:
                         st.markdown(f"**🆔 ID:** `{fb.id}`")
                         st.markdown(f"**📊 Score:** {fb.score if fb.score is not None else '—'}")
                         st.markdown(f"**🗒️ Comment:** {fb.comment if fb.comment else '—'}")
-            else:
+            elif str(selected_run.id) not in feedback_index.missing:
                 st.info("No existing annotations for this run.")
                 
 
@@ -264,3 +918,64 @@ if st.session_state.selected_session:
                         st.rerun()
                     else:
                         st.warning("Please fill in both key and value.")
+
+        st.markdown("---")
+        with st.expander("📦 Bulk Annotation"):
+            bulk_scope = st.radio("Apply to", ["Runs shown above", "All runs in this session"], horizontal=True)
+            bulk_filter = st.text_input("Only runs whose name, type or status contains")
+            if bulk_scope == "Runs shown above":
+                bulk_matches = set(run_index.filter(bulk_filter))
+                candidate_ids = [run_id for run_id in page_ids if run_id in bulk_matches]
+            else:
+                candidate_ids = run_index.filter(bulk_filter)
+            candidates = [run_index.get(run_id) for run_id in candidate_ids]
+            candidate_labels = {str(r.id): f"{r.name} ({r.run_type}) - {str(r.id)[:8]}..." for r in candidates}
+
+            with st.form("bulk_annotation_form"):
+                bulk_run_ids = st.multiselect(
+                    f"Runs to annotate ({len(candidate_labels)} matching)",
+                    options=list(candidate_labels),
+                    default=list(candidate_labels),
+                    format_func=candidate_labels.get,
+                )
+                bulk_key = st.text_input("Key (e.g., quality)", key="bulk_key")
+                bulk_value = st.text_input("Value (e.g., good)", key="bulk_value")
+                bulk_score = st.text_input("Score (optional)", key="bulk_score")
+                if st.form_submit_button("Apply to selected runs"):
+                    if not (bulk_key and bulk_value):
+                        st.warning("Please fill in both key and value.")
+                    elif not bulk_run_ids:
+                        st.warning("Please select at least one run.")
+                    else:
+                        try:
+                            score = float(bulk_score) if bulk_score.strip() else None
+                        except ValueError:
+                            st.warning("Score must be a number.")
+                        else:
+                            queue_bulk_annotation(bulk_run_ids, bulk_key, bulk_value, score)
+                            st.rerun()
+
+# --- Debug panel ---
+METRICS.record_timing("streamlit_rerun", time.perf_counter() - RERUN_STARTED)
+with st.sidebar:
+    with st.expander("🛠️ Debug: LangSmith calls"):
+        call_rows = METRICS.rows()
+        if call_rows:
+            st.dataframe(call_rows, hide_index=True)
+        else:
+            st.caption("No LangSmith calls yet.")
+        rerun = METRICS.timings["streamlit_rerun"]
+        st.caption(f"Script reruns: {rerun.count}, mean {rerun.mean * 1000:.0f} ms (includes the calls above).")
+        st.caption(f"Rate limit: {RATE_LIMITER.rate:g}/{RATE_LIMITER.max_rate:g} requests/s, "
+                   f"{RATE_LIMITER.rate_limited} rate-limited response(s).")
+        prefetcher = get_prefetcher()
+        st.caption(f"Prefetch: {prefetcher.in_flight} in flight, {prefetcher.completed} done, "
+                   f"{prefetcher.failed} failed, {prefetcher.dropped} dropped, {prefetcher.cancelled} cancelled.")
+        memory = get_memory_cache()
+        cache_rows = METRICS.cache_rows() + [{"cache": "memory", "hits": memory.hits, "misses": memory.misses}]
+        st.dataframe(cache_rows, hide_index=True)
+        st.download_button("Download Prometheus metrics", METRICS.render_prometheus(),
+                           file_name="langsmith_annotator.prom", mime="text/plain")
+        if st.button("Reset statistics"):
+            METRICS.reset()
+            memory.hits = memory.misses = 0
@@ -0,0 +1,111 @@
+"""
+Benchmarks of the annotator's data paths against the FakeClient at 10, 1k
+and 100k runs: session discovery, session detail loading (runs + feedback),
+the first page of a project, per-run vs batched feedback fetching, and
+annotation round trips. Besides timing, every benchmark asserts how many
+requests it sent, so a change that reintroduces per-run calls fails even
+when the fake client answers instantly.
+
+Save a baseline and compare against it to catch slowdowns:
+
+    python -m pytest tests/bench_data_paths.py --benchmark-autosave
+    python -m pytest tests/bench_data_paths.py --benchmark-compare --benchmark-compare-fail=median:25%
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from langsmith_annotator import data_access  # noqa: E402
+from langsmith_annotator.fake_client import FAKE_PROJECT_ID, FakeClient  # noqa: E402
+from langsmith_annotator.feedback_loader import FEEDBACK_BATCH_SIZE, load_feedback_index  # noqa: E402
+from langsmith_annotator.feedback_queue import FeedbackQueue, FeedbackSubmission  # noqa: E402
+from langsmith_annotator.run_cache import RunCache  # noqa: E402
+from langsmith_annotator.session_discovery import AGENT_EXECUTOR_SESSIONS, discover_sessions  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+SCALES = [10, 1_000, 100_000]
+ROUNDS = 3
+SESSION_LIMIT = 10
+FEEDBACK_RUNS = 200
+ANNOTATIONS_PER_ROUND_TRIP = 50
+PROJECT_ID = str(FAKE_PROJECT_ID)
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: f"{scale}runs")
+def client(request):
+    return FakeClient(n_runs=request.param)
+
+
+def run(benchmark, client, fn, fresh_cache=False):
+    """Times `fn` over ROUNDS rounds and returns the requests per method sent by the last one."""
+    def setup():
+        client.reset_stats()
+        return ((RunCache(":memory:"),) if fresh_cache else ()), {}
+
+    benchmark.pedantic(fn, setup=setup, rounds=ROUNDS, iterations=1)
+    return dict(client.requests)
+
+
+def test_session_discovery(benchmark, client, loader):
+    def discover():
+        return discover_sessions(client, PROJECT_ID, SESSION_LIMIT, AGENT_EXECUTOR_SESSIONS, loader=loader)
+
+    requests = run(benchmark, client, discover)
+    assert len(discover().sessions) == min(SESSION_LIMIT, len(list(client.list_runs(is_root=True))))
+    assert requests["list_runs"] <= 2
+
+
+def test_session_detail(benchmark, client, loader):
+    session = discover_sessions(client, PROJECT_ID, 1, AGENT_EXECUTOR_SESSIONS).sessions[0]
+
+    def load_detail(cache):
+        runs = data_access.get_runs(client, cache, "parent", session["id"], loader=loader)
+        data_access.get_feedback_index(client, cache, [r.id for r in runs], loader=loader)
+
+    requests = run(benchmark, client, load_detail, fresh_cache=True)
+    assert requests["list_runs"] == 1 and requests["list_feedback"] == 1
+
+
+def test_project_first_page(benchmark, client, loader):
+    def first_page(cache):
+        pages = data_access.iter_run_pages(client, cache, "project", PROJECT_ID, 10, loader=loader)
+        next(pages)
+        pages.close()
+
+    assert run(benchmark, client, first_page, fresh_cache=True) == {"list_runs": 1}
+
+
+def feedback_run_ids(client):
+    return [str(r.id) for r in client.list_runs(limit=FEEDBACK_RUNS)]
+
+
+def test_feedback_per_run(benchmark, client):
+    run_ids = feedback_run_ids(client)
+
+    def per_run():
+        for run_id in run_ids:
+            list(client.list_feedback(run_ids=[run_id]))
+
+    assert run(benchmark, client, per_run)["list_feedback"] == len(run_ids)
+
+
+def test_feedback_batched(benchmark, client, loader):
+    run_ids = feedback_run_ids(client)
+    requests = run(benchmark, client, lambda: load_feedback_index(client, run_ids, loader=loader))
+    assert requests["list_feedback"] == -(-len(run_ids) // FEEDBACK_BATCH_SIZE)
+
+
+def test_annotation_round_trip(benchmark, client, loader):
+    run_ids = [str(r.id) for r in client.list_runs(limit=ANNOTATIONS_PER_ROUND_TRIP)]
+
+    def round_trip(cache):
+        feedback_queue = FeedbackQueue(client, cache=cache, loader=loader)
+        feedback_queue.submit_many(FeedbackSubmission(run_id=run_id, key="bench", value="ok") for run_id in run_ids)
+        feedback_queue.flush()
+        data_access.get_feedback_index(client, cache, run_ids, refresh=True, loader=loader)
+
+    requests = run(benchmark, client, round_trip, fresh_cache=True)
+    assert requests["create_feedback"] == len(run_ids)
+    # One batch of run IDs; the bench annotations of earlier rounds may add a page.
+    assert requests["list_feedback"] <= 2 * -(-len(run_ids) // FEEDBACK_BATCH_SIZE)
@@ -0,0 +1,46 @@
+"""
+Benchmarks of the local full-text search at 10, 1k and 100k runs: indexing
+a project's top-level runs and answering a query from the index. Compare
+runs with --benchmark-compare as described in bench_data_paths.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from langsmith_annotator import data_access  # noqa: E402
+from langsmith_annotator.extraction import extract  # noqa: E402
+from langsmith_annotator.fake_client import FAKE_PROJECT_ID, FakeClient  # noqa: E402
+from langsmith_annotator.run_cache import RunCache  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+SCALES = [10, 1_000, 100_000]
+PROJECT_ID = str(FAKE_PROJECT_ID)
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: f"{scale}runs")
+def indexed(request):
+    client = FakeClient(n_runs=request.param)
+    cache = RunCache(":memory:")
+    if not cache.search_available:
+        pytest.skip("SQLite without FTS5")
+    data_access.sync_search_index(client, cache, PROJECT_ID)
+    return client, cache
+
+
+def test_index_project(benchmark, indexed):
+    client, _ = indexed
+
+    def index(cache):
+        return data_access.sync_search_index(client, cache, PROJECT_ID)
+
+    roots = len(list(client.list_runs(is_root=True)))
+    assert benchmark.pedantic(index, setup=lambda: ((RunCache(":memory:"),), {}), rounds=3) == roots
+
+
+def test_query(benchmark, indexed):
+    client, cache = indexed
+    root = client.read_run(next(iter(client.list_runs(is_root=True))).id)
+    word = extract(root).user_input.split()[-1].strip("?").lower()
+    hits = benchmark(data_access.search_runs, cache, word, PROJECT_ID, 10)
+    assert hits and all(word in hit.snippet.lower() for hit in hits)
@@ -0,0 +1,69 @@
+"""Shared fixtures: synthetic LangSmith data, an in-memory run cache and a fast-retrying loader."""
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from langsmith_annotator.concurrent_loader import ConcurrentLoader
+from langsmith_annotator.fake_client import FAKE_PROJECT_ID, FakeClient
+from langsmith_annotator.memory_client import InMemoryClient
+from langsmith_annotator.run_cache import RunCache
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_run(minutes: int = 0, **fields):
+    """A minimal run-like object started `minutes` after BASE_TIME."""
+    run_id = fields.pop("id", None) or uuid.uuid4()
+    start_time = fields.pop("start_time", BASE_TIME + timedelta(minutes=minutes))
+    data = dict(
+        id=run_id, name="run", run_type="chain", status="success", error=None,
+        session_id=FAKE_PROJECT_ID, parent_run_id=None, trace_id=run_id, dotted_order=None,
+        start_time=start_time, end_time=start_time + timedelta(seconds=1) if start_time else None,
+        inputs={}, outputs=None, extra={}, tags=[],
+    )
+    data.update(fields)
+    return SimpleNamespace(**data)
+
+
+def make_feedback(run_id, key: str = "quality", value=None, score=None, minutes: int = 0):
+    return SimpleNamespace(
+        id=uuid.uuid4(), run_id=run_id, key=key, value=value, score=score, comment=None,
+        created_at=BASE_TIME + timedelta(minutes=minutes),
+    )
+
+
+def memory_client(runs=(), feedback=()):
+    """An InMemoryClient serving `runs` and `feedback` as the fake project."""
+    return InMemoryClient(SimpleNamespace(id=FAKE_PROJECT_ID, name="test-project"), list(runs), feedback)
+
+
+def add_runs(client, *runs):
+    """Makes runs appear in an InMemoryClient, as if they had just been traced."""
+    client._runs = sorted(client._runs + list(runs), key=lambda run: run.start_time, reverse=True)
+    client._runs_by_id.update((str(run.id), run) for run in runs)
+
+
+@pytest.fixture
+def project_id():
+    return str(FAKE_PROJECT_ID)
+
+
+@pytest.fixture
+def fake_client():
+    return FakeClient(n_runs=200)
+
+
+@pytest.fixture
+def cache():
+    run_cache = RunCache(":memory:")
+    yield run_cache
+    run_cache.close()
+
+
+@pytest.fixture
+def loader():
+    concurrent_loader = ConcurrentLoader(max_workers=4, backoff_base=0.001)
+    yield concurrent_loader
+    concurrent_loader.shutdown()
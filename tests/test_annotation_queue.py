@@ -0,0 +1,37 @@
+from langsmith_annotator.annotation_queue import AnnotationQueue, build_work_list, work_list_query
+
+
+def test_work_list_holds_root_runs_without_the_key(fake_client, cache, project_id):
+    query = work_list_query("quality", run_type="chain", name_contains="AgentExecutor")
+    work_list = build_work_list(fake_client, cache, project_id, query)
+    roots = [run for run in fake_client.list_runs(project_id=project_id, is_root=True)]
+    annotated = {str(fb.run_id) for fb in fake_client.list_feedback(feedback_key=["quality"])}
+    assert set(work_list.ids) == {str(run.id) for run in roots} - annotated
+    assert len(work_list) > 0
+
+
+def test_queue_skips_runs_marked_done(fake_client, cache, project_id):
+    work_list = build_work_list(fake_client, cache, project_id, work_list_query("quality"))
+    queue = AnnotationQueue(work_list, work_list_query("quality"))
+    first = queue.current
+    queue.mark_done()
+    assert queue.current is not first and queue.remaining == len(work_list) - 1
+    assert str(first.id) not in queue.upcoming(len(work_list))
+    queue.previous()
+    assert queue.current is not first
+
+
+def test_existing_annotations_are_read_for_the_candidates_only(fake_client, cache, project_id):
+    seen = []
+    list_feedback = fake_client.list_feedback
+
+    def recording_list_feedback(**kwargs):
+        seen.append(kwargs)
+        return list_feedback(**kwargs)
+
+    fake_client.list_feedback = recording_list_feedback
+    query = work_list_query("quality", run_type="chain")
+    build_work_list(fake_client, cache, project_id, query)
+    roots = {str(run.id) for run in fake_client.list_runs(project_id=project_id, is_root=True)}
+    assert seen and all(kwargs["feedback_key"] == ["quality"] and kwargs["run_ids"] for kwargs in seen)
+    assert {run_id for kwargs in seen for run_id in kwargs["run_ids"]} == roots
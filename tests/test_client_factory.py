@@ -0,0 +1,24 @@
+import pytest
+
+from langsmith_annotator.client_factory import create_client, default_client_spec, is_offline_spec
+from langsmith_annotator.fake_client import FakeClient
+
+
+def test_fake_spec_sets_the_number_of_runs():
+    client = create_client("fake:30")
+    assert isinstance(client, FakeClient)
+    assert len(list(client.list_runs())) <= 30
+
+
+def test_unknown_client_is_rejected():
+    with pytest.raises(ValueError):
+        create_client("nope")
+    with pytest.raises(ValueError):
+        create_client("offline")
+
+
+def test_default_spec_comes_from_the_environment(monkeypatch):
+    monkeypatch.delenv("LANGSMITH_ANNOTATOR_CLIENT", raising=False)
+    monkeypatch.setenv("LANGSMITH_OFFLINE_DIR", "./export")
+    assert default_client_spec() == "offline:./export"
+    assert is_offline_spec(default_client_spec()) and not is_offline_spec("langsmith")
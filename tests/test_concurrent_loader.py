@@ -0,0 +1,93 @@
+import pytest
+
+from langsmith_annotator.concurrent_loader import (
+    RETRY_AFTER_MAX_SECONDS, backoff_delay, call_with_retry, is_retryable, parse_retry_after, stream_with_retry,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {
+            "status_code": status_code,
+            "headers": {"Retry-After": retry_after} if retry_after else {},
+        })()
+
+
+def flaky(failures, error=HTTPError(503)):
+    """A call that fails `failures` times before returning 'ok'."""
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return "ok"
+    call.calls = calls
+    return call
+
+
+def test_retries_retryable_errors():
+    call = flaky(2)
+    assert call_with_retry(call, backoff_base=0.001) == "ok"
+    assert len(call.calls) == 3
+
+
+def test_does_not_retry_client_errors():
+    call = flaky(1, HTTPError(404))
+    with pytest.raises(HTTPError):
+        call_with_retry(call, backoff_base=0.001)
+    assert len(call.calls) == 1
+
+
+def test_gives_up_after_max_retries():
+    call = flaky(10)
+    with pytest.raises(HTTPError):
+        call_with_retry(call, max_retries=2, backoff_base=0.001)
+    assert len(call.calls) == 3
+
+
+def test_is_retryable_reads_status_from_message():
+    assert is_retryable(Exception("Server returned 502 Bad Gateway"))
+    assert not is_retryable(ValueError("bad input"))
+
+
+def test_backoff_honours_retry_after_up_to_cap():
+    assert backoff_delay(HTTPError(429, "5"), attempt=0, backoff_base=0.001) == 5
+    assert backoff_delay(HTTPError(429, "3600"), attempt=0, backoff_base=0.001) == RETRY_AFTER_MAX_SECONDS
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_stream_resumes_after_failed_page_without_repeating_items():
+    attempts = []
+
+    def listing():
+        attempts.append(1)
+        for item in range(5):
+            if item == 3 and len(attempts) == 1:
+                raise HTTPError(500)
+            yield item
+
+    assert list(stream_with_retry(listing, backoff_base=0.001)) == [0, 1, 2, 3, 4]
+    assert len(attempts) == 2
+
+
+def test_map_keeps_input_order(loader):
+    assert loader.map(lambda n: n * n, range(20)) == [n * n for n in range(20)]
+
+
+def test_map_settled_reports_failures_per_item(loader):
+    def square_or_fail(n):
+        if n == 2:
+            raise ValueError("boom")
+        return n * n
+
+    settled = loader.map_settled(square_or_fail, range(4))
+    assert [result for result, _ in settled] == [0, 1, None, 9]
+    assert isinstance(settled[2][1], ValueError)
@@ -0,0 +1,84 @@
+import pytest
+
+from conftest import add_runs, make_run, memory_client
+
+from langsmith_annotator import data_access
+from langsmith_annotator.models import PartialIndex
+
+
+def project_runs(fake_client, project_id):
+    return list(fake_client.list_runs(project_id=project_id))
+
+
+def test_get_runs_syncs_once_then_serves_from_cache(fake_client, cache, project_id):
+    runs = data_access.get_runs(fake_client, cache, "project", project_id, project_id=project_id)
+    assert len(runs) == len(project_runs(fake_client, project_id))
+    fake_client.reset_stats()
+    data_access.get_runs(fake_client, cache, "project", project_id, project_id=project_id)
+    assert fake_client.requests["list_runs"] == 0
+
+
+@pytest.mark.parametrize("scope", sorted(data_access.SCOPE_QUERY_ARGS))
+def test_every_scope_syncs_through_list_runs(fake_client, cache, project_id, scope):
+    root = next(iter(fake_client.list_runs(project_id=project_id, is_root=True)))
+    scope_id = project_id if scope == "project" else str(root.id)
+    runs = data_access.get_runs(fake_client, cache, scope, scope_id, project_id=project_id)
+    assert runs
+
+
+def test_incremental_sync_fetches_only_new_runs(cache, project_id):
+    old = make_run(0)
+    client = memory_client([old])
+    data_access.sync_runs(client, cache, "project", project_id, project_id=project_id)
+    new = make_run(5)
+    add_runs(client, new)
+    data_access.sync_runs(client, cache, "project", project_id, project_id=project_id)
+    assert [str(run.id) for run in cache.get_runs("project", project_id)] == [str(new.id), str(old.id)]
+
+
+def test_iter_run_pages_streams_an_unsynced_scope(fake_client, cache, project_id):
+    pages = data_access.iter_run_pages(fake_client, cache, "project", project_id, page_size=10,
+                                       project_id=project_id)
+    assert len(next(pages)) == 10
+    assert fake_client.requests["list_runs"] == 1
+    pages.close()
+
+
+def test_trace_tree_nests_child_runs(fake_client, cache, project_id):
+    root = next(iter(fake_client.list_runs(project_id=project_id, is_root=True)))
+    tree = data_access.get_trace_tree(fake_client, cache, str(root.id), project_id=project_id)
+    assert [node.id for node in tree.roots] == [str(root.id)]
+    assert all(node.depth >= 1 for node in tree.walk() if node.id != str(root.id))
+
+
+def test_feedback_index_is_cached_until_stale(fake_client, cache, project_id, loader):
+    run_ids = [str(run.id) for run in project_runs(fake_client, project_id)]
+    index = data_access.get_feedback_index(fake_client, cache, run_ids, loader=loader)
+    assert set(index) == set(run_ids)
+    fake_client.reset_stats()
+    assert data_access.get_feedback_index(fake_client, cache, run_ids, loader=loader) == index
+    assert fake_client.requests["list_feedback"] == 0
+
+
+def test_partial_feedback_index_reports_failed_batches(fake_client, cache, project_id):
+    run_ids = [str(run.id) for run in project_runs(fake_client, project_id)][:150]
+    calls = []
+
+    def list_feedback(**kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("still rate limited")
+        return fake_client.list_feedback(**kwargs)
+
+    flaky = type("Client", (), {"list_feedback": staticmethod(list_feedback)})()
+    index = data_access.get_feedback_index(flaky, cache, run_ids, partial=True)
+    assert isinstance(index, PartialIndex)
+    assert index.missing == set(run_ids[100:])
+    assert not index.complete
+
+
+def test_run_payload_is_read_once(fake_client, cache):
+    run = next(iter(fake_client.list_runs()))
+    data_access.get_run_payload(fake_client, cache, str(run.id))
+    data_access.get_run_payload(fake_client, cache, str(run.id))
+    assert fake_client.requests["read_run"] == 1
@@ -0,0 +1,45 @@
+from conftest import make_feedback, make_run, memory_client
+
+from langsmith_annotator.dataset_promotion import example_id, feedback_matches, promote_runs, select_feedback
+from langsmith_annotator.merged_runs import RunSource
+
+
+def test_feedback_matches_value_or_score():
+    assert feedback_matches(make_feedback("r", value="good", score=1), "good")
+    assert feedback_matches(make_feedback("r", value="good", score=1), "1.0")
+    assert not feedback_matches(make_feedback("r", value="bad", score=0), "good")
+    assert feedback_matches(make_feedback("r", value="bad"), None)
+
+
+def test_promotion_is_idempotent(fake_client, loader, project_id):
+    source = RunSource("project", project_id, project_id)
+    first = promote_runs(fake_client, source, "quality", "good-runs", value="good", loader=loader)
+    expected = {str(fb.run_id) for fb in fake_client.list_feedback(feedback_key=["quality"]) if fb.value == "good"}
+    assert set(first.created) == expected and first.complete
+    again = promote_runs(fake_client, source, "quality", "good-runs", value="good", loader=loader)
+    assert again.created == [] and set(again.skipped) == expected
+    examples = list(fake_client.list_examples(dataset_id=first.dataset_id))
+    assert len(examples) == len(expected)
+    assert {str(example.id) for example in examples} == {example_id(first.dataset_id, run_id) for run_id in expected}
+
+
+def test_feedback_is_read_for_the_source_runs_only(project_id):
+    runs = [make_run(i) for i in range(3)]
+    client = memory_client(runs, [make_feedback(run.id, value="good") for run in runs]
+                           + [make_feedback("elsewhere", value="good")])
+    client.reset_stats()
+    selected = select_feedback(client, [str(run.id) for run in runs[:2]], "quality", "good")
+    assert set(selected) == {str(runs[0].id), str(runs[1].id)}
+    assert client.requests["list_feedback"] == 1
+    source = RunSource("trace", str(runs[2].id), project_id)
+    result = promote_runs(client, source, "quality", "good-runs", value="good")
+    assert result.created == [str(runs[2].id)]
+
+
+def test_start_after_limits_the_runs_whose_feedback_is_read(project_id):
+    runs = [make_run(i * 60) for i in range(3)]
+    client = memory_client(runs, [make_feedback(run.id, value="good") for run in runs])
+    source = RunSource("project", project_id, project_id)
+    result = promote_runs(client, source, "quality", "recent-runs", value="good",
+                          start_after=runs[1].start_time)
+    assert set(result.created) == {str(runs[1].id), str(runs[2].id)}
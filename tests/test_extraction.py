@@ -0,0 +1,51 @@
+import pytest
+from conftest import make_run
+
+from langsmith_annotator.extraction import ExtractionEngine, ExtractionSchema, GENERIC, compile_path, extract
+
+
+def test_compiled_paths_support_keys_indexes_and_filters():
+    payload = {"chat_history": [{"type": "ai", "content": "hi"}, {"type": "human", "content": "help"}]}
+    assert compile_path("chat_history[type=human][0].content")(payload) == "help"
+    assert compile_path("chat_history[-1].type")(payload) == "human"
+    with pytest.raises(ValueError):
+        compile_path("a[")
+
+
+def test_agent_executor_runs():
+    run = make_run(name="AgentExecutor", inputs={
+        "input": "fallback", "chat_history": [{"type": "human", "content": "Where is my refund?"}],
+    }, outputs={"output": {"return_values": {"output": "On its way."}}})
+    extraction = extract(run)
+    assert extraction.schema == "agent_executor"
+    assert extraction.user_input == "Where is my refund?"
+    assert extraction.final_output == "On its way."
+    assert extraction.messages == [("human", "Where is my refund?")]
+
+
+def test_chat_model_runs():
+    run = make_run(name="ChatOpenAI", run_type="llm",
+                   inputs={"messages": [{"role": "system", "content": "Be nice"}, {"role": "user", "content": "Hi"}]},
+                   outputs={"content": "Hello!"})
+    extraction = extract(run)
+    assert (extraction.schema, extraction.user_input, extraction.final_output) == ("chat_model", "Hi", "Hello!")
+
+
+def test_finished_runs_are_memoized_and_unfinished_ones_are_not():
+    engine = ExtractionEngine([GENERIC])
+    finished = make_run(inputs={"input": "q"}, outputs={"output": "a"})
+    running = make_run(end_time=None, inputs={"input": "q"})
+    assert engine.extract(finished) is engine.cached(finished.id)
+    engine.extract(running)
+    assert engine.cached(running.id) is None
+
+
+def test_custom_schemas_take_precedence_when_registered_first():
+    engine = ExtractionEngine([GENERIC])
+    engine.register(ExtractionSchema("support_bot", name_contains="Support", input_paths=("ticket.body",),
+                                     output_paths=("reply",)), first=True)
+    run = make_run(name="SupportBot", inputs={"ticket": {"body": "Broken"}, "input": "ignored"},
+                   outputs={"reply": "Fixed"})
+    extraction = engine.extract(run)
+    assert (extraction.schema, extraction.user_input, extraction.final_output) == ("support_bot", "Broken", "Fixed")
+    assert engine.schema_for("chain", "Other").name == "generic"
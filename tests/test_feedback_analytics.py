@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from langsmith_annotator import data_access  # noqa: E402
+from langsmith_annotator.feedback_analytics import FeedbackAnalytics  # noqa: E402
+
+
+def test_refresh_folds_in_only_new_feedback(fake_client, cache, loader, project_id):
+    analytics = FeedbackAnalytics(project_id, days=0)
+    feedback = list(fake_client.list_feedback())
+    assert analytics.refresh(fake_client, cache, loader=loader) == len(feedback) == len(analytics.frame)
+    assert analytics.refresh(fake_client, cache, loader=loader) == 0
+
+    root = next(iter(fake_client.list_runs(is_root=True)))
+    data_access.record_feedback(cache, fake_client.create_feedback(root.id, "quality", value="good", score=1))
+    assert analytics.refresh(fake_client, cache, loader=loader) == 1
+    assert int(analytics.key_distribution().to_numpy().sum()) == len(feedback) + 1
+    assert analytics.key_scores().loc["quality", "feedback"] == sum(fb.key == "quality" for fb in feedback) + 1
+
+
+def test_report_covers_every_section(fake_client, cache, project_id):
+    analytics = FeedbackAnalytics(project_id, days=7)
+    analytics.refresh(fake_client, cache)
+    report = analytics.report()
+    assert f"of {analytics.runs_in_window} run(s)" in report
+    assert "Feedback per key and value" in report and "Feedback per day and annotator" in report
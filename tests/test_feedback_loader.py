@@ -0,0 +1,41 @@
+from conftest import make_feedback, make_run
+
+from langsmith_annotator.feedback_loader import chunked, load_feedback_index
+
+
+class FeedbackClient:
+    """Serves fixed feedback and records the run IDs of every list_feedback call."""
+    def __init__(self, feedback):
+        self.feedback = feedback
+        self.calls = []
+
+    def list_feedback(self, run_ids=None, **kwargs):
+        self.calls.append(list(run_ids))
+        return iter([fb for fb in self.feedback if str(fb.run_id) in run_ids])
+
+
+def test_chunked_splits_into_batches():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def test_feedback_is_loaded_in_batches_and_grouped_by_run():
+    run_ids = [str(make_run().id) for _ in range(5)]
+    feedback = [make_feedback(run_ids[0], value="good"), make_feedback(run_ids[3], value="bad")]
+    client = FeedbackClient(feedback)
+    index = load_feedback_index(client, run_ids + run_ids[:2], batch_size=2)
+    assert [len(batch) for batch in client.calls] == [2, 2, 1]
+    assert set(index) == set(run_ids)
+    assert [fb.value for fb in index[run_ids[0]]] == ["good"]
+    assert [fb.value for fb in index[run_ids[3]]] == ["bad"]
+    assert index[run_ids[1]] == []
+
+
+def test_loader_fetches_batches_in_parallel_with_the_same_result(loader):
+    run_ids = [str(make_run().id) for _ in range(7)]
+    client = FeedbackClient([make_feedback(run_id, value=str(n)) for n, run_id in enumerate(run_ids)])
+    sequential = load_feedback_index(client, run_ids, batch_size=3)
+    parallel = load_feedback_index(client, run_ids, batch_size=3, loader=loader)
+    assert {run_id: [fb.value for fb in fbs] for run_id, fbs in parallel.items()} == {
+        run_id: [fb.value for fb in fbs] for run_id, fbs in sequential.items()
+    }
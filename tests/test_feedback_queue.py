@@ -0,0 +1,59 @@
+import threading
+
+from langsmith_annotator import data_access
+from langsmith_annotator.feedback_queue import FeedbackQueue, FeedbackSubmission
+
+
+class RejectingClient:
+    """Delegates to a client but fails every create_feedback with a client error."""
+    def __init__(self, client):
+        self.client = client
+
+    def create_feedback(self, **kwargs):
+        raise ValueError("400 Bad Request")
+
+
+def test_submissions_are_sent_and_cached(fake_client, cache, loader):
+    run_ids = [str(run.id) for run in fake_client.list_runs(limit=30)]
+    changed = []
+    feedback_queue = FeedbackQueue(fake_client, cache=cache, loader=loader, on_change=changed.append)
+    feedback_queue.submit_many(FeedbackSubmission(run_id=run_id, key="bench", value="ok") for run_id in run_ids)
+    feedback_queue.flush()
+    assert feedback_queue.succeeded == 30 and not feedback_queue.failures
+    assert fake_client.requests["create_feedback"] == 30
+    assert all(fb.key == "bench" for fb in cache.get_feedback_index(run_ids[:1])[run_ids[0]])
+    assert changed == run_ids
+
+
+def test_failed_submissions_are_rolled_back(fake_client, cache):
+    run_id = str(next(iter(fake_client.list_runs())).id)
+    feedback_queue = FeedbackQueue(RejectingClient(fake_client), cache=cache)
+    submission = feedback_queue.submit(FeedbackSubmission(run_id=run_id, key="quality", value="bad"))
+    assert [str(fb.id) for fb in cache.get_feedback_index([run_id])[run_id]] == [submission.feedback_id]
+    feedback_queue.flush()
+    assert cache.get_feedback_index([run_id])[run_id] == []
+    assert [failed.feedback_id for failed, _ in feedback_queue.failures] == [submission.feedback_id]
+
+
+class BlockingClient:
+    """Delegates to a client but holds create_feedback until `release` is set."""
+    def __init__(self, client):
+        self.client = client
+        self.release = threading.Event()
+
+    def create_feedback(self, **kwargs):
+        self.release.wait(5)
+        return self.client.create_feedback(**kwargs)
+
+
+def test_pending_submissions_survive_a_feedback_refresh(fake_client, cache):
+    run_id = str(next(iter(fake_client.list_runs())).id)
+    blocking = BlockingClient(fake_client)
+    feedback_queue = FeedbackQueue(blocking, cache=cache)
+    submission = feedback_queue.submit(FeedbackSubmission(run_id=run_id, key="quality", value="good"))
+    index = data_access.get_feedback_index(fake_client, cache, [run_id], refresh=True)
+    assert submission.feedback_id in {str(fb.id) for fb in index[run_id]}
+    blocking.release.set()
+    feedback_queue.flush()
+    index = data_access.get_feedback_index(fake_client, cache, [run_id], refresh=True)
+    assert [str(fb.id) for fb in index[run_id]].count(submission.feedback_id) == 1
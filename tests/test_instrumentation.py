@@ -0,0 +1,34 @@
+import pytest
+
+from langsmith_annotator.fake_client import FakeClient
+from langsmith_annotator.instrumentation import Histogram, InstrumentedClient, Metrics
+
+
+def test_histogram_quantile_is_the_upper_bound_of_its_bucket():
+    hist = Histogram((1, 5, 10))
+    for value in (0.5, 2, 3, 4, 20):
+        hist.observe(value)
+    assert hist.quantile(0.2) == 1
+    assert hist.quantile(0.8) == 5
+    assert hist.quantile(1.0) == float("inf")
+    assert hist.mean == pytest.approx(5.9)
+
+
+def test_list_calls_are_recorded_with_estimated_pages():
+    metrics = Metrics()
+    client = InstrumentedClient(FakeClient(n_runs=250), metrics)
+    runs = list(client.list_runs())
+    (row,) = metrics.rows()
+    assert row["method"] == "list_runs" and row["calls"] == 1
+    assert row["pages"] == -(-len(runs) // 100)
+
+
+def test_failed_calls_count_as_errors():
+    class Broken:
+        def read_run(self, run_id):
+            raise RuntimeError("offline")
+
+    metrics = Metrics()
+    with pytest.raises(RuntimeError):
+        InstrumentedClient(Broken(), metrics).read_run("r")
+    assert metrics.rows()[0]["errors"] == 1
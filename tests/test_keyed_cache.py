@@ -0,0 +1,40 @@
+import time
+
+from langsmith_annotator.keyed_cache import KeyedCache
+
+
+def test_evicts_least_recently_used():
+    cache = KeyedCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_invalidate_tag_drops_only_tagged_entries():
+    cache = KeyedCache()
+    cache.set("runs", [1], tags=("session:1",))
+    cache.set("feedback", {}, tags=("session:1", "feedback"))
+    cache.set("other", 0, tags=("session:2",))
+    cache.invalidate_tag("session:1")
+    assert cache.get("runs") is None and cache.get("feedback") is None
+    assert cache.get("other") == 0
+
+
+def test_entries_expire_after_ttl():
+    cache = KeyedCache(ttl_s=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a", "gone") == "gone"
+
+
+def test_get_or_load_loads_once():
+    cache = KeyedCache()
+    calls = []
+    for _ in range(3):
+        cache.get_or_load("key", lambda: calls.append(1) or "value")
+    assert calls == [1]
+    assert cache.hits == 2
@@ -0,0 +1,83 @@
+from conftest import add_runs, make_feedback, make_run, memory_client
+
+from langsmith_annotator.live_tail import TAIL_IDLE_BACKOFF, TAIL_MAX_NEW_SESSIONS, LiveTail
+from langsmith_annotator.models import Session
+
+
+def agent_run(minutes):
+    return make_run(minutes, name="AgentExecutor")
+
+
+def tail_over(client, project_id, sessions):
+    return LiveTail(project_id, sessions=[Session(id=run.id, name=run.name, start_time=run.start_time)
+                                          for run in sessions], min_interval=1, max_interval=4)
+
+
+def test_new_sessions_are_prepended(cache, project_id):
+    known = agent_run(0)
+    client = memory_client([known])
+    tail = tail_over(client, project_id, [known])
+    newer = [agent_run(5), agent_run(7)]
+    add_runs(client, *newer)
+    update = tail.poll(client, cache)
+    assert [str(s.id) for s in update.sessions] == [str(newer[1].id), str(newer[0].id)]
+    assert [str(s.id) for s in tail.sessions][:3] == [str(newer[1].id), str(newer[0].id), str(known.id)]
+    assert not tail.poll(client, cache).sessions
+
+
+def test_a_backlog_longer_than_one_poll_is_caught_up(cache, project_id):
+    known = agent_run(0)
+    client = memory_client([known])
+    tail = tail_over(client, project_id, [known])
+    backlog = [agent_run(1 + i) for i in range(TAIL_MAX_NEW_SESSIONS + 50)]
+    add_runs(client, *backlog)
+    first = tail.poll(client, cache).sessions
+    assert len(first) == TAIL_MAX_NEW_SESSIONS
+    second = tail.poll(client, cache).sessions
+    assert {str(s.id) for s in first + second} == {str(run.id) for run in backlog}
+    assert not tail.poll(client, cache).sessions
+    assert [str(s.id) for s in tail.sessions] == [str(run.id) for run in reversed([known] + backlog)]
+
+
+def test_only_feedback_added_after_the_first_poll_is_reported(cache, project_id):
+    session = agent_run(0)
+    client = memory_client([session], [make_feedback(session.id, value="old")])
+    tail = tail_over(client, project_id, [session])
+    assert tail.poll(client, cache, watch=[session.id]).feedback == []
+    client.create_feedback(session.id, "quality", value="new")
+    assert [fb.value for fb in tail.poll(client, cache, watch=[session.id]).feedback] == ["new"]
+
+
+def test_feedback_is_read_for_watched_runs_and_new_sessions_only(cache, project_id):
+    sessions = [agent_run(i) for i in range(3)]
+    client = memory_client(sessions)
+    tail = tail_over(client, project_id, sessions)
+    newer = agent_run(5)
+    add_runs(client, newer)
+    read = []
+    list_feedback = client.list_feedback
+    client.list_feedback = lambda run_ids=None, **kwargs: read.extend(run_ids) or list_feedback(run_ids=run_ids, **kwargs)
+    tail.poll(client, cache, watch=[sessions[0].id])
+    assert sorted(read) == sorted([str(sessions[0].id), str(newer.id)])
+
+
+def test_interval_grows_while_idle_and_resets_on_news(cache, project_id):
+    session = agent_run(0)
+    client = memory_client([session])
+    tail = tail_over(client, project_id, [session])
+    tail.poll(client, cache)
+    tail.poll(client, cache)
+    assert tail.interval == TAIL_IDLE_BACKOFF
+    add_runs(client, agent_run(3))
+    tail.poll(client, cache)
+    assert tail.interval == 1
+
+
+def test_errors_are_returned_not_raised(cache, project_id):
+    class Broken:
+        def list_runs(self, **kwargs):
+            raise RuntimeError("offline")
+
+    tail = LiveTail(project_id)
+    update = tail.poll(Broken(), cache)
+    assert isinstance(update.error, RuntimeError) and tail.last_error is update.error
@@ -0,0 +1,22 @@
+from conftest import make_run, memory_client
+
+from langsmith_annotator.merged_runs import RunSource, iter_merged_runs, merge_by_time, sync_sources
+
+
+def test_merge_by_time_interleaves_newest_first():
+    a = [make_run(9), make_run(4), make_run(1)]
+    b = [make_run(7), make_run(2)]
+    merged = list(merge_by_time([("a", iter(a)), ("b", iter(b))]))
+    assert [source for source, _ in merged] == ["a", "b", "a", "b", "a"]
+
+
+def test_sources_are_synced_and_merged(cache, loader, project_id):
+    root_a, root_b = make_run(0), make_run(1)
+    runs = [root_a, root_b,
+            make_run(2, parent_run_id=root_a.id, trace_id=root_a.id),
+            make_run(3, parent_run_id=root_b.id, trace_id=root_b.id)]
+    client = memory_client(runs)
+    sources = [RunSource("trace", str(root_a.id), project_id), RunSource("trace", str(root_b.id), project_id)]
+    assert sync_sources(client, cache, loader, sources) == {}
+    merged = [str(run.id) for _, run in iter_merged_runs(cache, sources)]
+    assert merged == [str(run.id) for run in reversed(runs)]
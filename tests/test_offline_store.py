@@ -0,0 +1,36 @@
+from langsmith_annotator.fake_client import FakeClient
+from langsmith_annotator.offline_store import OfflineClient, export_project, read_manifest
+
+
+def test_export_round_trips_runs_and_feedback(tmp_path, project_id):
+    client = FakeClient(n_runs=120)
+    manifest = export_project(client, project_id, str(tmp_path), chunk_rows=50)
+    runs = list(client.list_runs(project_id=project_id))
+    assert manifest["runs"] == len(runs) and manifest["chunks"] == -(-len(runs) // 50)
+    assert read_manifest(str(tmp_path))["feedback"] == manifest["feedback"]
+
+    offline = OfflineClient(str(tmp_path))
+    offline_runs = {str(run.id): run for run in offline.list_runs(project_id=project_id)}
+    assert set(offline_runs) == {str(run.id) for run in runs}
+    sample = runs[0]
+    assert offline_runs[str(sample.id)].inputs == sample.inputs
+    assert offline_runs[str(sample.id)].start_time == sample.start_time
+    assert len(list(offline.list_feedback())) == manifest["feedback"]
+
+
+def test_offline_feedback_is_persisted(tmp_path, project_id):
+    export_project(FakeClient(n_runs=20), project_id, str(tmp_path))
+    offline = OfflineClient(str(tmp_path))
+    run_id = str(next(iter(offline.list_runs())).id)
+    offline.create_feedback(run_id, "quality", value="good")
+    reopened = OfflineClient(str(tmp_path))
+    assert [fb.value for fb in reopened.list_feedback(run_ids=[run_id], feedback_key=["quality"])][-1] == "good"
+
+
+def test_re_export_replaces_the_previous_chunks(tmp_path, project_id):
+    export_project(FakeClient(n_runs=240), project_id, str(tmp_path), chunk_rows=50)
+    manifest = export_project(FakeClient(n_runs=40, seed=1), project_id, str(tmp_path), chunk_rows=50)
+    assert len(list(OfflineClient(str(tmp_path)).list_runs())) == manifest["runs"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "feedback-00000.jsonl.gz", "manifest.json", "runs-00000.jsonl.gz",
+    ]
@@ -0,0 +1,26 @@
+import threading
+
+from langsmith_annotator.prefetcher import Prefetcher
+
+
+def test_duplicate_keys_are_scheduled_once_and_the_cap_drops_extras():
+    release = threading.Event()
+    prefetcher = Prefetcher(max_workers=1, max_in_flight=2)
+    assert prefetcher.prefetch("a", release.wait, 1)
+    assert prefetcher.prefetch("a", release.wait, 1)
+    assert prefetcher.prefetch("b", release.wait, 1)
+    assert not prefetcher.prefetch("c", release.wait, 1)
+    assert prefetcher.dropped == 1
+    release.set()
+    prefetcher.shutdown()
+
+
+def test_cancel_stale_cancels_queued_work_of_other_groups():
+    release = threading.Event()
+    prefetcher = Prefetcher(max_workers=1, max_in_flight=5)
+    prefetcher.prefetch("running", release.wait, 1, owner="me", group="old")
+    prefetcher.prefetch("queued", release.wait, 1, owner="me", group="old")
+    prefetcher.prefetch("current", release.wait, 1, owner="me", group="new")
+    assert prefetcher.cancel_stale("me", "new") == 1
+    release.set()
+    prefetcher.shutdown()
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from langsmith_annotator.request_layer import CoalescingClient, TokenBucket, mount_rate_limited_adapter
+
+
+def test_bucket_allows_a_burst_then_throttles():
+    bucket = TokenBucket(rate=50, burst=5)
+    started = time.monotonic()
+    waits = [bucket.acquire() for _ in range(10)]
+    assert waits[:5] == [0.0] * 5
+    assert time.monotonic() - started >= 4 / 50
+
+
+def test_rate_limit_halves_the_rate_and_recovers():
+    bucket = TokenBucket(rate=10, burst=1, min_rate=1, recovery_step=2)
+    bucket.on_rate_limited(retry_after=0)
+    assert bucket.rate == 5 and bucket.rate_limited == 1
+    bucket.on_success()
+    bucket.on_success()
+    bucket.on_success()
+    assert bucket.rate == 10
+
+
+def test_rate_limit_pause_honours_retry_after():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.on_rate_limited(retry_after=0.05)
+    assert bucket.acquire() >= 0.04
+
+
+class SlowClient:
+    def __init__(self):
+        self.calls = 0
+
+    def read_project(self, project_id):
+        self.calls += 1
+        time.sleep(0.05)
+        return {"id": project_id}
+
+    def list_feedback(self, run_ids):
+        self.calls += 1
+        return iter([{"run_id": run_id} for run_id in run_ids])
+
+
+def test_identical_concurrent_reads_share_one_call():
+    client = SlowClient()
+    coalescing = CoalescingClient(client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescing.read_project("p"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.calls == 1
+    assert results == [{"id": "p"}] * 5
+
+
+def test_list_results_are_materialized_per_caller():
+    coalescing = CoalescingClient(SlowClient())
+    first = coalescing.list_feedback(run_ids=["a", "b"])
+    first.append("mutated")
+    assert coalescing.list_feedback(run_ids=["a", "b"]) == [{"run_id": "a"}, {"run_id": "b"}]
+
+
+def test_pooled_adapter_leaves_retries_to_the_loader():
+    requests = pytest.importorskip("requests")
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(max_retries=3))
+    adapter = mount_rate_limited_adapter(session, prefix="https://api.example", limiter=TokenBucket())
+    assert session.get_adapter("https://api.example/runs") is adapter
+    assert adapter.max_retries.total == 0
@@ -0,0 +1,102 @@
+from conftest import make_feedback, make_run
+
+from langsmith_annotator.run_cache import fts_query, from_iso, to_iso
+
+
+def test_iso_round_trip_sorts_chronologically():
+    earlier, later = make_run(0).start_time, make_run(90).start_time
+    assert to_iso(earlier) < to_iso(later)
+    assert from_iso(to_iso(later)) == later
+
+
+def test_runs_are_listed_newest_first_per_scope(cache, project_id):
+    runs = [make_run(minutes) for minutes in (5, 1, 9)]
+    latest = cache.upsert_runs(runs, project_id=project_id)
+    assert latest == to_iso(runs[2].start_time)
+    assert [str(run.id) for run in cache.get_runs("project", project_id)] == [
+        str(runs[2].id), str(runs[0].id), str(runs[1].id)
+    ]
+    assert cache.get_runs("project", "another-project") == []
+
+
+def test_iter_run_pages_pages_through_every_run(cache, project_id):
+    runs = [make_run(minutes) for minutes in range(25)]
+    cache.upsert_runs(runs, project_id=project_id)
+    pages = list(cache.iter_run_pages("project", project_id, page_size=10))
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert len({str(run.id) for page in pages for run in page}) == 25
+
+
+def test_iter_run_pages_breaks_ties_on_run_id(cache, project_id):
+    start_time = make_run(0).start_time
+    runs = [make_run(start_time=start_time) for _ in range(7)]
+    cache.upsert_runs(runs, project_id=project_id)
+    ids = [str(run.id) for page in cache.iter_run_pages("project", project_id, page_size=3) for run in page]
+    assert ids == sorted((str(run.id) for run in runs), reverse=True)
+
+
+def test_unfinished_runs_are_tracked(cache, project_id):
+    finished, running = make_run(0), make_run(1, end_time=None)
+    cache.upsert_runs([finished, running], project_id=project_id)
+    assert cache.get_unfinished_run_ids("project", project_id) == [str(running.id)]
+
+
+def test_run_payload_of_unfinished_run_is_not_served(cache):
+    running = make_run(0, end_time=None, inputs={"input": "hello"})
+    cache.put_run_payload(running)
+    assert cache.get_run_payload(str(running.id)) is None
+    finished = make_run(0, inputs={"input": "hello"})
+    cache.put_run_payload(finished)
+    assert cache.get_run_payload(str(finished.id)).inputs == {"input": "hello"}
+
+
+def test_feedback_index_and_staleness(cache):
+    run_id = str(make_run().id)
+    other_id = str(make_run().id)
+    cache.replace_feedback({run_id: [make_feedback(run_id, value="good")]})
+    index = cache.get_feedback_index([run_id, other_id])
+    assert [fb.value for fb in index[run_id]] == ["good"]
+    assert index[other_id] == []
+    assert cache.get_stale_feedback_run_ids([run_id, other_id], max_age_s=60) == [other_id]
+
+
+def test_sync_state_round_trip(cache):
+    assert cache.get_sync_state("project:1") == (None, None)
+    cache.set_sync_state("project:1", "2024-01-01T00:00:00.000000Z")
+    watermark, synced_at = cache.get_sync_state("project:1")
+    assert watermark == "2024-01-01T00:00:00.000000Z" and synced_at is not None
+
+
+def test_fts_query_prefix_matches_last_word():
+    assert fts_query("card declined") == '"card" "declined"*'
+    assert fts_query("  ?! ") is None
+
+
+def test_search_ranks_matching_runs(cache, project_id):
+    if not cache.search_available:
+        return
+    refund = make_run(0, name="AgentExecutor", inputs={"input": "Where is my refund?"},
+                      outputs={"output": "It was sent yesterday."})
+    password = make_run(1, name="AgentExecutor", inputs={"input": "How do I reset my password?"})
+    cache.index_run_text([refund, password], project_id=project_id)
+    hits = cache.search_runs("refu", project_id=project_id)
+    assert [hit.run_id for hit in hits] == [str(refund.id)]
+    assert "[refund]" in hits[0].snippet
+    assert cache.count_search_docs(project_id) == 2
+
+
+def test_iter_run_pages_includes_runs_without_start_time(cache, project_id):
+    dated = [make_run(minutes) for minutes in range(5)]
+    undated = [make_run(start_time=None) for _ in range(4)]
+    cache.upsert_runs(dated + undated, project_id=project_id)
+    ids = [str(run.id) for page in cache.iter_run_pages("project", project_id, page_size=3) for run in page]
+    assert ids[:5] == [str(run.id) for run in reversed(dated)]
+    assert sorted(ids[5:]) == sorted(str(run.id) for run in undated)
+    assert ids == [str(run.id) for run in cache.get_runs_page("project", project_id, 0, 20)]
+
+
+def test_run_traces_include_runs_without_start_time(cache, project_id):
+    dated, undated = make_run(0), make_run(start_time=None)
+    cache.upsert_runs([dated, undated], project_id=project_id)
+    assert set(cache.get_run_traces("project", project_id)) == {str(dated.id), str(undated.id)}
+    assert set(cache.get_run_traces("project", project_id, start_after=dated.start_time)) == {str(dated.id)}
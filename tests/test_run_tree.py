@@ -0,0 +1,43 @@
+import uuid
+
+from conftest import make_run
+
+from langsmith_annotator.run_index import RunIndex
+from langsmith_annotator.run_tree import build_tree
+
+
+def trace_runs():
+    root = make_run(0, name="AgentExecutor")
+    tool = make_run(1, name="search", run_type="tool", parent_run_id=root.id, trace_id=root.id)
+    llm = make_run(2, name="ChatOpenAI", run_type="llm", parent_run_id=tool.id, trace_id=root.id)
+    answer = make_run(3, name="ChatOpenAI", run_type="llm", parent_run_id=root.id, trace_id=root.id,
+                      status="error")
+    return root, tool, llm, answer
+
+
+def test_tree_without_dotted_order_orders_by_start_time():
+    root, tool, llm, answer = trace_runs()
+    tree = build_tree([answer, llm, root, tool])
+    assert [node.id for node in tree.walk()] == [str(run.id) for run in (root, tool, llm, answer)]
+    assert [tree.get(run.id).depth for run in (root, tool, llm, answer)] == [0, 1, 2, 1]
+
+
+def test_collapsed_nodes_hide_their_descendants():
+    root, tool, llm, answer = trace_runs()
+    tree = build_tree([root, tool, llm, answer])
+    assert str(llm.id) not in [node.id for node in tree.walk(collapsed={str(tool.id)})]
+
+
+def test_runs_with_missing_parent_become_roots():
+    orphan = make_run(0, parent_run_id=uuid.uuid4())
+    assert [node.id for node in build_tree([orphan]).roots] == [str(orphan.id)]
+
+
+def test_run_index_filters_by_text_type_and_status():
+    runs = trace_runs()
+    index = RunIndex(runs)
+    assert index.run_types == ["chain", "llm", "tool"]
+    assert index.filter("chatopenai") == [str(runs[2].id), str(runs[3].id)]
+    assert index.filter(run_types=["llm"], statuses=["error"]) == [str(runs[3].id)]
+    assert index.label(runs[0].id).startswith("1. AgentExecutor (chain)")
+    assert runs[1].id in index and index.get(str(runs[1].id)) is runs[1]
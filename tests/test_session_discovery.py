@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+from conftest import make_run, memory_client
+
+from langsmith_annotator.session_discovery import (
+    AGENT_EXECUTOR_SESSIONS, SessionQuery, build_filter, build_list_runs_kwargs, discover_sessions,
+)
+
+
+def test_predicates_are_pushed_into_the_query(project_id):
+    query = SessionQuery(run_type="chain", name_contains="Agent",
+                         start_before=datetime(2024, 2, 1, tzinfo=timezone.utc))
+    kwargs = build_list_runs_kwargs(project_id, query)
+    assert kwargs["is_root"] is True and kwargs["run_type"] == "chain"
+    assert kwargs["filter"] == build_filter(query)
+    assert kwargs["filter"].startswith('and(search("Agent"), lt(start_time, "2024-02-01')
+    assert "is_root" not in build_list_runs_kwargs(project_id, SessionQuery(root_only=False))
+
+
+def test_discovers_exactly_limit_sessions(fake_client, project_id):
+    result = discover_sessions(fake_client, project_id, 5, AGENT_EXECUTOR_SESSIONS)
+    assert len(result.sessions) == 5
+    assert all("AgentExecutor" in session["name"] for session in result.sessions)
+
+
+def test_name_is_rechecked_locally(project_id):
+    runs = [make_run(0, name="AgentExecutor"), make_run(1, name="Retriever")]
+    client = memory_client(runs)
+    result = discover_sessions(client, project_id, 10, AGENT_EXECUTOR_SESSIONS)
+    assert [session["id"] for session in result.sessions] == [runs[0].id]
+
+
+def test_group_by_session_id_skips_excluded_ids(project_id):
+    session_a, session_b = make_run(0).id, make_run(0).id
+    runs = [make_run(0, session_id=session_a), make_run(1, session_id=session_b),
+            make_run(2, session_id=session_a)]
+    client = memory_client(runs)
+    query = SessionQuery(group_by="session_id", exclude_session_ids=frozenset({str(session_b)}))
+    result = discover_sessions(client, project_id, 10, query)
+    assert [str(session["id"]) for session in result.sessions] == [str(session_a)]